@@ -0,0 +1,229 @@
+"""_summary_
+Summary: Sequential registration flows through the API with and without connection reuse.
+
+Each flow is one user: /start_registration, one /submit_response per question and an
+/edit_field, sent one after another like the Streamlit frontend does. Three ways to send them:
+
+    bare     requests.post per call, a new TCP (and TLS) connection each time (the old frontend)
+    pooled   RegistrationClient: one requests.Session keep-alive pool
+    async    AsyncRegistrationClient: one httpx keep-alive pool
+
+Reports flows/sec and per-request p50/p95. By default the backend and a fake OpenAI server
+with near-zero latency are started locally (as in app.loadtest.run_load), so the numbers show
+client and transport overhead rather than LLM time. Over loopback there is no TLS handshake
+and almost no round-trip time, so connection set-up costs next to nothing. --handshake-ms N
+puts a local proxy in front of the backend that holds every new connection for N ms before
+it carries traffic, standing in for TCP + TLS set-up (about 3 round trips: 60 ms at a 20 ms
+RTT). Or point --app-url at a deployed HTTPS backend to measure the real saving.
+
+Run from the repository root:
+    python -m app.benchmarks.client_bench --flows 50
+    python -m app.benchmarks.client_bench --flows 50 --handshake-ms 60
+    python -m app.benchmarks.client_bench --app-url https://example.org --flows 20 --json client_bench.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+import requests
+
+from app.loadtest.run_load import make_user, start_local_stack
+from frontend_streamlit.registration_client import AsyncRegistrationClient, NO_RETRY, RegistrationClient
+
+QUESTIONS = 6
+
+
+class HandshakeDelayProxy:
+    """Local TCP proxy that delays each new connection by a fixed time, then relays bytes as-is."""
+
+    def __init__(self, upstream_url: str, delay_ms: float):
+        upstream = urlsplit(upstream_url)
+        self.upstream = (upstream.hostname, upstream.port)
+        self.delay = delay_ms / 1000
+        self.connections = 0
+        self._loop = asyncio.new_event_loop()
+        self._server = None
+
+    async def _pipe(self, reader, writer):
+        try:
+            while data := await reader.read(65536):
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, client_reader, client_writer):
+        self.connections += 1
+        await asyncio.sleep(self.delay)
+        upstream_reader, upstream_writer = await asyncio.open_connection(*self.upstream)
+        await asyncio.gather(self._pipe(client_reader, upstream_writer), self._pipe(upstream_reader, client_writer))
+
+    def start_in_thread(self) -> str:
+        started = threading.Event()
+
+        async def serve():
+            self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+            started.set()
+
+        threading.Thread(target=self._loop.run_forever, name="handshake-proxy", daemon=True).start()
+        asyncio.run_coroutine_threadsafe(serve(), self._loop)
+        started.wait(10)
+        return f"http://127.0.0.1:{self._server.sockets[0].getsockname()[1]}"
+
+
+class BareClient:
+    """The pre-SDK frontend: requests.post without a Session, so nothing is reused."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def _post(self, path: str, payload=None) -> dict:
+        response = requests.post(self.base_url + path, json=payload, timeout=30)
+        response.raise_for_status()
+        return response.json()
+
+    def flow(self, user: dict, timings: list):
+        start = time.perf_counter()
+        body = self._post("/start_registration")
+        timings.append(time.perf_counter() - start)
+        session_id, node = body["session_id"], body["state"]["current_node"]
+        for _ in range(QUESTIONS):
+            start = time.perf_counter()
+            body = self._post("/submit_response", {"session_id": session_id, "answer": user[node]})
+            timings.append(time.perf_counter() - start)
+            if body.get("message") == "Registration complete!":
+                break
+            node = body["state"]["current_node"]
+        start = time.perf_counter()
+        self._post("/edit_field", {"session_id": session_id, "field_to_edit": "ask_username", "new_value": user["new_username"]})
+        timings.append(time.perf_counter() - start)
+
+
+def pooled_flow(client: RegistrationClient, user: dict, timings: list):
+    start = time.perf_counter()
+    result = client.start_registration()
+    timings.append(time.perf_counter() - start)
+    session_id, node = result.session_id, result.node
+    for _ in range(QUESTIONS):
+        start = time.perf_counter()
+        result = client.submit_response(session_id, user[node])
+        timings.append(time.perf_counter() - start)
+        if result.completed:
+            break
+        node = result.node
+    start = time.perf_counter()
+    client.edit_field(session_id, "ask_username", user["new_username"])
+    timings.append(time.perf_counter() - start)
+
+
+async def async_flow(client: AsyncRegistrationClient, user: dict, timings: list):
+    start = time.perf_counter()
+    result = await client.start_registration()
+    timings.append(time.perf_counter() - start)
+    session_id, node = result.session_id, result.node
+    for _ in range(QUESTIONS):
+        start = time.perf_counter()
+        result = await client.submit_response(session_id, user[node])
+        timings.append(time.perf_counter() - start)
+        if result.completed:
+            break
+        node = result.node
+    start = time.perf_counter()
+    await client.edit_field(session_id, "ask_username", user["new_username"])
+    timings.append(time.perf_counter() - start)
+
+
+def run_mode(mode: str, app_url: str, users: list, proxy: HandshakeDelayProxy = None) -> dict:
+    timings = []
+    connections_before = proxy.connections if proxy else 0
+    start = time.perf_counter()
+    if mode == "bare":
+        client = BareClient(app_url)
+        for user in users:
+            client.flow(user, timings)
+    elif mode == "pooled":
+        with RegistrationClient(app_url, timeout=30, retry=NO_RETRY) as client:
+            for user in users:
+                pooled_flow(client, user, timings)
+    else:
+        async def run():
+            async with AsyncRegistrationClient(app_url, timeout=30, retry=NO_RETRY) as client:
+                for user in users:
+                    await async_flow(client, user, timings)
+
+        asyncio.run(run())
+    wall = time.perf_counter() - start
+
+    timings.sort()
+    return {
+        "mode": mode,
+        "flows": len(users),
+        "requests": len(timings),
+        "flows_per_sec": round(len(users) / wall, 2),
+        "request_p50_ms": round(statistics.median(timings) * 1000, 2),
+        "request_p95_ms": round(timings[int(len(timings) * 0.95) - 1] * 1000, 2),
+        "connections": proxy.connections - connections_before if proxy else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flows", type=int, default=50, help="sequential registrations per mode")
+    parser.add_argument("--modes", default="bare,pooled,async")
+    parser.add_argument("--app-url", help="target a running backend instead of starting one")
+    parser.add_argument("--handshake-ms", type=float, default=0.0, help="simulated set-up time per new connection")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    from faker import Faker
+
+    fake = Faker("en_GB")
+    Faker.seed(args.seed)
+    modes = args.modes.split(",")
+    users = {mode: [make_user(fake) for _ in range(args.flows + 1)] for mode in modes}
+
+    processes, results = [], []
+    with tempfile.TemporaryDirectory(prefix="client-bench-") as workdir:
+        try:
+            app_url = args.app_url
+            if not app_url:
+                stack = SimpleNamespace(
+                    engine="dspy", workers=1, fast_path=True, cache=False, batching=False, batch_window_ms=20.0,
+                    hedge_engine=None, latency_ms=1.0, latency_sigma=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                    seed=args.seed,
+                )
+                app_url, _, processes = start_local_stack(stack, workdir)
+            proxy = None
+            if args.handshake_ms:
+                proxy = HandshakeDelayProxy(app_url, args.handshake_ms)
+                app_url = proxy.start_in_thread()
+            for mode in modes:
+                run_mode(mode, app_url, users[mode][:1])  # warm up lazy imports and pools, unmeasured
+                results.append(run_mode(mode, app_url, users[mode][1:], proxy))
+        finally:
+            for proc in reversed(processes):
+                proc.terminate()
+                proc.wait(10)
+
+    print(f"{'mode':<8}{'flows/s':>10}{'req p50 ms':>12}{'req p95 ms':>12}{'connections':>13}")
+    for r in results:
+        connections = "-" if r["connections"] is None else r["connections"]
+        print(f"{r['mode']:<8}{r['flows_per_sec']:>10}{r['request_p50_ms']:>12}{r['request_p95_ms']:>12}{connections:>13}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {"app_url": args.app_url or "local", "handshake_ms": args.handshake_ms, "results": results}, f, indent=2
+            )
+
+
+if __name__ == "__main__":
+    main()
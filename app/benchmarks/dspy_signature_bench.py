@@ -0,0 +1,108 @@
+"""_summary_
+Summary: Compares the single ValidateUserAnswer DSPy signature with the compact per-field
+signatures (DSPY_COMPACT_SIGNATURES) in app/validation/dspy_validator.py.
+
+For every registration question it renders the exact prompt DSPy's ChatAdapter sends and
+counts its tokens (tiktoken o200k_base, the gpt-4.1 encoding; a chars/4 estimate if tiktoken
+is missing). With --live N it also calls the configured LM N times per question and signature,
+with the LM cache off, and reports p50 latency and the prompt tokens billed by the API.
+--live needs OPENAI_API_KEY (and OPENAI_BASE_URL for another OpenAI-compatible endpoint);
+against app.loadtest.fake_openai the latencies are the fake server's, not the model's.
+
+Run from the repository root:
+    python -m app.benchmarks.dspy_signature_bench
+    python -m app.benchmarks.dspy_signature_bench --live 5 --json signature_bench.json
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-signature-bench")  # config.py requires a key; offline mode makes no request
+
+import dspy  # noqa: E402
+from app.graph.registration_graph import registration_questions  # noqa: E402
+from app.helpers.config import OPENAI_API_KEY, OPENAI_BASE_URL  # noqa: E402
+from app.validation.dspy_validator import FIELD_SIGNATURES, ValidateUserAnswer  # noqa: E402
+
+SAMPLE_ANSWERS = {
+    "ask_email": "John.Doe@Gmail.com",
+    "ask_name": "john o'neil",
+    "ask_address": "flat a 12 high street london sw1a 1aa",
+    "ask_phone": "+44 7700 900 123",
+    "ask_username": "jdoe_88",
+    "ask_password": "correct horse battery staple",
+}
+
+
+def _token_counter():
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("o200k_base")
+        return lambda text: len(encoding.encode(text))
+    except ImportError:
+        return lambda text: len(text) // 4
+
+
+def prompt_tokens(signature, inputs: dict, count) -> int:
+    messages = dspy.ChatAdapter().format(signature, demos=[], inputs=inputs)
+    return sum(count(message["content"]) for message in messages)
+
+
+def run_live(signature, inputs: dict, calls: int):
+    lm = dspy.LM(model="gpt-4.1-mini", api_key=OPENAI_API_KEY, api_base=OPENAI_BASE_URL, cache=False)
+    predict = dspy.Predict(signature)
+    latencies, billed = [], []
+    with dspy.context(lm=lm):
+        for _ in range(calls):
+            start = time.perf_counter()
+            predict(**inputs)
+            latencies.append(time.perf_counter() - start)
+            usage = lm.history[-1].get("usage") or {}
+            billed.append(usage.get("prompt_tokens", 0))
+    return round(statistics.median(latencies) * 1000, 1), round(statistics.fmean(billed), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", type=int, default=0, help="LM calls per question and signature (0 = token counts only)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    count = _token_counter()
+    results = []
+    for node_key, question in registration_questions.items():
+        inputs = {"question": question, "user_answer": SAMPLE_ANSWERS[node_key]}
+        row = {
+            "node": node_key,
+            "full_tokens": prompt_tokens(ValidateUserAnswer, inputs, count),
+            "compact_tokens": prompt_tokens(FIELD_SIGNATURES[node_key], inputs, count),
+        }
+        if args.live:
+            row["full_p50_ms"], row["full_billed_tokens"] = run_live(ValidateUserAnswer, inputs, args.live)
+            row["compact_p50_ms"], row["compact_billed_tokens"] = run_live(FIELD_SIGNATURES[node_key], inputs, args.live)
+        results.append(row)
+
+    header = f"{'node':<14}{'full tok':>10}{'compact tok':>13}{'saved':>8}"
+    if args.live:
+        header += f"{'full p50 ms':>13}{'compact p50 ms':>16}"
+    print(header)
+    for row in results:
+        saved = 1 - row["compact_tokens"] / row["full_tokens"]
+        line = f"{row['node']:<14}{row['full_tokens']:>10}{row['compact_tokens']:>13}{saved:>8.0%}"
+        if args.live:
+            line += f"{row['full_p50_ms']:>13}{row['compact_p50_ms']:>16}"
+        print(line)
+    full = sum(row["full_tokens"] for row in results)
+    compact = sum(row["compact_tokens"] for row in results)
+    print(f"{'registration':<14}{full:>10}{compact:>13}{1 - compact / full:>8.0%}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "total_full_tokens": full, "total_compact_tokens": compact}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
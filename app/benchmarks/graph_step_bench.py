@@ -0,0 +1,89 @@
+"""_summary_
+Summary: Compares graph stepping strategies on long questionnaires.
+
+    replay: BaseGraphManager.replay_and_step_graph (restarts compiled_graph.stream from the
+            entry point on every answer; cost grows with the question index)
+    table:  BaseGraphManager.resume_and_step_graph (precomputed transition table; O(1))
+
+Also checks that both strategies return the same next step at every index, and times the
+registration graph's 6 questions.
+
+Run from the repository root:
+    python -m app.benchmarks.graph_step_bench --sizes 6 25 100
+"""
+import argparse
+import statistics
+import time
+import logging
+
+from app.db.sqlite_db import RegistrationState
+from app.graph.base_graph import BaseGraphManager
+from app.graph.registration_graph import RegistrationGraphManager
+
+REGISTRATION_QUESTIONS = {
+    "ask_email": "What is your email address?",
+    "ask_name": "What is your full name?",
+    "ask_address": "What is your address?",
+    "ask_phone": "What is your phone number?",
+    "ask_username": "Choose a username.",
+    "ask_password": "Choose a strong password.",
+}
+
+
+def time_step(step, state, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = step(state)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def bench_graph(label, manager, repeat):
+    rows = []
+    for index, node_key in enumerate(manager.question_map):
+        state = {
+            "session_id": "bench",
+            "collected_data": {},
+            "current_question": manager.question_map[node_key],
+            "current_node": node_key,
+        }
+        replay_s, replay_result = time_step(
+            lambda st: manager.replay_and_step_graph(st, recursion_limit=len(manager.question_map) + 1),
+            state,
+            repeat,
+        )
+        table_s, table_result = time_step(manager.resume_and_step_graph, state, repeat)
+        if replay_result != table_result:
+            raise AssertionError(f"{label}: strategies disagree at {node_key}: {replay_result} != {table_result}")
+        rows.append((index, replay_s, table_s))
+
+    total_replay = sum(r[1] for r in rows)
+    total_table = sum(r[2] for r in rows)
+    last = rows[-1]
+    print(
+        f"{label:<16}{len(rows):>8}{last[1] * 1000:>16.3f}{last[2] * 1000:>16.3f}"
+        f"{total_replay * 1000:>18.3f}{total_table * 1000:>18.3f}{total_replay / total_table:>10.1f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[6, 25, 100])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(
+        f"{'graph':<16}{'nodes':>8}{'last replay ms':>16}{'last table ms':>16}"
+        f"{'full flow replay':>18}{'full flow table':>18}{'speedup':>11}"
+    )
+    bench_graph("registration", RegistrationGraphManager("registration", REGISTRATION_QUESTIONS), args.repeat)
+    for size in args.sizes:
+        questions = {f"q{i}": f"Question {i}?" for i in range(size)}
+        bench_graph(f"linear-{size}", BaseGraphManager(f"linear-{size}", questions, RegistrationState), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
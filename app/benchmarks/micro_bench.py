@@ -0,0 +1,267 @@
+"""_summary_
+Summary: Repeatable micro-benchmarks for the validation, graph and storage hot paths.
+
+    rules.validate_email / validate_phone / validate_address
+                        ValidatedLLMResponse rules over a seeded Faker corpus (valid + malformed)
+    guard.parse         Guardrails parse of typical validator payloads (one per field)
+    graph.step[<node>]  BaseGraphManager.resume_and_step_graph at each registration question
+    db.upsert@<rows> / db.fetch@<rows>
+                        upsert_session_to_db / fetch_session_from_db on random existing
+                        sessions, with the table holding <rows> rows
+
+Every benchmark is timed in --rounds rounds; the per-call median of the rounds is reported.
+Results are printed and can be written as JSON (--output). With --compare, results are checked
+against a stored baseline and the exit code is 1 if any benchmark got slower by more than
+--threshold (default 20%), so a regression is caught before it ships.
+
+Run from the repository root:
+    python -m app.benchmarks.micro_bench --output micro_baseline.json     # record a baseline
+    python -m app.benchmarks.micro_bench --compare micro_baseline.json    # check a change
+    python -m app.benchmarks.micro_bench --only rules graph --rounds 9
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+BENCH_DIR = tempfile.mkdtemp(prefix="micro_bench_")
+os.environ["REGISTRATION_DB_FILE"] = os.path.join(BENCH_DIR, "sessions.db")
+
+from app.db import sqlite_db  # noqa: E402  (must follow REGISTRATION_DB_FILE)
+from app.graph.registration_graph import RegistrationGraphManager, registration_questions  # noqa: E402
+from app.validation.validated_response import ValidatedLLMResponse  # noqa: E402
+
+GROUPS = ["rules", "guard", "graph", "db"]
+SAMPLE_DATA = {
+    "ask_email": "john@gmail.com",
+    "ask_name": "John Doe",
+    "ask_address": "12 High St, London, Town, SW1A 1AA",
+}
+
+
+def measure(fn, calls: int, rounds: int) -> dict:
+    """Runs fn() `calls` times per round; returns per-call timings in microseconds."""
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        per_call.append((time.perf_counter() - start) / calls)
+    return _summary(per_call, calls, rounds)
+
+
+def _summary(per_call: list, calls: int, rounds: int) -> dict:
+    median = statistics.median(per_call)
+    return {
+        "median_us": round(median * 1e6, 3),
+        "min_us": round(min(per_call) * 1e6, 3),
+        "max_us": round(max(per_call) * 1e6, 3),
+        "ops_per_sec": round(1 / median, 1) if median else None,
+        "calls": calls,
+        "rounds": rounds,
+    }
+
+
+def measure_corpus(fn, corpus: list, rounds: int) -> dict:
+    """Runs fn(item) over the whole corpus per round; returns per-call timings in microseconds."""
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for item in corpus:
+            fn(item)
+        per_call.append((time.perf_counter() - start) / len(corpus))
+    return _summary(per_call, len(corpus), rounds)
+
+
+#####################################################
+###################### Corpora ######################
+def build_corpora(size: int, seed: int) -> dict:
+    """About 80% well-formed answers, 20% typical mistakes."""
+    from faker import Faker
+
+    fake = Faker("en_GB")
+    Faker.seed(seed)
+    rng = random.Random(seed)
+    emails, phones, addresses = [], [], []
+    for _ in range(size):
+        bad = rng.random() < 0.2
+        email = fake.email()
+        emails.append(email.replace("@", " at ") if bad else email.upper() if rng.random() < 0.3 else email)
+
+        mobile = fake.numerify("07#########")
+        phones.append(
+            rng.choice([mobile[:7], "+44 " + mobile[1:] + "9", "oh seven " + mobile[2:]])
+            if bad
+            else rng.choice([mobile, "+44 " + mobile[1:], f"{mobile[:5]} {mobile[5:8]} {mobile[8:]}", fake.numerify("020########")])
+        )
+
+        parts = [fake.building_number(), fake.street_name(), fake.city(), fake.postcode()]
+        addresses.append(", ".join(parts[:3]) if bad else ", ".join(part.lower() if rng.random() < 0.3 else part for part in parts))
+    return {"email": emails, "phone": phones, "address": addresses}
+
+
+#####################################################
+#################### Benchmarks #####################
+def bench_rules(args) -> dict:
+    corpora = build_corpora(args.corpus, args.seed)
+    results = {}
+    # validate_phone prints a trace line per call; keep terminal I/O out of the measurement.
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        for field, validate in (
+            ("email", ValidatedLLMResponse.validate_email),
+            ("phone", ValidatedLLMResponse.validate_phone),
+            ("address", ValidatedLLMResponse.validate_address),
+        ):
+            results[f"rules.validate_{field}"] = measure_corpus(validate, corpora[field], args.rounds)
+            sink.seek(0)
+            sink.truncate()
+    return results
+
+
+def bench_guard(args) -> dict:
+    import guardrails as gd
+
+    guard = gd.Guard.for_pydantic(ValidatedLLMResponse)
+    payloads = [
+        json.dumps({"status": "valid", "feedback": "Looks good.", "formatted_answer": answer})
+        for answer in (
+            "john@gmail.com",
+            "John Doe",
+            "12 High St, London, Town, SW1A 1AA",
+            "07700 900123",
+            "jdoe_92",
+        )
+    ] + [json.dumps({"status": "clarify", "feedback": "Please include your postcode.", "formatted_answer": "clarify"})]
+    calls = max(1, args.corpus // 50)
+    return {"guard.parse": measure_corpus(guard.parse, payloads * (calls // len(payloads) + 1), args.rounds)}
+
+
+def bench_graph(args) -> dict:
+    manager = RegistrationGraphManager("registration", registration_questions)
+    results = {}
+    for node_key, question in registration_questions.items():
+        state = {
+            "session_id": "bench",
+            "collected_data": dict(SAMPLE_DATA),
+            "current_question": question,
+            "current_node": node_key,
+        }
+        results[f"graph.step[{node_key}]"] = measure(
+            lambda: manager.resume_and_step_graph(state), args.corpus // 10 or 1, args.rounds
+        )
+    return results
+
+
+def bench_db(args) -> dict:
+    sqlite_db.init_db()
+    rng = random.Random(args.seed)
+    session_ids = []
+    results = {}
+    calls = max(1, args.corpus // 10)
+    for rows in sorted(args.table_sizes):
+        missing = rows - len(session_ids)
+        while missing > 0:
+            batch = [
+                {
+                    "session_id": str(uuid.uuid4()),
+                    "collected_data": SAMPLE_DATA,
+                    "current_question": "What is your phone number?",
+                    "current_node": "ask_phone",
+                }
+                for _ in range(min(missing, 5000))
+            ]
+            sqlite_db.upsert_sessions_batch(batch)
+            session_ids.extend(session["session_id"] for session in batch)
+            missing -= len(batch)
+
+        def upsert():
+            sqlite_db.upsert_session_to_db(rng.choice(session_ids), SAMPLE_DATA, "Choose a username.", "ask_username")
+
+        def fetch():
+            sqlite_db.fetch_session_from_db(rng.choice(session_ids))
+
+        results[f"db.upsert@{rows}"] = measure(upsert, calls, args.rounds)
+        results[f"db.fetch@{rows}"] = measure(fetch, calls, args.rounds)
+    return results
+
+
+BENCHMARKS = {"rules": bench_rules, "guard": bench_guard, "graph": bench_graph, "db": bench_db}
+
+
+#####################################################
+##################### Reporting #####################
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Returns (name, baseline_us, current_us, ratio, verdict) rows; verdict is ok, faster, SLOWER or new."""
+    rows = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            rows.append((name, None, current["median_us"], None, "new"))
+            continue
+        ratio = current["median_us"] / before["median_us"] if before["median_us"] else float("inf")
+        verdict = "SLOWER" if ratio > 1 + threshold else "faster" if ratio < 1 - threshold else "ok"
+        rows.append((name, before["median_us"], current["median_us"], ratio, verdict))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=GROUPS)
+    parser.add_argument("--corpus", type=int, default=5000, help="inputs per validation rule (scales other groups)")
+    parser.add_argument("--table-sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="write the results as JSON (use as a baseline)")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20, help="allowed slowdown before failing")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    results = {}
+    for group in args.only:
+        results.update(BENCHMARKS[group](args))
+
+    print(f"{'benchmark':<32}{'median us':>12}{'min us':>12}{'ops/s':>14}")
+    for name, row in results.items():
+        print(f"{name:<32}{row['median_us']:>12}{row['min_us']:>12}{row['ops_per_sec']:>14}")
+
+    if args.output:
+        document = {
+            "meta": {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "corpus": args.corpus,
+                "rounds": args.rounds,
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        rows = compare(results, baseline, args.threshold)
+        print(f"\n{'benchmark':<32}{'baseline us':>14}{'current us':>14}{'ratio':>8}  verdict")
+        for name, before, current, ratio, verdict in rows:
+            before_text = f"{before:>14}" if before is not None else f"{'-':>14}"
+            ratio_text = f"{ratio:>8.2f}" if ratio is not None else f"{'-':>8}"
+            print(f"{name:<32}{before_text}{current:>14}{ratio_text}  {verdict}")
+        regressions = [row[0] for row in rows if row[4] == "SLOWER"]
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
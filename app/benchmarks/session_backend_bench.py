@@ -0,0 +1,125 @@
+"""_summary_
+Summary: Compares session backends (SESSION_STORE=sqlite vs redis) as worker processes are added.
+
+Each worker process models one uvicorn worker: it opens the backend through
+SessionStoreFactory (no in-process cache, since the cache cannot be shared between workers)
+and runs --concurrency sessions side by side, each doing --steps registration steps
+(aget the session, add an answer, aput it back, as /submit_response does).
+Reports steps/sec across all workers and per-step latency (p50/p95) at 1, 2, 4 and 8 workers.
+
+Redis runs against --redis-url, or, if none is given, the in-process stand-in from
+app/loadtest/fake_redis.py. The stand-in is single-threaded Python, so its absolute numbers
+understate a real server; point --redis-url at one to measure the real scaling.
+
+Run from the repository root:
+    python -m app.benchmarks.session_backend_bench --steps 200
+    python -m app.benchmarks.session_backend_bench --redis-url redis://localhost:6379/0 --json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+SAMPLE_DATA = {
+    "ask_email": "john@gmail.com",
+    "ask_name": "John Doe",
+    "ask_address": "12 High St, London, Town, SW1A 1AA",
+}
+
+
+def _worker(backend: str, concurrency: int, steps: int, start_at: float):
+    """Runs in a child process; returns (started, finished, latencies)."""
+    from app.db.factory import SessionStoreFactory  # after the parent set the backend env vars
+
+    async def run():
+        store = SessionStoreFactory.create_store(backend)
+        session_ids = [str(uuid.uuid4()) for _ in range(concurrency)]
+        for session_id in session_ids:
+            await store.aput(session_id, dict(SAMPLE_DATA), "What is your phone number?", "ask_phone")
+        latencies = []
+
+        async def session(session_id: str):
+            for step in range(steps):
+                step_start = time.perf_counter()
+                state = await store.aget(session_id)
+                state["collected_data"][f"answer_{step}"] = "07700 900 123"
+                await store.aput(session_id, state["collected_data"], "Choose a username.", f"node_{step}")
+                latencies.append(time.perf_counter() - step_start)
+
+        await asyncio.sleep(max(0.0, start_at - time.time()))  # all workers start together
+        started = time.time()
+        await asyncio.gather(*(session(session_id) for session_id in session_ids))
+        finished = time.time()
+        await store.aclose()
+        store.close()
+        return started, finished, latencies
+
+    return asyncio.run(run())
+
+
+def run_backend(backend: str, workers: int, concurrency: int, steps: int):
+    context = multiprocessing.get_context("spawn")  # no inherited threads or connections
+    start_at = time.time() + 2.0 + 0.2 * workers  # leave time for the children to import
+    with context.Pool(workers) as pool:
+        results = pool.starmap(_worker, [(backend, concurrency, steps, start_at)] * workers)
+
+    started = min(r[0] for r in results)
+    finished = max(r[1] for r in results)
+    latencies = sorted(latency for r in results for latency in r[2])
+    return {
+        "backend": backend,
+        "workers": workers,
+        "steps_per_sec": round(len(latencies) / (finished - started), 1),
+        "step_p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "step_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="sqlite,redis")
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker process counts.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent sessions per worker.")
+    parser.add_argument("--steps", type=int, default=200, help="Steps per session.")
+    parser.add_argument("--redis-url", default=None, help="Default: an in-process fake_redis server.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    backends = args.backends.split(",")
+    fake_redis = None
+    if "redis" in backends and args.redis_url is None:
+        from app.loadtest.fake_redis import FakeRedisServer
+
+        fake_redis = FakeRedisServer()
+        args.redis_url = fake_redis.start_in_thread()
+    # Children read these when they import the backends.
+    os.environ["REGISTRATION_DB_FILE"] = os.path.join(tempfile.mkdtemp(prefix="session_backend_bench_"), "sessions.db")
+    if args.redis_url:
+        os.environ["REDIS_URL"] = args.redis_url
+
+    results = []
+    try:
+        for backend in backends:
+            for workers in (int(n) for n in args.workers.split(",")):
+                results.append(run_backend(backend, workers, args.concurrency, args.steps))
+                if not args.json:
+                    r = results[-1]
+                    print(
+                        f"{r['backend']:<7} {r['workers']:>2} workers  {r['steps_per_sec']:>9.1f} steps/s  "
+                        f"p50 {r['step_p50_ms']:>7.3f} ms  p95 {r['step_p95_ms']:>7.3f} ms"
+                    )
+    finally:
+        if fake_redis is not None:
+            fake_redis.stop()
+
+    if args.json:
+        print(json.dumps({"redis_url": args.redis_url, "fake_redis": fake_redis is not None, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
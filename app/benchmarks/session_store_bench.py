@@ -0,0 +1,231 @@
+"""_summary_
+Summary: Benchmarks the SQLite session store under concurrent writers.
+
+Compares the pooled WAL store in app/db/sqlite_db.py against the previous approach
+(a new sqlite3 connection per call, default rollback journal) at 1, 8 and 32 writer threads.
+Reports upserts/sec, fetch latency (p50/p95) and "database is locked" errors.
+
+Then times one registration step (read session + write it back, as /submit_response does)
+through app/db/session_cache.py in each SESSION_CACHE_MODE: off, write_through, write_behind.
+
+Finally compares changing or reading one answer as sessions grow (8 to 512 fields):
+whole-row (json.dumps the full collected_data and rewrite the row, as before) against
+single-field (JSON1 json_set / json_extract, sqlite_db.update_session_field / fetch_session_field).
+
+Run from the repository root:
+    python -m app.benchmarks.session_store_bench --ops 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+
+BENCH_DIR = tempfile.mkdtemp(prefix="session_store_bench_")
+os.environ["REGISTRATION_DB_FILE"] = os.path.join(BENCH_DIR, "pooled.db")
+
+from app.db import sqlite_db  # noqa: E402  (must follow REGISTRATION_DB_FILE)
+from app.db.session_cache import SessionCache  # noqa: E402
+from app.db.session_store import SQLiteSessionStore  # noqa: E402
+
+LEGACY_DB = os.path.join(BENCH_DIR, "legacy.db")
+SAMPLE_DATA = {
+    "ask_email": "john@gmail.com",
+    "ask_name": "John Doe",
+    "ask_address": "12 High St, London, Town, SW1A 1AA",
+}
+
+
+def legacy_init():
+    with sqlite3.connect(LEGACY_DB) as conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, collected_data TEXT, "
+            "current_question TEXT, current_node TEXT)"
+        )
+
+
+def legacy_upsert(session_id, collected_data, current_question, current_node):
+    with sqlite3.connect(LEGACY_DB) as conn:
+        conn.execute(
+            """
+            INSERT INTO sessions (session_id, collected_data, current_question, current_node)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                collected_data = excluded.collected_data,
+                current_question = excluded.current_question,
+                current_node = excluded.current_node
+            """,
+            (session_id, json.dumps(collected_data), current_question, current_node),
+        )
+        conn.commit()
+
+
+def legacy_fetch(session_id):
+    with sqlite3.connect(LEGACY_DB) as conn:
+        row = conn.execute(
+            "SELECT session_id, collected_data, current_question, current_node FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+    return json.loads(row[1]) if row else None
+
+
+def run_writers(upsert, fetch, writers: int, ops: int):
+    errors = []
+    fetch_latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        session_id = str(uuid.uuid4())
+        local_latencies = []
+        for i in range(ops):
+            try:
+                upsert(session_id, SAMPLE_DATA, "What is your phone number?", f"node_{i}")
+                start = time.perf_counter()
+                fetch(session_id)
+                local_latencies.append(time.perf_counter() - start)
+            except sqlite3.OperationalError as e:
+                with lock:
+                    errors.append(str(e))
+        with lock:
+            fetch_latencies.extend(local_latencies)
+
+    threads = [threading.Thread(target=worker) for _ in range(writers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    fetch_latencies.sort()
+    completed = writers * ops - len(errors)
+    return {
+        "writers": writers,
+        "upserts_per_sec": round(completed / elapsed, 1),
+        "fetch_p50_ms": round(statistics.median(fetch_latencies) * 1000, 3) if fetch_latencies else None,
+        "fetch_p95_ms": round(fetch_latencies[int(len(fetch_latencies) * 0.95) - 1] * 1000, 3) if fetch_latencies else None,
+        "locked_errors": len(errors),
+    }
+
+
+async def run_session_steps(mode: str, sessions: int, steps: int):
+    """Each step: read the session, add an answer, write it back (what /submit_response does)."""
+    cache = SessionCache(SQLiteSessionStore(), mode, max_sessions=sessions * 2, flush_interval=1.0, flush_threshold=200)
+    session_ids = [f"{mode}-{uuid.uuid4()}" for _ in range(sessions)]
+    for session_id in session_ids:
+        await cache.aput(session_id, dict(SAMPLE_DATA), "What is your phone number?", "ask_phone")
+
+    latencies = []
+    start = time.perf_counter()
+    for step in range(steps):
+        for session_id in session_ids:
+            step_start = time.perf_counter()
+            state = await cache.aget(session_id)
+            state["collected_data"][f"answer_{step}"] = "07700 900 123"
+            await cache.aput(session_id, state["collected_data"], "Choose a username.", f"node_{step}")
+            latencies.append(time.perf_counter() - step_start)
+    cache.close()  # final flush is part of the cost
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "steps_per_sec": round(len(latencies) / elapsed, 1),
+        "step_p50_us": round(statistics.median(latencies) * 1e6, 1),
+        "step_p95_us": round(latencies[int(len(latencies) * 0.95) - 1] * 1e6, 1),
+        "flushes": cache.stats()["cache"]["flushes"],
+    }
+
+
+def _timed(fn, ops: int):
+    latencies = []
+    for i in range(ops):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return round(statistics.median(latencies) * 1e6, 1), round(latencies[int(len(latencies) * 0.95) - 1] * 1e6, 1)
+
+
+def run_field_updates(fields: int, ops: int):
+    """Per-op cost of updating / reading one answer in a session holding `fields` answers."""
+    session_id = f"fields-{fields}-{uuid.uuid4()}"
+    collected_data = {f"question_{n}": f"A free-text answer to question {n}, " + "x" * 60 for n in range(fields)}
+    sqlite_db.upsert_session_to_db(session_id, collected_data, "Next?", "question_0")
+
+    def whole_row_write(i):
+        session = sqlite_db.fetch_session_from_db(session_id)
+        session["collected_data"][f"question_{i % fields}"] = f"edited {i}"
+        sqlite_db.upsert_session_to_db(session_id, session["collected_data"], "Next?", "question_0")
+
+    def field_write(i):
+        sqlite_db.update_session_field(session_id, f"question_{i % fields}", f"edited {i}", "Next?", "question_0")
+
+    whole_write = _timed(whole_row_write, ops)
+    single_write = _timed(field_write, ops)
+    whole_read = _timed(lambda i: sqlite_db.fetch_session_from_db(session_id)["collected_data"][f"question_{i % fields}"], ops)
+    single_read = _timed(lambda i: sqlite_db.fetch_session_field(session_id, f"question_{i % fields}"), ops)
+    return {
+        "fields": fields,
+        "row_bytes": len(json.dumps(collected_data)),
+        "whole_write_p50_us": whole_write[0],
+        "field_write_p50_us": single_write[0],
+        "whole_read_p50_us": whole_read[0],
+        "field_read_p50_us": single_read[0],
+        "whole_write_p95_us": whole_write[1],
+        "field_write_p95_us": single_write[1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=200, help="upsert+fetch pairs per writer")
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--sessions", type=int, default=200, help="active sessions in the cache comparison")
+    parser.add_argument("--steps", type=int, default=6, help="answers per session in the cache comparison")
+    parser.add_argument("--fields", type=int, nargs="+", default=[8, 32, 128, 512], help="answers per session in the field comparison")
+    args = parser.parse_args()
+
+    legacy_init()
+    results = {"pooled_wal": [], "legacy": []}
+    for writers in args.writers:
+        results["pooled_wal"].append(
+            run_writers(sqlite_db.upsert_session_to_db, sqlite_db.fetch_session_from_db, writers, args.ops)
+        )
+        results["legacy"].append(run_writers(legacy_upsert, legacy_fetch, writers, args.ops))
+
+    print(f"{'store':<12}{'writers':>8}{'upserts/s':>12}{'fetch p50 ms':>14}{'fetch p95 ms':>14}{'locked':>8}")
+    for store, rows in results.items():
+        for row in rows:
+            print(
+                f"{store:<12}{row['writers']:>8}{row['upserts_per_sec']:>12}"
+                f"{row['fetch_p50_ms']:>14}{row['fetch_p95_ms']:>14}{row['locked_errors']:>8}"
+            )
+
+    print(f"\n{'session cache':<16}{'steps/s':>12}{'step p50 us':>14}{'step p95 us':>14}{'flushes':>9}")
+    for mode in ("off", "write_through", "write_behind"):
+        row = asyncio.run(run_session_steps(mode, args.sessions, args.steps))
+        print(
+            f"{row['mode']:<16}{row['steps_per_sec']:>12}{row['step_p50_us']:>14}"
+            f"{row['step_p95_us']:>14}{row['flushes']:>9}"
+        )
+
+    print(
+        f"\n{'fields':<8}{'row bytes':>10}{'write whole us':>16}{'write field us':>16}"
+        f"{'read whole us':>15}{'read field us':>15}  (p50)"
+    )
+    for fields in args.fields:
+        row = run_field_updates(fields, args.ops)
+        print(
+            f"{row['fields']:<8}{row['row_bytes']:>10}{row['whole_write_p50_us']:>16}{row['field_write_p50_us']:>16}"
+            f"{row['whole_read_p50_us']:>15}{row['field_read_p50_us']:>15}"
+        )
+
+
+if __name__ == "__main__":
+    main()
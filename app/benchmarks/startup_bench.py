@@ -0,0 +1,75 @@
+"""_summary_
+Summary: Measures cold-start import time of the FastAPI app.
+
+Imports the target module in a fresh interpreter with `python -X importtime` and reports:
+    - total wall time of the import
+    - the slowest modules by cumulative import time
+    - whether each heavy dependency (pandas, mlflow, guardrails, dspy, openai, litellm)
+      was imported at startup, and what it cost
+
+Run from the repository root:
+    python -m app.benchmarks.startup_bench
+    python -m app.benchmarks.startup_bench --module app.main --top 30 --runs 3
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_PACKAGES = ["pandas", "mlflow", "guardrails", "dspy", "openai", "litellm", "langgraph", "fastapi"]
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_once(module: str):
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-startup-bench")  # config.py requires a key; no request is made
+    env["VALIDATOR_WARMUP"] = "False"
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))  # microseconds
+    return wall, cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=1)
+    args = parser.parse_args()
+
+    walls, cumulative = [], {}
+    for _ in range(args.runs):
+        wall, cumulative = import_once(args.module)
+        walls.append(wall)
+
+    print(f"import {args.module}: {statistics.median(walls):.3f}s wall (median of {args.runs})\n")
+
+    print(f"{'module':<60}{'cumulative ms':>15}")
+    for name, micros in sorted(cumulative.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{name:<60}{micros / 1000:>15.1f}")
+
+    print(f"\n{'heavy package':<20}{'at startup':>12}{'cumulative ms':>15}")
+    for package in HEAVY_PACKAGES:
+        micros = cumulative.get(package)
+        loaded = "yes" if micros is not None else "no (lazy)"
+        print(f"{package:<20}{loaded:>12}{(micros or 0) / 1000:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""_summary_
+Summary: Command-line entry point for bulk registration jobs.
+
+import: runs the same code as the /bulk_import endpoint, in-process, without an HTTP round
+trip per row. Per-row outcomes are written as JSON lines to stdout (or --output); the
+summary (rows/sec) is also printed to stderr.
+export: same as the /export endpoint, written to --output.
+
+Run from the repository root:
+    python -m app.bulk.cli import partners.csv --concurrency 16
+    python -m app.bulk.cli import partners.jsonl --format jsonl --output outcomes.jsonl
+    python -m app.bulk.cli export --kind registrations --format parquet --output registrations.parquet
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from app.bulk.registration_import import import_registrations
+from app.bulk.session_export import export_sessions, MEDIA_TYPES
+from app.helpers.config import BULK_IMPORT_CHUNK_SIZE, BULK_IMPORT_CONCURRENCY
+
+
+async def run_import(args):
+    fmt = args.format or ("jsonl" if args.path.endswith((".jsonl", ".ndjson")) else "csv")
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        with open(args.path, "rb") as source:  # parsed chunk by chunk, never read whole
+            async for outcome in import_registrations(source, fmt, args.concurrency, args.chunk_size):
+                out.write(json.dumps(outcome) + "\n")
+                if "summary" in outcome:
+                    print(json.dumps(outcome["summary"]), file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+async def run_export(args):
+    completed = {"yes": True, "no": False}.get(args.completed)
+    with open(args.output, "wb") as out:
+        async for chunk in export_sessions(args.kind, args.format, completed, args.current_node):
+            out.write(chunk)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_cmd = commands.add_parser("import", help="validate and import registrations from CSV/JSONL")
+    import_cmd.add_argument("path")
+    import_cmd.add_argument("--format", choices=["csv", "jsonl"], help="defaults to the file extension")
+    import_cmd.add_argument("--concurrency", type=int, default=BULK_IMPORT_CONCURRENCY)
+    import_cmd.add_argument("--chunk-size", type=int, default=BULK_IMPORT_CHUNK_SIZE)
+    import_cmd.add_argument("--output", help="write per-row outcomes here instead of stdout")
+
+    export_cmd = commands.add_parser("export", help="export sessions or completed registrations")
+    export_cmd.add_argument("--kind", choices=["sessions", "registrations"], default="sessions")
+    export_cmd.add_argument("--format", choices=list(MEDIA_TYPES), default="csv")
+    export_cmd.add_argument("--completed", choices=["yes", "no"], help="filter on completion status")
+    export_cmd.add_argument("--current-node", help="only sessions currently at this node, e.g. ask_phone")
+    export_cmd.add_argument("--output", required=True)
+
+    args = parser.parse_args(argv)
+    if args.command == "import":
+        asyncio.run(run_import(args))
+    elif args.command == "export":
+        asyncio.run(run_export(args))
+
+
+if __name__ == "__main__":
+    main()
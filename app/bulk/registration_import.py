@@ -0,0 +1,198 @@
+import asyncio
+import json
+import math
+import tempfile
+import time
+import uuid
+import logging
+from typing import AsyncIterator, BinaryIO, Dict
+from langgraph.graph import END
+from app.validation.factory import avalidate_user_input
+from app.validation.admission import AdmissionRejected
+from app.db.factory import get_session_store
+from app.graph.registration_graph import registration_questions, OPTIONAL_QUESTIONS
+from app.helpers.config import BULK_IMPORT_CHUNK_SIZE, BULK_IMPORT_CONCURRENCY
+
+"""_summary_
+Summary: Bulk import of partner registration lists (CSV or JSONL).
+
+The input is a binary file object (an open file, or an upload spooled by spool_upload), parsed
+in chunks of BULK_IMPORT_CHUNK_SIZE rows with pandas, so memory stays flat for any file size.
+Every field of every row goes through the same validator stack as /submit_response (fast path,
+cache, LLM), with at most `concurrency` validations in flight. Fully valid rows are written to
+the sessions table as completed registrations, one transaction per chunk.
+
+Columns may use the graph node keys or the short field names:
+    ask_email / email, ask_name / name, ask_address / address,
+    ask_phone / phone, ask_username / username, ask_password / password
+
+Yields one outcome dict per row, then a final summary. Rejected and deferred rows are reported
+as soon as they are validated; imported rows only once their chunk has been stored:
+    {"row": 1, "status": "rejected", "session_id": None, "fields": {"ask_phone": {"status": "clarify", ...}}}
+    {"row": 2, "status": "deferred", "session_id": None, "fields": {"ask_username": {"degraded": True, ...}}}
+    {"row": 0, "status": "imported", "session_id": "...", "fields": {...}}
+    {"summary": {"rows": 3, "imported": 1, "rejected": 1, "deferred": 1, "failed": 0, "elapsed_s": 0.8, ...}}
+
+"deferred" rows passed only the local fallback rules (the LLM circuit was open, see
+circuit_breaker.py); they are not stored and can be imported again once the LLM is back.
+
+If the input cannot be parsed, rows from earlier chunks stay imported and the summary carries
+an "error" field with the parser's message. If storing a chunk fails, its valid rows are
+reported as "failed" (no session_id), the import stops and the summary carries the error.
+"""
+
+COLUMN_ALIASES = {key.replace("ask_", ""): key for key in registration_questions}
+SPOOL_MAX_BYTES = 1024 * 1024  # uploads larger than this are spooled to disk
+
+
+async def spool_upload(stream: AsyncIterator[bytes]) -> BinaryIO:
+    """
+    Copies a request body (request.stream()) chunk by chunk into a temporary file, kept in memory
+    up to SPOOL_MAX_BYTES. The body is read in full before the response starts: StreamingResponse
+    listens on the same ASGI receive channel for disconnects while it streams.
+    """
+    upload = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    async for chunk in stream:
+        upload.write(chunk)
+    upload.seek(0)
+    return upload
+
+
+def _read_chunks(source: BinaryIO, fmt: str, chunk_size: int):
+    """Returns a pandas chunk iterator; every value is read as a string (keeps phone leading zeros)."""
+    import pandas as pd  # imported on first use to keep startup fast
+
+    if fmt == "csv":
+        return pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunk_size)
+    if fmt == "jsonl":
+        return pd.read_json(source, lines=True, dtype=False, chunksize=chunk_size)
+    raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def _cell_to_str(value) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+
+def _normalize_row(record: Dict) -> Dict[str, str]:
+    row = {}
+    for column, value in record.items():
+        key = COLUMN_ALIASES.get(str(column).strip().lower(), str(column).strip().lower())
+        if key in registration_questions:
+            row[key] = _cell_to_str(value)
+    return row
+
+
+async def _validate_row(row_number: int, row: Dict[str, str], semaphore: asyncio.Semaphore) -> Dict:
+    async def validate_field(key: str):
+        answer = row.get(key, "")
+        if key in OPTIONAL_QUESTIONS and not answer.strip():
+            return key, {"status": "valid", "feedback": "Skipped this question", "formatted_answer": "-"}
+        async with semaphore:
+            while True:
+                try:
+                    return key, await avalidate_user_input(registration_questions[key], answer)
+                except AdmissionRejected as e:
+                    # Interactive traffic has the LLM capacity: back off instead of failing the row.
+                    await asyncio.sleep(e.retry_after)
+
+    results = dict(await asyncio.gather(*(validate_field(key) for key in registration_questions)))
+    if not all(result.get("status") == "valid" for result in results.values()):
+        status = "rejected"
+    elif any(result.get("degraded") for result in results.values()):
+        status = "deferred"  # settled by local rules while the LLM was unavailable: not checked in full
+    else:
+        status = "imported"
+    return {
+        "row": row_number,
+        "status": status,
+        "session_id": str(uuid.uuid4()) if status == "imported" else None,
+        "fields": results,
+    }
+
+
+async def import_registrations(
+    source: BinaryIO,
+    fmt: str = "csv",
+    concurrency: int = BULK_IMPORT_CONCURRENCY,
+    chunk_size: int = BULK_IMPORT_CHUNK_SIZE,
+) -> AsyncIterator[Dict]:
+    """Validates and stores registrations, yielding per-row outcomes and a final summary."""
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    total = 0
+    counts = {"imported": 0, "rejected": 0, "deferred": 0, "failed": 0}
+    reader = error = None
+    sentinel = object()
+
+    while True:
+        # pandas parsing is blocking; keep it off the event loop.
+        try:
+            if reader is None:
+                reader = await asyncio.to_thread(_read_chunks, source, fmt, chunk_size)  # reads the header
+            chunk = await asyncio.to_thread(next, reader, sentinel)
+        except ValueError as e:  # pandas ParserError/EmptyDataError, bad JSON, bad encoding
+            error = f"Could not parse {fmt} input after {total} rows: {e}"
+            logging.error(f"Bulk import: {error}")
+            break
+        if chunk is sentinel:
+            break
+
+        tasks = [
+            asyncio.create_task(_validate_row(total + offset, _normalize_row(record), semaphore))
+            for offset, record in enumerate(chunk.to_dict(orient="records"))
+        ]
+        total += len(tasks)
+
+        valid = []
+        for task in asyncio.as_completed(tasks):
+            outcome = await task
+            if outcome["status"] == "imported":
+                valid.append(outcome)  # reported once the chunk is stored
+                continue
+            counts[outcome["status"]] += 1
+            yield outcome
+
+        batch = [
+            {
+                "session_id": outcome["session_id"],
+                "collected_data": {key: result["formatted_answer"] for key, result in outcome["fields"].items()},
+                "current_question": "",
+                "current_node": END,
+            }
+            for outcome in valid
+        ]
+        try:
+            await asyncio.to_thread(get_session_store().put_many, batch)
+        except Exception as e:
+            error = f"Could not store rows {total - len(tasks)}-{total - 1}: {e}"
+            logging.error(f"Bulk import: {error}")
+            for outcome in valid:
+                outcome.update(status="failed", session_id=None)
+        for outcome in valid:
+            counts[outcome["status"]] += 1
+            yield outcome
+        if error:
+            break
+        logging.info(f"Bulk import: {total} rows processed, {counts['imported']} imported")
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "rows": total,
+        **counts,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_sec": round(total / elapsed, 1) if elapsed else 0.0,
+    }
+    if error:
+        summary["error"] = error
+    yield {"summary": summary}
+
+
+async def import_registrations_ndjson(source: BinaryIO, fmt: str, concurrency: int) -> AsyncIterator[str]:
+    """import_registrations as newline-delimited JSON, for StreamingResponse; closes source when done."""
+    try:
+        async for outcome in import_registrations(source, fmt, concurrency):
+            yield json.dumps(outcome) + "\n"
+    finally:
+        source.close()
@@ -0,0 +1,147 @@
+import asyncio
+import io
+import json
+from typing import AsyncIterator, Dict, List, Optional
+from app.db.factory import get_session_store
+from app.graph.registration_graph import registration_questions
+from app.helpers.config import EXPORT_BATCH_SIZE
+from app.helpers.fields import is_sensitive_question
+
+"""_summary_
+Summary: Streams sessions or completed registrations out of the session store as CSV, JSONL or Parquet.
+
+Rows are read a page at a time (EXPORT_BATCH_SIZE rows; keyset pagination on SQLite, SCAN on
+Redis) and encoded one batch at a time, so memory stays flat whether the table holds 1k or 10M rows.
+
+    kind="sessions"       one row per session: session_id, current_node, current_question,
+                          collected_data (JSON string)
+    kind="registrations"  completed sessions only, one column per question (ask_email, ...)
+
+Filters: completed (True/False/None) and current_node.
+
+Answers to sensitive questions (SENSITIVE_FIELDS, e.g. ask_password) are never exported.
+"""
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _is_sensitive(key: str) -> bool:
+    return is_sensitive_question(registration_questions.get(key, key))
+
+
+EXPORTED_FIELDS = [key for key in registration_questions if not _is_sensitive(key)]
+
+
+def _to_records(kind: str, sessions: List[Dict]) -> List[Dict]:
+    if kind == "registrations":
+        return [
+            {"session_id": s["session_id"], **{key: s["collected_data"].get(key, "") for key in EXPORTED_FIELDS}}
+            for s in sessions
+        ]
+    return [
+        {
+            "session_id": s["session_id"],
+            "current_node": s["current_node"],
+            "current_question": s["current_question"],
+            "collected_data": json.dumps(
+                {key: value for key, value in s["collected_data"].items() if not _is_sensitive(key)}
+            ),
+        }
+        for s in sessions
+    ]
+
+
+def _columns(kind: str) -> List[str]:
+    if kind == "registrations":
+        return ["session_id", *EXPORTED_FIELDS]
+    return ["session_id", "current_node", "current_question", "collected_data"]
+
+
+async def _iter_batches(kind: str, completed: Optional[bool], current_node: Optional[str], batch_size: int):
+    if kind == "registrations":
+        completed = True
+    store = get_session_store()
+    await asyncio.to_thread(store.flush)  # include answers still pending in write_behind mode
+    cursor = None
+    while True:
+        sessions, cursor = await asyncio.to_thread(store.fetch_page, cursor, batch_size, current_node, completed)
+        if sessions:  # SCAN pages can be empty before the end
+            yield _to_records(kind, sessions)
+        if cursor is None:
+            return
+
+
+class _ChunkSink:
+    """Write-only file object for ParquetWriter that hands back bytes as row groups are written."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+async def export_sessions(
+    kind: str = "sessions",
+    fmt: str = "csv",
+    completed: Optional[bool] = None,
+    current_node: Optional[str] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """Yields the encoded export, one batch at a time."""
+    columns = _columns(kind)
+
+    if fmt == "jsonl":
+        async for records in _iter_batches(kind, completed, current_node, batch_size):
+            yield "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+        return
+
+    if fmt == "csv":
+        import pandas as pd  # imported on first use to keep startup fast
+
+        header = True
+        async for records in _iter_batches(kind, completed, current_node, batch_size):
+            buffer = io.StringIO()
+            pd.DataFrame.from_records(records, columns=columns).to_csv(buffer, index=False, header=header)
+            header = False
+            yield buffer.getvalue().encode("utf-8")
+        if header:  # empty export still gets a header row
+            yield (",".join(columns) + "\n").encode("utf-8")
+        return
+
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(column, pa.string()) for column in columns])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema)
+        async for records in _iter_batches(kind, completed, current_node, batch_size):
+            writer.write_table(pa.Table.from_pylist(records, schema=schema))  # one row group per batch
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+        return
+
+    raise ValueError(f"Unsupported export format: {fmt}")
@@ -0,0 +1,60 @@
+import importlib
+import threading
+from app.db.session_store import SESSION_STORE, SessionStore
+from app.db.session_cache import (
+    SessionCache,
+    SESSION_CACHE_MODE,
+    SESSION_CACHE_SIZE,
+    SESSION_CACHE_FLUSH_INTERVAL,
+    SESSION_CACHE_FLUSH_THRESHOLD,
+)
+
+"""_summary_
+Summary: Builds the configured session backend (SESSION_STORE) and wraps it in the
+in-process SessionCache unless SESSION_CACHE_MODE=off.
+"""
+
+
+class SessionStoreFactory:
+    """Factory class for creating session store instances."""
+
+    # Backends are imported on first use, so the redis client is only needed when selected.
+    _stores = {
+        "sqlite": ("app.db.session_store", "SQLiteSessionStore"),
+        "redis": ("app.db.redis_store", "RedisSessionStore"),
+    }
+
+    @classmethod
+    def create_store(cls, backend: str) -> SessionStore:
+        """Creates a session store instance dynamically."""
+        if backend not in cls._stores:
+            raise ValueError(f"Invalid session store: {backend}")
+        module_name, class_name = cls._stores[backend]
+        return getattr(importlib.import_module(module_name), class_name)()
+
+
+def build_session_store(backend: str = SESSION_STORE, cache_mode: str = SESSION_CACHE_MODE) -> SessionStore:
+    store = SessionStoreFactory.create_store(backend)
+    if cache_mode == "off":
+        return store
+    return SessionCache(
+        store,
+        cache_mode,
+        max_sessions=SESSION_CACHE_SIZE,
+        flush_interval=SESSION_CACHE_FLUSH_INTERVAL,
+        flush_threshold=SESSION_CACHE_FLUSH_THRESHOLD,
+    )
+
+
+_session_store = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """The process-wide session store, built on first use."""
+    global _session_store
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                _session_store = build_session_store()
+    return _session_store
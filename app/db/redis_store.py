@@ -0,0 +1,230 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from app.db.session_store import SessionStore
+from app.db.sqlite_db import COMPLETED_NODE, SESSION_TTL_ABANDONED, SESSION_TTL_COMPLETED
+from app.helpers.metrics import STAGE_LATENCY
+
+"""_summary_
+Summary: Session backend for any Redis-protocol server, shared by all workers and nodes.
+
+Each session is one hash, session:v2:<session_id>:
+    current_question, current_node, updated_at    the session's position and last write time
+    data:<field>                                  one JSON-encoded collected_data value per answer
+A read is one HGETALL. An answer or edit is an HSET of just that field (plus the position), in
+a WATCH/MULTI transaction, so it never round-trips the rest of the session and never recreates
+a session that expired in the meantime. Concurrent updates of different fields of the same
+session both apply. Expiry uses the server's own key TTL (SESSION_TTL_ABANDONED /
+SESSION_TTL_COMPLETED, reset on every write), so the SQLite sweeper is not needed.
+
+Settings: REDIS_URL (default redis://localhost:6379/0), REDIS_MAX_CONNECTIONS (per process).
+For local runs and tests, python -m app.loadtest.fake_redis serves the same protocol in-process.
+"""
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+KEY_PREFIX = "session:v2:"  # v2: one hash per session (v1 was one JSON string per session)
+DATA_PREFIX = "data:"
+
+
+def _ttl(current_node: str) -> Optional[int]:
+    ttl = SESSION_TTL_COMPLETED if current_node == COMPLETED_NODE else SESSION_TTL_ABANDONED
+    return int(ttl) if ttl > 0 else None
+
+
+class RedisSessionStore(SessionStore):
+    name = "redis"
+
+    def __init__(self, url: str = REDIS_URL, max_connections: int = REDIS_MAX_CONNECTIONS):
+        import redis  # imported on first use, only when this backend is selected
+
+        self.url = url
+        self.max_connections = max_connections
+        # Sync client for bulk work in threads (imports, cache flushes), async client for endpoints.
+        self.client = redis.Redis.from_url(url, max_connections=max_connections)
+        self._async_client = None
+        self._async_loop = None
+
+    @property
+    def async_client(self):
+        """The async client for the running event loop (its pooled connections belong to one loop)."""
+        import redis.asyncio
+
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_client = redis.asyncio.Redis.from_url(self.url, max_connections=self.max_connections)
+            self._async_loop = loop
+        return self._async_client
+
+    @staticmethod
+    def _encode(collected_data: dict, current_question: str, current_node: str) -> Dict[str, str]:
+        mapping = {
+            "current_question": current_question,
+            "current_node": current_node,
+            "updated_at": repr(time.time()),
+        }
+        mapping.update({DATA_PREFIX + field: json.dumps(value) for field, value in collected_data.items()})
+        return mapping
+
+    @staticmethod
+    def _decode(session_id: str, fields) -> Optional[Dict]:
+        if not fields or b"current_node" not in fields:
+            return None
+        collected_data = {
+            key[len(DATA_PREFIX):].decode(): json.loads(value)
+            for key, value in fields.items()
+            if key.startswith(DATA_PREFIX.encode())
+        }
+        return {
+            "session_id": session_id,
+            "collected_data": collected_data,
+            "current_question": fields.get(b"current_question", b"").decode(),
+            "current_node": fields[b"current_node"].decode(),
+        }
+
+    @staticmethod
+    def _queue_put(pipeline, session_id: str, collected_data: dict, current_question: str, current_node: str):
+        """Queues a whole-session replace: the old fields go, the TTL restarts."""
+        key = KEY_PREFIX + session_id
+        pipeline.delete(key)
+        pipeline.hset(key, mapping=RedisSessionStore._encode(collected_data, current_question, current_node))
+        ttl = _ttl(current_node)
+        if ttl:
+            pipeline.expire(key, ttl)
+
+    @staticmethod
+    def _field_mapping(field: str, value: Any, current_question: Optional[str], current_node: Optional[str]):
+        mapping = {DATA_PREFIX + field: json.dumps(value), "updated_at": repr(time.time())}
+        if current_question is not None:
+            mapping["current_question"] = current_question
+        if current_node is not None:
+            mapping["current_node"] = current_node
+        return mapping
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        return self._decode(session_id, self.client.hgetall(KEY_PREFIX + session_id))
+
+    def put(self, session_id: str, collected_data: dict, current_question: str, current_node: str):
+        self.put_many(
+            [
+                {
+                    "session_id": session_id,
+                    "collected_data": collected_data,
+                    "current_question": current_question,
+                    "current_node": current_node,
+                }
+            ]
+        )
+
+    def put_many(self, sessions: List[Dict]):
+        if not sessions:
+            return
+        pipeline = self.client.pipeline(transaction=True)  # one round trip, applied atomically
+        for session in sessions:
+            self._queue_put(
+                pipeline, session["session_id"], session["collected_data"], session["current_question"], session["current_node"]
+            )
+        pipeline.execute()
+
+    def set_field(self, session_id, field, value, current_question=None, current_node=None) -> bool:
+        import redis
+
+        key = KEY_PREFIX + session_id
+        with self.client.pipeline(transaction=True) as pipeline:
+            while True:
+                try:
+                    pipeline.watch(key)  # EXEC fails if the session changes or expires before it
+                    node = pipeline.hget(key, "current_node")
+                    if node is None:
+                        return False
+                    pipeline.multi()
+                    pipeline.hset(key, mapping=self._field_mapping(field, value, current_question, current_node))
+                    ttl = _ttl(current_node if current_node is not None else node.decode())
+                    if ttl:
+                        pipeline.expire(key, ttl)
+                    pipeline.execute()
+                    return True
+                except redis.WatchError:
+                    continue
+
+    def get_field(self, session_id: str, field: str) -> Any:
+        node, value = self.client.hmget(KEY_PREFIX + session_id, ["current_node", DATA_PREFIX + field])
+        return None if node is None or value is None else json.loads(value)
+
+    def fetch_page(self, cursor, limit, current_node=None, completed=None):
+        next_cursor, keys = self.client.scan(cursor or 0, match=KEY_PREFIX + "*", count=limit)
+        sessions = []
+        if keys:
+            pipeline = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipeline.hgetall(key)
+            for key, fields in zip(keys, pipeline.execute()):
+                session = self._decode(key.decode()[len(KEY_PREFIX):], fields)
+                if session is None:  # expired between SCAN and HGETALL
+                    continue
+                if current_node is not None and session["current_node"] != current_node:
+                    continue
+                if completed is not None and (session["current_node"] == COMPLETED_NODE) != completed:
+                    continue
+                sessions.append(session)
+        return sessions, (next_cursor if next_cursor else None)
+
+    async def aget(self, session_id: str) -> Optional[Dict]:
+        return (await self.aget_with_updated_at(session_id))[0]
+
+    async def aget_with_updated_at(self, session_id: str) -> Tuple[Optional[Dict], Optional[float]]:
+        start = time.perf_counter()
+        fields = await self.async_client.hgetall(KEY_PREFIX + session_id)
+        STAGE_LATENCY.observe(("fetch_session_from_db", self.name), time.perf_counter() - start)
+        session = self._decode(session_id, fields)
+        return (None, None) if session is None else (session, float(fields.get(b"updated_at", 0)))
+
+    async def aput(self, session_id: str, collected_data: dict, current_question: str, current_node: str):
+        start = time.perf_counter()
+        pipeline = self.async_client.pipeline(transaction=True)
+        self._queue_put(pipeline, session_id, collected_data, current_question, current_node)
+        await pipeline.execute()
+        STAGE_LATENCY.observe(("upsert_session_to_db", self.name), time.perf_counter() - start)
+
+    async def aset_field(self, session_id, field, value, current_question=None, current_node=None) -> bool:
+        import redis
+
+        start = time.perf_counter()
+        key = KEY_PREFIX + session_id
+        async with self.async_client.pipeline(transaction=True) as pipeline:
+            while True:
+                try:
+                    await pipeline.watch(key)  # EXEC fails if the session changes or expires before it
+                    node = await pipeline.hget(key, "current_node")
+                    if node is None:
+                        return False
+                    pipeline.multi()
+                    pipeline.hset(key, mapping=self._field_mapping(field, value, current_question, current_node))
+                    ttl = _ttl(current_node if current_node is not None else node.decode())
+                    if ttl:
+                        pipeline.expire(key, ttl)
+                    await pipeline.execute()
+                    break
+                except redis.WatchError:
+                    continue
+        STAGE_LATENCY.observe(("update_session_field", self.name), time.perf_counter() - start)
+        return True
+
+    async def aget_field(self, session_id: str, field: str) -> Any:
+        node, value = await self.async_client.hmget(KEY_PREFIX + session_id, ["current_node", DATA_PREFIX + field])
+        return None if node is None or value is None else json.loads(value)
+
+    async def aclose(self):
+        if self._async_client is not None and self._async_loop is asyncio.get_running_loop():
+            await self._async_client.aclose()
+        self._async_client = self._async_loop = None
+
+    def close(self):
+        self.client.close()
+
+    def stats(self) -> Dict:
+        parsed = urlparse(self.url)
+        return {"backend": self.name, "server": f"{parsed.hostname}:{parsed.port or 6379}"}
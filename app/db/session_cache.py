@@ -0,0 +1,328 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from app.db.session_store import SessionStore
+from app.db.sqlite_db import COMPLETED_NODE, session_expiry_cutoffs
+from app.helpers.metrics import STAGE_LATENCY
+
+"""_summary_
+Summary: In-process session cache, wrapping any SessionStore (see app/db/factory.py).
+
+Every answer reads the session and writes it back. Without the cache that is two store round
+trips plus a json.loads/json.dumps of collected_data per step. Active sessions are served from
+memory instead (LRU, SESSION_CACHE_SIZE sessions), and writes follow SESSION_CACHE_MODE:
+
+    off            no cache; every read and write goes to the store (default)
+    write_through  reads from memory, every write also goes to the store before the request
+                   returns (nothing is lost on a crash)
+    write_behind   writes only mark the session dirty; a background thread flushes dirty
+                   sessions in one batched transaction every SESSION_CACHE_FLUSH_INTERVAL
+                   seconds, or sooner once SESSION_CACHE_FLUSH_THRESHOLD sessions are dirty.
+                   A crash loses at most one interval of answers; shutdown flushes everything.
+
+The cache is per process, so it is only safe with one worker per database (as deployed on
+Render) and is opt-in: set SESSION_CACHE_MODE=write_through or write_behind on a single-worker
+SQLite deployment. Several workers, or SESSION_STORE=redis, must keep it off.
+"""
+
+SESSION_CACHE_MODE = os.getenv("SESSION_CACHE_MODE", "off")
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+SESSION_CACHE_FLUSH_INTERVAL = float(os.getenv("SESSION_CACHE_FLUSH_INTERVAL", "1.0"))
+SESSION_CACHE_FLUSH_THRESHOLD = int(os.getenv("SESSION_CACHE_FLUSH_THRESHOLD", "200"))
+
+
+class _Entry:
+    __slots__ = ("collected_data", "current_question", "current_node", "updated_at", "version", "dirty")
+
+    def __init__(self, collected_data, current_question, current_node, updated_at):
+        self.collected_data = collected_data
+        self.current_question = current_question
+        self.current_node = current_node
+        self.updated_at = updated_at
+        self.version = 0
+        self.dirty = False
+
+
+class SessionCache(SessionStore):
+    """Wraps a SessionStore with an LRU of active sessions and write-through or write-behind writes."""
+
+    name = "cache"
+
+    def __init__(self, store: SessionStore, mode: str, max_sessions: int, flush_interval: float, flush_threshold: int):
+        if mode not in ("off", "write_through", "write_behind"):
+            raise ValueError(f"Invalid session cache mode: {mode}")
+        self.store = store
+        self.mode = mode
+        self.max_sessions = max_sessions
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._dirty = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush at a time (flusher thread vs. explicit flush)
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "flushes": 0,
+            "flushed_sessions": 0,
+            "flush_errors": 0,
+        }
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        if mode == "write_behind":
+            self._thread = threading.Thread(target=self._run, name="session-cache-flush", daemon=True)
+            self._thread.start()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @staticmethod
+    def _is_expired(entry: _Entry, now: float) -> bool:
+        abandoned_cutoff, completed_cutoff = session_expiry_cutoffs(now)
+        return entry.updated_at < (completed_cutoff if entry.current_node == COMPLETED_NODE else abandoned_cutoff)
+
+    @staticmethod
+    def _to_session(session_id: str, entry: _Entry) -> dict:
+        # Copy collected_data: endpoints mutate the returned state before deciding to save it.
+        return {
+            "session_id": session_id,
+            "collected_data": dict(entry.collected_data),
+            "current_question": entry.current_question,
+            "current_node": entry.current_node,
+        }
+
+    def _store(self, session_id: str, session: dict, dirty: bool, updated_at: float):
+        """Inserts or replaces a cache entry; caller holds self._lock."""
+        entry = self._entries.get(session_id)
+        if entry is None:
+            entry = self._entries[session_id] = _Entry(
+                dict(session["collected_data"]), session["current_question"], session["current_node"], updated_at
+            )
+        else:
+            entry.collected_data = dict(session["collected_data"])
+            entry.current_question = session["current_question"]
+            entry.current_node = session["current_node"]
+            entry.updated_at = updated_at
+            self._entries.move_to_end(session_id)
+        if dirty:
+            self._mark_dirty(entry)
+        self._evict()
+
+    def _mark_dirty(self, entry: _Entry):
+        """Caller holds self._lock."""
+        entry.version += 1
+        if not entry.dirty:
+            entry.dirty = True
+            self._dirty += 1
+
+    def _apply_field(self, session_id: str, field: str, value, current_question, current_node, now: float):
+        """Applies a single-field update to a cached entry, if any; caller holds self._lock."""
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        entry.collected_data[field] = value
+        if current_question is not None:
+            entry.current_question = current_question
+        if current_node is not None:
+            entry.current_node = current_node
+        entry.updated_at = now
+        self._entries.move_to_end(session_id)
+        return entry
+
+    def _evict(self):
+        """Drops least recently used clean entries; dirty ones wait for the next flush."""
+        scanned = 0
+        while len(self._entries) > self.max_sessions and scanned < 64:
+            session_id, entry = next(iter(self._entries.items()))
+            if entry.dirty:
+                self._entries.move_to_end(session_id)
+                self._wake.set()
+                scanned += 1
+                continue
+            del self._entries[session_id]
+            self._stats["evictions"] += 1
+
+    def get(self, session_id: str) -> Optional[dict]:
+        # Sync callers (CLI, benchmarks) bypass the cache but still see pending writes.
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and entry.dirty:
+                return self._to_session(session_id, entry)
+        return self.store.get(session_id)
+
+    def put(self, session_id: str, collected_data: dict, current_question: str, current_node: str):
+        self.put_many(
+            [
+                {
+                    "session_id": session_id,
+                    "collected_data": collected_data,
+                    "current_question": current_question,
+                    "current_node": current_node,
+                }
+            ]
+        )
+
+    def put_many(self, sessions: List[Dict]):
+        """Writes straight to the store (bulk import) and drops any cached copies."""
+        self.store.put_many(sessions)
+        with self._lock:
+            for session in sessions:
+                entry = self._entries.pop(session["session_id"], None)
+                if entry is not None and entry.dirty:
+                    self._dirty -= 1
+
+    def fetch_page(self, cursor, limit, current_node=None, completed=None):
+        return self.store.fetch_page(cursor, limit, current_node, completed)
+
+    async def aget(self, session_id: str) -> Optional[dict]:
+        return (await self.aget_with_updated_at(session_id))[0]
+
+    async def aget_with_updated_at(self, session_id: str) -> Tuple[Optional[dict], Optional[float]]:
+        if not self.enabled:
+            return await self.store.aget_with_updated_at(session_id)
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                if self._is_expired(entry, now):
+                    if entry.dirty:
+                        self._dirty -= 1
+                    del self._entries[session_id]
+                    return None, None
+                self._entries.move_to_end(session_id)
+                self._stats["hits"] += 1
+                return self._to_session(session_id, entry), entry.updated_at
+            self._stats["misses"] += 1
+
+        session, updated_at = await self.store.aget_with_updated_at(session_id)
+        if session is not None:
+            if updated_at is None:
+                updated_at = now
+            with self._lock:
+                if session_id not in self._entries:  # a concurrent write wins over this read
+                    # The row's own updated_at, so the entry expires when the row does (and the sweeper deletes it).
+                    self._store(session_id, session, dirty=False, updated_at=updated_at)
+        return session, updated_at
+
+    async def aput(self, session_id: str, collected_data: dict, current_question: str, current_node: str):
+        session = {
+            "collected_data": collected_data,
+            "current_question": current_question,
+            "current_node": current_node,
+        }
+        if self.mode != "write_behind":
+            await self.store.aput(session_id, collected_data, current_question, current_node)
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._store(session_id, session, dirty=self.mode == "write_behind", updated_at=time.time())
+            self._stats["writes"] += 1
+            if self._dirty >= self.flush_threshold:
+                self._wake.set()
+
+    async def aset_field(
+        self,
+        session_id: str,
+        field: str,
+        value: Any,
+        current_question: Optional[str] = None,
+        current_node: Optional[str] = None,
+    ) -> bool:
+        if self.mode == "write_behind":
+            with self._lock:
+                entry = self._apply_field(session_id, field, value, current_question, current_node, time.time())
+                if entry is not None:
+                    self._mark_dirty(entry)
+                    self._stats["writes"] += 1
+                    if self._dirty >= self.flush_threshold:
+                        self._wake.set()
+                    return True
+            # Not cached: the store applies it directly.
+
+        updated = await self.store.aset_field(session_id, field, value, current_question, current_node)
+        if updated and self.enabled:
+            with self._lock:
+                self._apply_field(session_id, field, value, current_question, current_node, time.time())
+                self._stats["writes"] += 1
+        return updated
+
+    async def aget_field(self, session_id: str, field: str) -> Any:
+        if self.enabled:
+            with self._lock:
+                entry = self._entries.get(session_id)
+                if entry is not None and not self._is_expired(entry, time.time()):
+                    self._stats["hits"] += 1
+                    return entry.collected_data.get(field)
+        return await self.store.aget_field(session_id, field)
+
+    def flush(self) -> int:
+        """Writes every dirty session to the store in one batch; returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                pending = [
+                    (session_id, entry.version, self._to_session(session_id, entry))
+                    for session_id, entry in self._entries.items()
+                    if entry.dirty
+                ]
+            if not pending:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                self.store.put_many([session for _, _, session in pending])
+            except Exception as e:
+                with self._lock:
+                    self._stats["flush_errors"] += 1
+                logging.error(f"Session cache flush failed ({len(pending)} sessions kept dirty): {e}")
+                return 0
+            STAGE_LATENCY.observe(("session_cache_flush", ""), time.perf_counter() - start)
+
+            with self._lock:
+                for session_id, version, _ in pending:
+                    entry = self._entries.get(session_id)
+                    # Only mark clean if nothing changed while the batch was being written.
+                    if entry is not None and entry.dirty and entry.version == version:
+                        entry.dirty = False
+                        self._dirty -= 1
+                self._stats["flushes"] += 1
+                self._stats["flushed_sessions"] += len(pending)
+            return len(pending)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    async def aclose(self):
+        await self.store.aclose()
+
+    def close(self, timeout: float = 10.0):
+        """Stops the flusher and writes out every dirty session (called on shutdown)."""
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+        self.store.close()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["dirty"] = self._dirty
+        lookups = stats["hits"] + stats["misses"]
+        stats["mode"] = self.mode
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return {**self.store.stats(), "cache": stats}
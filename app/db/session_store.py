@@ -0,0 +1,179 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+from app.db import sqlite_db
+
+"""_summary_
+Summary: SessionStore is the interface every session backend implements; the endpoints,
+bulk import and export only talk to a SessionStore (see app/db/factory.py for selection).
+
+A session is a dict: {"session_id", "collected_data", "current_question", "current_node"}.
+
+    get / aget        one session, or None if missing or expired
+    aget_with_updated_at
+                      (session, epoch seconds of its last write, which starts the TTL); for the
+                      session cache, so the timestamp never appears in the session dict itself
+    put / aput        insert or replace one session
+    put_many          insert or replace many sessions in one round trip (bulk import, cache flush)
+    set_field / aset_field
+                      change one collected_data key (and optionally the current question/node)
+                      without rewriting the rest; False if the session does not exist
+    get_field / aget_field
+                      one collected_data key, or None
+    fetch_page        one page of a full scan: (sessions, next_cursor); start with cursor=None,
+                      stop when next_cursor is None (pages may be empty before the end)
+    flush / close     write out buffered sessions / release connections (on shutdown)
+
+The async methods default to running the sync ones in a worker thread; backends with an
+async-native client override them. set_field/get_field default to a whole-session get + put;
+SQLite overrides them with JSON1 json_set/json_extract on the collected_data column, Redis
+with an HSET/HMGET of one hash field.
+
+Backends (SESSION_STORE):
+    sqlite  SQLiteSessionStore: the REGISTRATION_DB_FILE on local disk (single node)
+    redis   RedisSessionStore (app/db/redis_store.py): any Redis-protocol server at REDIS_URL,
+            shared by every worker and node
+"""
+
+SESSION_STORE = os.getenv("SESSION_STORE", "sqlite")
+
+
+class SessionStore(ABC):
+    """Abstract base class for session backends."""
+
+    name = "base"
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict]:
+        pass
+
+    @abstractmethod
+    def put(self, session_id: str, collected_data: dict, current_question: str, current_node: str):
+        pass
+
+    @abstractmethod
+    def put_many(self, sessions: List[Dict]):
+        pass
+
+    @abstractmethod
+    def fetch_page(
+        self,
+        cursor: Any,
+        limit: int,
+        current_node: Optional[str] = None,
+        completed: Optional[bool] = None,
+    ) -> Tuple[List[Dict], Any]:
+        pass
+
+    def set_field(
+        self,
+        session_id: str,
+        field: str,
+        value: Any,
+        current_question: Optional[str] = None,
+        current_node: Optional[str] = None,
+    ) -> bool:
+        session = self.get(session_id)
+        if session is None:
+            return False
+        session["collected_data"][field] = value
+        self.put(
+            session_id,
+            session["collected_data"],
+            session["current_question"] if current_question is None else current_question,
+            session["current_node"] if current_node is None else current_node,
+        )
+        return True
+
+    def get_field(self, session_id: str, field: str) -> Any:
+        session = self.get(session_id)
+        return None if session is None else session["collected_data"].get(field)
+
+    async def aget(self, session_id: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self.get, session_id)
+
+    async def aget_with_updated_at(self, session_id: str) -> Tuple[Optional[Dict], Optional[float]]:
+        """Backends that keep no write time return None for it."""
+        return await self.aget(session_id), None
+
+    async def aput(self, session_id: str, collected_data: dict, current_question: str, current_node: str):
+        await asyncio.to_thread(self.put, session_id, collected_data, current_question, current_node)
+
+    async def aset_field(
+        self,
+        session_id: str,
+        field: str,
+        value: Any,
+        current_question: Optional[str] = None,
+        current_node: Optional[str] = None,
+    ) -> bool:
+        session = await self.aget(session_id)
+        if session is None:
+            return False
+        session["collected_data"][field] = value
+        await self.aput(
+            session_id,
+            session["collected_data"],
+            session["current_question"] if current_question is None else current_question,
+            session["current_node"] if current_node is None else current_node,
+        )
+        return True
+
+    async def aget_field(self, session_id: str, field: str) -> Any:
+        session = await self.aget(session_id)
+        return None if session is None else session["collected_data"].get(field)
+
+    def flush(self) -> int:
+        """Writes out buffered sessions; returns how many. Only buffering stores override this."""
+        return 0
+
+    async def aclose(self):
+        """Releases async connections; called on shutdown before close()."""
+        pass
+
+    def close(self):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class SQLiteSessionStore(SessionStore):
+    """The sessions table in REGISTRATION_DB_FILE (pooled WAL connections, see sqlite_pool.py)."""
+
+    name = "sqlite"
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        return sqlite_db.fetch_session_from_db(session_id)
+
+    def put(self, session_id: str, collected_data: dict, current_question: str, current_node: str):
+        sqlite_db.upsert_session_to_db(session_id, collected_data, current_question, current_node)
+
+    def put_many(self, sessions: List[Dict]):
+        sqlite_db.upsert_sessions_batch(sessions)
+
+    def set_field(self, session_id, field, value, current_question=None, current_node=None) -> bool:
+        return sqlite_db.update_session_field(session_id, field, value, current_question, current_node)
+
+    def get_field(self, session_id: str, field: str) -> Any:
+        return sqlite_db.fetch_session_field(session_id, field)
+
+    def fetch_page(self, cursor, limit, current_node=None, completed=None):
+        sessions, last_rowid = sqlite_db.fetch_sessions_page(cursor or 0, limit, current_node, completed)
+        return sessions, (last_rowid if sessions else None)
+
+    async def aget(self, session_id: str) -> Optional[Dict]:
+        return await sqlite_db.afetch_session_from_db(session_id)  # also records STAGE_LATENCY
+
+    async def aget_with_updated_at(self, session_id: str) -> Tuple[Optional[Dict], Optional[float]]:
+        return await sqlite_db.afetch_session_with_updated_at(session_id)
+
+    async def aput(self, session_id: str, collected_data: dict, current_question: str, current_node: str):
+        await sqlite_db.aupsert_session_to_db(session_id, collected_data, current_question, current_node)
+
+    async def aset_field(self, session_id, field, value, current_question=None, current_node=None) -> bool:
+        return await sqlite_db.aupdate_session_field(session_id, field, value, current_question, current_node)
+
+    async def aget_field(self, session_id: str, field: str) -> Any:
+        return await sqlite_db.afetch_session_field(session_id, field)
@@ -0,0 +1,256 @@
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict
+from app.db.sqlite_db import (
+    DB_FILE,
+    COMPLETED_NODE,
+    enable_incremental_vacuum,
+    incremental_vacuum_enabled,
+    session_expiry_cutoffs,
+)
+from app.db.sqlite_pool import get_connection, run_with_retry
+from app.helpers.metrics import registry
+
+"""_summary_
+Summary: Background sweeper that deletes expired sessions and compacts the SQLite file.
+
+Every SESSION_SWEEP_INTERVAL seconds it:
+    1. deletes expired sessions (SESSION_TTL_ABANDONED / SESSION_TTL_COMPLETED since the last
+       update) and expired validation_cache rows, SESSION_SWEEP_BATCH_SIZE rows per transaction,
+       pausing between batches so request writes are never queued behind a long write lock
+    2. runs PRAGMA incremental_vacuum, releasing up to SESSION_VACUUM_PAGES free pages per
+       step, so the file shrinks instead of keeping its high-water mark
+
+Counters (rows swept, bytes reclaimed, file size) are served by GET /session_stats and, once
+the sweeper has started, /metrics. The /metrics collector reads the file size recorded by the
+last sweep, so a scrape never touches the database.
+
+Step 2 needs auto_vacuum=INCREMENTAL, which new files get from init_db. A file created before
+that needs a one-off rebuild; run it with the app stopped (VACUUM locks the whole database):
+    python -m app.db.session_sweeper --enable-incremental-vacuum
+Without it, expired rows are still deleted and their pages reused, but the file does not shrink.
+Running the module without the flag does one sweep now and prints what it removed.
+"""
+
+SESSION_SWEEPER_ENABLED = os.getenv("SESSION_SWEEPER_ENABLED", "True").lower() in ("true", "1")
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "300"))
+SESSION_SWEEP_BATCH_SIZE = int(os.getenv("SESSION_SWEEP_BATCH_SIZE", "500"))
+SESSION_SWEEP_PAUSE = float(os.getenv("SESSION_SWEEP_PAUSE", "0.01"))
+SESSION_VACUUM_PAGES = int(os.getenv("SESSION_VACUUM_PAGES", "1000"))
+
+EXPIRED_SESSIONS = """
+    DELETE FROM sessions WHERE rowid IN (
+        SELECT rowid FROM sessions
+        WHERE updated_at < ? AND (
+            (current_node != ? AND updated_at < ?) OR (current_node = ? AND updated_at < ?)
+        )
+        LIMIT ?
+    )
+"""
+EXPIRED_CACHE_ROWS = """
+    DELETE FROM validation_cache WHERE rowid IN (
+        SELECT rowid FROM validation_cache WHERE expires_at < ? LIMIT ?
+    )
+"""
+
+
+class SessionSweeper:
+    def __init__(self, db_file: str, interval: float, batch_size: int, pause: float, vacuum_pages: int):
+        self.db_file = db_file
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self.vacuum_pages = vacuum_pages
+        self._lock = threading.Lock()
+        self._stats = {
+            "sweeps": 0,
+            "sessions_swept": 0,
+            "cache_rows_swept": 0,
+            "delete_batches": 0,
+            "pages_reclaimed": 0,
+            "bytes_reclaimed": 0,
+            "errors": 0,
+            "last_sweep_at": None,
+            "last_sweep_seconds": None,
+            "db_bytes": 0,
+            "free_bytes": 0,
+        }
+        self._stop = threading.Event()
+        self._thread = None
+        self._collector_registered = False
+
+    def start(self):
+        conn = get_connection(self.db_file)
+        if not incremental_vacuum_enabled(conn):
+            logging.warning(
+                f"{self.db_file} was created without auto_vacuum=INCREMENTAL, so sweeps will not shrink it; "
+                "run python -m app.db.session_sweeper --enable-incremental-vacuum with the app stopped"
+            )
+        self._record_size(conn)
+        if not self._collector_registered:
+            registry.add_collector(self.collect_metrics)
+            self._collector_registered = True
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="session-sweeper", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stops after the current batch (called on shutdown)."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                with self._lock:
+                    self._stats["errors"] += 1
+                logging.error(f"Session sweep failed: {e}")
+
+    def _delete_in_batches(self, sql: str, params_for_batch) -> int:
+        """Runs a batched DELETE until a batch comes back short; one short transaction per batch."""
+        conn = get_connection(self.db_file)
+        total = 0
+        while not self._stop.is_set():
+
+            def delete():
+                with conn:
+                    return conn.execute(sql, params_for_batch()).rowcount
+
+            deleted = run_with_retry(delete)
+            total += deleted
+            with self._lock:
+                self._stats["delete_batches"] += 1
+            if deleted < self.batch_size:
+                break
+            time.sleep(self.pause)  # let request writes in between batches
+        return total
+
+    def _incremental_vacuum(self) -> int:
+        """Releases free pages back to the OS; returns the number of pages reclaimed."""
+        conn = get_connection(self.db_file)
+        reclaimed = 0
+        while not self._stop.is_set():
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free_pages == 0:
+                break
+            before = conn.execute("PRAGMA page_count").fetchone()[0]
+            # executescript steps the pragma to completion; execute() would free a single page.
+            run_with_retry(lambda: conn.executescript(f"PRAGMA incremental_vacuum({self.vacuum_pages});"))
+            released = before - conn.execute("PRAGMA page_count").fetchone()[0]
+            if released <= 0:
+                break
+            reclaimed += released
+            time.sleep(self.pause)
+        return reclaimed
+
+    def _record_size(self, conn):
+        """Stores the file size and free space, for /metrics scrapes between sweeps."""
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        db_bytes = conn.execute("PRAGMA page_count").fetchone()[0] * page_size
+        free_bytes = conn.execute("PRAGMA freelist_count").fetchone()[0] * page_size
+        with self._lock:
+            self._stats["db_bytes"] = db_bytes
+            self._stats["free_bytes"] = free_bytes
+
+    def sweep(self) -> Dict[str, int]:
+        """One full pass: delete expired rows, then compact. Returns what this pass removed."""
+        start = time.perf_counter()
+        now = time.time()
+        abandoned_cutoff, completed_cutoff = session_expiry_cutoffs(now)
+        sessions = self._delete_in_batches(
+            EXPIRED_SESSIONS,
+            lambda: (
+                max(abandoned_cutoff, completed_cutoff),
+                COMPLETED_NODE,
+                abandoned_cutoff,
+                COMPLETED_NODE,
+                completed_cutoff,
+                self.batch_size,
+            ),
+        )
+        cache_rows = self._delete_in_batches(EXPIRED_CACHE_ROWS, lambda: (now, self.batch_size))
+        pages = self._incremental_vacuum()
+        conn = get_connection(self.db_file)
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        self._record_size(conn)
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._stats["sweeps"] += 1
+            self._stats["sessions_swept"] += sessions
+            self._stats["cache_rows_swept"] += cache_rows
+            self._stats["pages_reclaimed"] += pages
+            self._stats["bytes_reclaimed"] += pages * page_size
+            self._stats["last_sweep_at"] = now
+            self._stats["last_sweep_seconds"] = round(elapsed, 4)
+        if sessions or cache_rows:
+            logging.info(
+                f"Session sweep: {sessions} sessions, {cache_rows} cache rows deleted, "
+                f"{pages * page_size} bytes reclaimed in {elapsed:.3f}s"
+            )
+        return {"sessions_swept": sessions, "cache_rows_swept": cache_rows, "bytes_reclaimed": pages * page_size}
+
+    def snapshot(self) -> Dict[str, float]:
+        """The counters and the file size as of the last sweep, without querying the database."""
+        with self._lock:
+            return dict(self._stats)
+
+    def stats(self) -> Dict[str, float]:
+        """snapshot() with a live session count and file size (for /session_stats)."""
+        conn = get_connection(self.db_file)
+        self._record_size(conn)
+        stats = self.snapshot()
+        stats["sessions"] = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        stats["incremental_vacuum"] = incremental_vacuum_enabled(conn)
+        return stats
+
+    def collect_metrics(self):
+        stats = self.snapshot()
+        lines = []
+        for name, kind, help_text in (
+            ("sessions_swept", "counter", "Expired sessions deleted by the sweeper."),
+            ("cache_rows_swept", "counter", "Expired validation cache rows deleted by the sweeper."),
+            ("bytes_reclaimed", "counter", "Bytes released by incremental vacuum."),
+            ("db_bytes", "gauge", "Size of the SQLite database file at the last sweep."),
+            ("free_bytes", "gauge", "Free pages not yet released by incremental vacuum, at the last sweep."),
+        ):
+            metric = f"registration_sqlite_{name}" + ("_total" if kind == "counter" else "")
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}", f"{metric} {stats[name]}"]
+        return lines
+
+
+session_sweeper = SessionSweeper(
+    DB_FILE,
+    interval=SESSION_SWEEP_INTERVAL,
+    batch_size=SESSION_SWEEP_BATCH_SIZE,
+    pause=SESSION_SWEEP_PAUSE,
+    vacuum_pages=SESSION_VACUUM_PAGES,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweeps expired sessions from REGISTRATION_DB_FILE once.")
+    parser.add_argument(
+        "--enable-incremental-vacuum",
+        action="store_true",
+        help="first rebuild a file created without auto_vacuum=INCREMENTAL (stop the app before)",
+    )
+    args = parser.parse_args(argv)
+    if args.enable_incremental_vacuum:
+        start = time.perf_counter()
+        enable_incremental_vacuum(session_sweeper.db_file)
+        print(f"auto_vacuum=INCREMENTAL enabled in {time.perf_counter() - start:.1f}s")
+    print(json.dumps(session_sweeper.sweep()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,29 @@
 import sqlite3
 import json
-from typing import Optional
+import asyncio
+import logging
+import os
+from typing import Optional, Tuple
 
 
 from dataclasses import dataclass
+from app.db.sqlite_pool import get_connection, run_with_retry
+from app.helpers.metrics import STAGE_LATENCY
+import time
 
 ################################################################
 ### Define SQLite database file in Render, different from local environment.
 ### and /app is not writable, recommended to use tmp/
 # DB_FILE = "./db/registration.db"
-DB_FILE = "/tmp/registration.db"
+DB_FILE = os.getenv("REGISTRATION_DB_FILE", "/tmp/registration.db")
 ##################################################################
 
+# Sessions expire this many seconds after their last update (0 = never).
+# Abandoned sessions include every auto-started Streamlit session that was never answered.
+SESSION_TTL_ABANDONED = float(os.getenv("SESSION_TTL_ABANDONED", str(24 * 3600)))
+SESSION_TTL_COMPLETED = float(os.getenv("SESSION_TTL_COMPLETED", str(30 * 24 * 3600)))
+COMPLETED_NODE = "__end__"  # langgraph.graph.END
+
 
 @dataclass
 class RegistrationState:
@@ -20,10 +32,52 @@ class RegistrationState:
     current_question: str
     current_node: str
 
-import os
+def _migrate_sessions(conn: sqlite3.Connection):
+    """Adds created_at/updated_at to databases created before session expiry existed."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+    if "created_at" not in columns:
+        now = time.time()
+        with conn:
+            conn.execute("ALTER TABLE sessions ADD COLUMN created_at REAL")
+            conn.execute("ALTER TABLE sessions ADD COLUMN updated_at REAL")
+            # Existing rows start their TTL now rather than expiring all at once.
+            conn.execute("UPDATE sessions SET created_at = ?, updated_at = ?", (now, now))
+
+
+def incremental_vacuum_enabled(conn: sqlite3.Connection) -> bool:
+    return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def enable_incremental_vacuum(db_file: str = DB_FILE):
+    """
+    Rebuilds a file created before auto_vacuum=INCREMENTAL (a one-off VACUUM), so the sweeper can
+    hand free pages back to the OS. VACUUM locks the whole database and rewrites the file, so this
+    is not run at startup: run it with the app stopped, via
+    python -m app.db.session_sweeper --enable-incremental-vacuum
+    """
+    conn = get_connection(db_file)
+    if incremental_vacuum_enabled(conn):
+        return
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("VACUUM")
+
+
+def _enable_incremental_vacuum_on_new_file(conn: sqlite3.Connection):
+    """New files get auto_vacuum=INCREMENTAL; their VACUUM is instant, as they hold no tables yet."""
+    if incremental_vacuum_enabled(conn) or conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0]:
+        return  # already on, or an existing file (see enable_incremental_vacuum)
+    try:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+    except sqlite3.OperationalError as e:  # e.g. another worker is creating the same file
+        logging.warning(f"Could not enable incremental vacuum on {DB_FILE}: {e}")
+
+
 def init_db():
-    os.makedirs(os.path.dirname(DB_FILE), exist_ok=True)
-    with sqlite3.connect(DB_FILE) as conn:
+    os.makedirs(os.path.dirname(DB_FILE) or ".", exist_ok=True)
+    conn = get_connection(DB_FILE)
+    _enable_incremental_vacuum_on_new_file(conn)
+    with conn:
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -31,11 +85,33 @@ def init_db():
                 session_id TEXT PRIMARY KEY,
                 collected_data TEXT,
                 current_question TEXT,
-                current_node TEXT
+                current_node TEXT,
+                created_at REAL,
+                updated_at REAL
+            )
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS validation_cache (
+                cache_key TEXT PRIMARY KEY,
+                engine TEXT,
+                result TEXT,
+                expires_at REAL
             )
             """
         )
-        conn.commit()
+    _migrate_sessions(conn)
+    with conn:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_created_at ON sessions (created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_validation_cache_expires_at ON validation_cache (expires_at)")
+
+def session_expiry_cutoffs(now: float):
+    """(abandoned_cutoff, completed_cutoff): sessions last updated before their cutoff have expired."""
+    abandoned = now - SESSION_TTL_ABANDONED if SESSION_TTL_ABANDONED > 0 else 0.0
+    completed = now - SESSION_TTL_COMPLETED if SESSION_TTL_COMPLETED > 0 else 0.0
+    return abandoned, completed
 
 def upsert_session_to_db(session_id: str,
                          collected_data: dict,
@@ -44,39 +120,264 @@ def upsert_session_to_db(session_id: str,
                          ):
 
     collected_data_json = json.dumps(collected_data) 
-    with sqlite3.connect(DB_FILE) as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT INTO sessions (session_id, collected_data, current_question, current_node)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(session_id) DO UPDATE SET
-                collected_data = excluded.collected_data,
-                current_question = excluded.current_question,
-                current_node = excluded.current_node
-            """,
-            (session_id, collected_data_json, current_question, current_node), 
+    now = time.time()
+
+    def write():
+        conn = get_connection(DB_FILE)
+        with conn:  # commits, or rolls back on error
+            conn.execute(
+                """
+                INSERT INTO sessions (session_id, collected_data, current_question, current_node, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    collected_data = excluded.collected_data,
+                    current_question = excluded.current_question,
+                    current_node = excluded.current_node,
+                    updated_at = excluded.updated_at
+                """,
+                (session_id, collected_data_json, current_question, current_node, now, now), 
+            )
+
+    run_with_retry(write)
+
+def upsert_sessions_batch(sessions: list):
+    """Upserts many sessions (dicts shaped like fetch_session_from_db's result) in one transaction."""
+    now = time.time()
+    rows = [
+        (
+            session["session_id"],
+            json.dumps(session["collected_data"]),
+            session["current_question"],
+            session["current_node"],
+            now,
+            now,
         )
-        conn.commit()
+        for session in sessions
+    ]
+    if not rows:
+        return
+
+    def write():
+        conn = get_connection(DB_FILE)
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO sessions (session_id, collected_data, current_question, current_node, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    collected_data = excluded.collected_data,
+                    current_question = excluded.current_question,
+                    current_node = excluded.current_node,
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
+
+    run_with_retry(write)
+
+def _field_path(field: str) -> str:
+    """JSON1 path for one top-level key of collected_data."""
+    if '"' in field:
+        raise ValueError(f"Invalid field name: {field}")
+    return f'$."{field}"'
+
+def update_session_field(session_id: str,
+                         field: str,
+                         value,
+                         current_question: Optional[str] = None,
+                         current_node: Optional[str] = None
+                         ) -> bool:
+    """
+    Sets one key of collected_data in place with json_set (and, if given, moves the session to
+    current_question/current_node), without reading the row or re-serializing the other answers.
+    Returns False if the session does not exist.
+    """
+    value_json = json.dumps(value)
+    path = _field_path(field)
+    now = time.time()
+
+    def write():
+        conn = get_connection(DB_FILE)
+        with conn:
+            return conn.execute(
+                """
+                UPDATE sessions SET
+                    collected_data = json_set(collected_data, ?, json(?)),
+                    current_question = COALESCE(?, current_question),
+                    current_node = COALESCE(?, current_node),
+                    updated_at = ?
+                WHERE session_id = ?
+                """,
+                (path, value_json, current_question, current_node, now, session_id),
+            ).rowcount
+
+    return run_with_retry(write) > 0
+
+def fetch_session_field(session_id: str, field: str):
+    """Reads one key of collected_data with json_extract; None if the session or key is missing."""
+    path = _field_path(field)
+    conn = get_connection(DB_FILE)
+    result = conn.execute(
+        """
+        SELECT json_type(collected_data, ?), json_extract(collected_data, ?), current_node, updated_at
+        FROM sessions WHERE session_id = ?
+        """,
+        (path, path, session_id),
+    ).fetchone()
+
+    if not result:
+        return None
+    value_type, value, current_node, updated_at = result
+    abandoned_cutoff, completed_cutoff = session_expiry_cutoffs(time.time())
+    if updated_at < (completed_cutoff if current_node == COMPLETED_NODE else abandoned_cutoff):
+        return None
+    if value_type in ("object", "array"):
+        return json.loads(value)  # json_extract returns nested values as JSON text
+    if value_type in ("true", "false"):
+        return value_type == "true"
+    return value
 
 def fetch_session_from_db(session_id: str) -> Optional[dict]:
-    with sqlite3.connect(DB_FILE) as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT session_id, collected_data, current_question, current_node FROM sessions WHERE session_id = ?",
-            (session_id,),
-        )
-        result = cursor.fetchone()
+    return fetch_session_with_updated_at(session_id)[0]
+
+def fetch_session_with_updated_at(session_id: str) -> Tuple[Optional[dict], Optional[float]]:
+    """The session and the epoch seconds of its last write (for the session cache), or (None, None)."""
+    conn = get_connection(DB_FILE)
+    result = conn.execute(
+        "SELECT session_id, collected_data, current_question, current_node, updated_at FROM sessions WHERE session_id = ?",
+        (session_id,),
+    ).fetchone()
 
     if result:
-        session_id, collected_data_json, current_question, current_node = result
+        session_id, collected_data_json, current_question, current_node, updated_at = result
+        abandoned_cutoff, completed_cutoff = session_expiry_cutoffs(time.time())
+        if updated_at < (completed_cutoff if current_node == COMPLETED_NODE else abandoned_cutoff):
+            return None, None  # expired, not yet swept
         collected_data = json.loads(collected_data_json)
-        return {
+        session = {
             "session_id": session_id,
             "collected_data": collected_data,
             "current_question": current_question,
             "current_node": current_node,
         }
+        return session, updated_at
+    return None, None
+
+def fetch_sessions_page(after_rowid: int,
+                        limit: int,
+                        current_node: Optional[str] = None,
+                        completed: Optional[bool] = None,
+                        completed_node: str = COMPLETED_NODE):
+    """
+    Keyset-paginated read of the sessions table: returns (sessions, last_rowid).
+    Each page is an independent query, so a caller can stream any table size in fixed batches
+    without holding a read transaction open between pages.
+    """
+    clauses, params = ["rowid > ?"], [after_rowid]
+    if current_node is not None:
+        clauses.append("current_node = ?")
+        params.append(current_node)
+    if completed is True:
+        clauses.append("current_node = ?")
+        params.append(completed_node)
+    elif completed is False:
+        clauses.append("current_node != ?")
+        params.append(completed_node)
+    params.append(limit)
+
+    conn = get_connection(DB_FILE)
+    rows = conn.execute(
+        f"""
+        SELECT rowid, session_id, collected_data, current_question, current_node
+        FROM sessions WHERE {" AND ".join(clauses)}
+        ORDER BY rowid LIMIT ?
+        """,
+        params,
+    ).fetchall()
+
+    sessions = [
+        {
+            "session_id": session_id,
+            "collected_data": json.loads(collected_data_json),
+            "current_question": current_question,
+            "current_node": current_node,
+        }
+        for _, session_id, collected_data_json, current_question, current_node in rows
+    ]
+    return sessions, (rows[-1][0] if rows else after_rowid)
+
+async def aupsert_session_to_db(session_id: str,
+                                collected_data: dict,
+                                current_question: str,
+                                current_node: str
+                                ):
+    """Non-blocking upsert: runs the SQLite write in a worker thread."""
+    start = time.perf_counter()
+    await asyncio.to_thread(
+        upsert_session_to_db, session_id, collected_data, current_question, current_node
+    )
+    STAGE_LATENCY.observe(("upsert_session_to_db", ""), time.perf_counter() - start)
+
+async def afetch_session_from_db(session_id: str) -> Optional[dict]:
+    """Non-blocking fetch: runs the SQLite read in a worker thread."""
+    return (await afetch_session_with_updated_at(session_id))[0]
+
+async def afetch_session_with_updated_at(session_id: str) -> Tuple[Optional[dict], Optional[float]]:
+    start = time.perf_counter()
+    result = await asyncio.to_thread(fetch_session_with_updated_at, session_id)
+    STAGE_LATENCY.observe(("fetch_session_from_db", ""), time.perf_counter() - start)
+    return result
+
+async def aupdate_session_field(session_id: str,
+                                field: str,
+                                value,
+                                current_question: Optional[str] = None,
+                                current_node: Optional[str] = None
+                                ) -> bool:
+    """Non-blocking single-field update: runs the SQLite write in a worker thread."""
+    start = time.perf_counter()
+    updated = await asyncio.to_thread(
+        update_session_field, session_id, field, value, current_question, current_node
+    )
+    STAGE_LATENCY.observe(("update_session_field", ""), time.perf_counter() - start)
+    return updated
+
+async def afetch_session_field(session_id: str, field: str):
+    """Non-blocking single-field read: runs the SQLite read in a worker thread."""
+    start = time.perf_counter()
+    value = await asyncio.to_thread(fetch_session_field, session_id, field)
+    STAGE_LATENCY.observe(("fetch_session_field", ""), time.perf_counter() - start)
+    return value
+
+def fetch_cached_validation(cache_key: str, now: float) -> Optional[dict]:
+    """Returns a cached validation result, or None if missing or expired."""
+    conn = get_connection(DB_FILE)
+    row = conn.execute(
+        "SELECT result, expires_at FROM validation_cache WHERE cache_key = ?",
+        (cache_key,),
+    ).fetchone()
+
+    if row and row[1] > now:
+        return json.loads(row[0])
     return None
 
+def upsert_cached_validation(cache_key: str, engine: str, result: dict, expires_at: float):
+    result_json = json.dumps(result)
+
+    def write():
+        conn = get_connection(DB_FILE)
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO validation_cache (cache_key, engine, result, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    result = excluded.result,
+                    expires_at = excluded.expires_at
+                """,
+                (cache_key, engine, result_json, expires_at),
+            )
+
+    run_with_retry(write)
+
 init_db()
\ No newline at end of file
@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import threading
+import time
+import logging
+import random
+
+"""_summary_
+Summary: Per-thread SQLite connections with WAL mode and tuned pragmas.
+
+Opening a new sqlite3 connection for every read/write costs a file open, schema parse
+and (in rollback-journal mode) an exclusive lock on every commit. Instead each thread
+keeps one connection per database file, configured once:
+
+    journal_mode = WAL      readers never block writers, writers append to the WAL
+    synchronous  = NORMAL   fsync on checkpoint only (safe with WAL)
+    cache_size / mmap_size  keep hot pages in memory
+    busy_timeout            wait for a competing writer instead of failing immediately
+
+Writes that still hit "database is locked" are retried with jittered backoff.
+"""
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_LOCK_RETRIES = int(os.getenv("SQLITE_LOCK_RETRIES", "5"))
+
+_local = threading.local()
+_all_connections = []
+_all_lock = threading.Lock()
+_generation = 0  # bumped by close_all_connections so threads drop their closed handles
+
+
+def _configure(conn: sqlite3.Connection):
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+
+def get_connection(db_file: str) -> sqlite3.Connection:
+    """Returns this thread's connection to db_file, opening and configuring it on first use."""
+    connections = getattr(_local, "connections", None)
+    if connections is None or _local.generation != _generation:
+        connections = _local.connections = {}
+        _local.generation = _generation
+
+    conn = connections.get(db_file)
+    if conn is None:
+        conn = sqlite3.connect(
+            db_file,
+            timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,  # only so close_all_connections can run at shutdown
+        )
+        _configure(conn)
+        connections[db_file] = conn
+        with _all_lock:
+            _all_connections.append(conn)
+    return conn
+
+
+def run_with_retry(operation, retries: int = SQLITE_LOCK_RETRIES):
+    """Runs operation(), retrying with jittered backoff while the database is locked."""
+    for attempt in range(retries + 1):
+        try:
+            return operation()
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            if attempt == retries:
+                logging.error(f"SQLite still locked after {retries} retries: {e}")
+                raise
+            time.sleep(min(0.01 * (2 ** attempt), 0.5) * random.uniform(0.5, 1.5))
+
+
+def close_all_connections():
+    """Closes every pooled connection (called on application shutdown)."""
+    global _generation
+    with _all_lock:
+        connections = list(_all_connections)
+        _all_connections.clear()
+        _generation += 1
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
@@ -1,7 +1,9 @@
 from langgraph.graph import StateGraph # creating stateful graph-based workflows.
-from langgraph.graph import END
+from langgraph.graph import END, START
+from dataclasses import fields, is_dataclass
 
 from app.helpers.config import GRAPH_OUTPUT_DIR
+import hashlib
 import logging
 import os
 
@@ -29,6 +31,7 @@ class BaseGraphManager:
         self.graph = StateGraph(state_class) 
         self._build_graph()
         self.compiled_graph = self.graph.compile() 
+        self._compile_transitions()
 
 
     def _ask_question(self, state, question_text: str):
@@ -62,21 +65,83 @@ class BaseGraphManager:
 
 
 
+    def _compile_transitions(self):
+        """
+        Compiles the graph's edges and conditional edges into a transition table, once:
+            self.transitions = {
+                "ask_email": ("edge", "ask_name"),
+                "ask_name": ("branch", path_runnable, {"ask_address": "ask_address", ...}),
+                "ask_password": ("edge", END),
+            }
+        so the next node is resolved from current_node + state in O(1),
+        instead of replaying the stream from the entry point.
+        """
+        self.transitions = {}
+        self.entry_node = None
+        for start, end in self.graph.edges:
+            if start == START:
+                self.entry_node = end
+            else:
+                self.transitions[start] = ("edge", end)
+
+        for source, branches in self.graph.branches.items():
+            if len(branches) > 1:
+                raise ValueError(f"[{self.name}] Node {source} has more than one conditional edge.")
+            for branch in branches.values():
+                self.transitions[source] = ("branch", branch.path, branch.ends)
+
+        self.node_runnables = {key: spec.runnable for key, spec in self.graph.nodes.items()}
+
+    def _to_state_object(self, state: dict):
+        """Coerces a session dict into the graph's state class, as LangGraph does for stream input."""
+        if is_dataclass(self.state_class):
+            return self.state_class(**{f.name: state.get(f.name) for f in fields(self.state_class)})
+        return state
+
+    def _run_node(self, node_key: str, state_obj):
+        if node_key is None or node_key == END:
+            return None
+        return {node_key: self.node_runnables[node_key].invoke(state_obj)}
+
+    def next_node(self, current_node: str, state: dict):
+        """Resolves the node after current_node from the transition table (END if finished)."""
+        transition = self.transitions.get(current_node)
+        if transition is None:
+            return None
+        if transition[0] == "edge":
+            return transition[1]
+        _, path, path_map = transition
+        target = path.invoke(self._to_state_object(state))
+        return path_map.get(target, target) if path_map else target
+
+    def start_graph(self, state: dict):
+        """Returns the entry node's output, e.g. {"ask_email": {"current_question": ...}}."""
+        return self._run_node(self.entry_node, self._to_state_object(state))
+
     def resume_and_step_graph(self, state: dict): 
         """Resumes the graph from the current node and advances exactly one step."""
         current_node = state.get("current_node")
-        """state is likely a db:
-        ...return {
-            "session_id": session_id,
-            "collected_data": collected_data,
-            "current_question": current_question,
-            "current_node": current_node, # <------------ hints above
-        }
-        """
-        execution = self.compiled_graph.stream(state) 
+        logging.info(f"[{self.name}] Resuming graph at: {current_node}")
 
+        if not current_node:
+            return self.start_graph(state)
 
-        logging.info(f"[{self.name}] Resuming graph at: {current_node}")
+        next_node = self.next_node(current_node, state)
+        if next_node is None or next_node == END:
+            logging.info(f"[{self.name}] Graph execution completed.")
+            return None
+        return self._run_node(next_node, self._to_state_object(state))
+
+    def replay_and_step_graph(self, state: dict, recursion_limit: int = None):
+        """
+        The original stepping strategy: replays compiled_graph.stream(state) from the
+        entry point until current_node, then takes one more step. O(question index);
+        kept for comparison in app/benchmarks/graph_step_bench.py.
+        Graphs with more than 25 nodes need a higher recursion_limit.
+        """
+        current_node = state.get("current_node")
+        config = {"recursion_limit": recursion_limit} if recursion_limit else None
+        execution = self.compiled_graph.stream(state, config) 
 
         if not current_node:
 
@@ -95,19 +160,32 @@ class BaseGraphManager:
                     return None
         return None
 
-    def generate_mermaid_diagram(self, filename="graph.png"):
-        """Generate a Mermaid diagram PNG from the compiled LangGraph."""
+    def graph_hash(self) -> str:
+        """Short hash of the graph's Mermaid source; changes whenever nodes or edges change."""
+        mermaid_source = self.compiled_graph.get_graph().draw_mermaid()
+        return hashlib.sha256(mermaid_source.encode("utf-8")).hexdigest()[:16]
 
-        os.makedirs(GRAPH_OUTPUT_DIR, exist_ok=True)
-
-        png_data = self.compiled_graph.get_graph().draw_mermaid_png()
+    def generate_mermaid_diagram(self, filename=None):
+        """
+        Generate a Mermaid diagram PNG from the compiled LangGraph.
+        The PNG is cached on disk as <name>_<graph hash>.png, so it is rendered
+        (a network call to mermaid.ink) only once per graph version.
+        """
 
+        os.makedirs(GRAPH_OUTPUT_DIR, exist_ok=True)
 
+        filename = filename or f"{self.name}_{self.graph_hash()}.png"
         png_file = os.path.join(GRAPH_OUTPUT_DIR, filename)
+        if os.path.exists(png_file):
+            return png_file
 
+        png_data = self.compiled_graph.get_graph().draw_mermaid_png()
 
-        with open(png_file, "wb") as f:  
+        # Write then rename, so a concurrent request never serves a partial file.
+        tmp_file = f"{png_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as f:  
             f.write(png_data)
+        os.replace(tmp_file, png_file)
 
         logging.info(f"Graph saved at: {png_file}")
         return png_file
@@ -3,6 +3,18 @@ from app.db.sqlite_db import RegistrationState
 from app.graph.base_graph import BaseGraphManager
 import logging
 
+registration_questions = {
+    "ask_email": "What is your email address?",
+    "ask_name": "What is your full name?",
+    "ask_address": "What is your address?",
+    "ask_phone": "What is your phone number?",
+    "ask_username": "Choose a username.",
+    "ask_password": "Choose a strong password.",
+}
+
+# Questions the user may skip; a skipped answer is stored as "-".
+OPTIONAL_QUESTIONS = ("ask_address", "ask_phone")
+
 
 class RegistrationGraphManager(BaseGraphManager):
     """Specialized graph manager with domain-specific (registration) logic."""
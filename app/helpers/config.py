@@ -6,8 +6,84 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY") # gpt-4.1-mini
 if not OPENAI_API_KEY:
     raise ValueError("Missing OpenAI API key. Set the OPENAI_API_KEY environment variable.")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # e.g. the local fake server in app/loadtest; None = api.openai.com
 VALIDATION_ENGINE = os.getenv("VALIDATION_ENGINE", "dspy") # chatgpt or dspy
 MLFLOW_ENABLED = os.getenv("MLFLOW_ENABLED", "False").lower() in ("true", "1")
 MLFLOW_EXPERIMENT_NAME = os.getenv("MLFLOW_EXPERIMENT_NAME", "DefaultExperiment")
 GRAPH_OUTPUT_DIR = os.getenv("LangGraph_Output", "/tmp/LangGraph_Output")
+# DSPy engine: per-question signatures carrying only that field's formatting rules.
+DSPY_COMPACT_SIGNATURES = os.getenv("DSPY_COMPACT_SIGNATURES", "True").lower() in ("true", "1")
 
+
+# Run the deterministic ValidatedLLMResponse rules before calling the LLM.
+VALIDATION_FAST_PATH = os.getenv("VALIDATION_FAST_PATH", "True").lower() in ("true", "1")
+
+# Validation result cache (in-process LRU + shared SQLite table).
+VALIDATION_CACHE_ENABLED = os.getenv("VALIDATION_CACHE_ENABLED", "True").lower() in ("true", "1")
+VALIDATION_CACHE_SIZE = int(os.getenv("VALIDATION_CACHE_SIZE", "10000"))
+VALIDATION_CACHE_TTL = float(os.getenv("VALIDATION_CACHE_TTL", "86400"))  # seconds
+# Fields whose answers are secrets: never exported, and never cached by default.
+SENSITIVE_FIELDS = os.getenv("SENSITIVE_FIELDS", "password").split(",")
+VALIDATION_CACHE_EXCLUDE = os.getenv("VALIDATION_CACHE_EXCLUDE", ",".join(SENSITIVE_FIELDS)).split(",")  # never cached
+
+# Identical validation calls in flight at the same time share one LLM request.
+VALIDATION_COALESCE = os.getenv("VALIDATION_COALESCE", "True").lower() in ("true", "1")
+
+# Optional cross-session micro-batching: async validations arriving within the window
+# (or until the batch is full) are validated in one LLM call.
+VALIDATION_BATCHING = os.getenv("VALIDATION_BATCHING", "False").lower() in ("true", "1")
+VALIDATION_BATCH_WINDOW_MS = float(os.getenv("VALIDATION_BATCH_WINDOW_MS", "20"))
+VALIDATION_BATCH_MAX_SIZE = int(os.getenv("VALIDATION_BATCH_MAX_SIZE", "16"))
+
+# Hedged requests: if VALIDATION_ENGINE has not answered within the hedge delay (the given
+# percentile of its recent latencies), the same validation is also sent to
+# VALIDATION_HEDGE_ENGINE and the first usable answer wins. Empty = no hedging.
+VALIDATION_HEDGE_ENGINE = os.getenv("VALIDATION_HEDGE_ENGINE", "")  # chatgpt or dspy
+VALIDATION_HEDGE_PERCENTILE = float(os.getenv("VALIDATION_HEDGE_PERCENTILE", "95"))
+VALIDATION_HEDGE_DEFAULT_DELAY_MS = float(os.getenv("VALIDATION_HEDGE_DEFAULT_DELAY_MS", "1500"))  # until enough samples
+VALIDATION_HEDGE_MIN_DELAY_MS = float(os.getenv("VALIDATION_HEDGE_MIN_DELAY_MS", "100"))
+
+# Each LLM validation call is cut off after VALIDATION_TIMEOUT seconds. After
+# CIRCUIT_FAILURE_THRESHOLD consecutive failures/timeouts the circuit opens and answers are
+# validated by local rules only (marked degraded) until a probe succeeds, at most every
+# CIRCUIT_RESET_TIMEOUT seconds.
+VALIDATION_TIMEOUT = float(os.getenv("VALIDATION_TIMEOUT", "4.0"))  # seconds
+CIRCUIT_BREAKER_ENABLED = os.getenv("CIRCUIT_BREAKER_ENABLED", "True").lower() in ("true", "1")
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))  # seconds
+
+# Admission control (per worker): at most ADMISSION_MAX_IN_FLIGHT validations reach the LLM at
+# once; up to ADMISSION_MAX_QUEUE more wait, each at most ADMISSION_QUEUE_TIMEOUT seconds.
+# Beyond that /submit_response and /edit_field answer 429 with Retry-After.
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "True").lower() in ("true", "1")
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5.0"))  # seconds, below the frontend's 10s timeout
+
+# Shared keep-alive HTTP pool used by the LLM clients.
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))  # seconds
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "30"))  # seconds
+
+# Bearer token for the admin endpoints (/bulk_import, /export). Empty = those endpoints are disabled.
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")
+
+# Bulk registration import: rows parsed per chunk, and max validations in flight.
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "500"))
+BULK_IMPORT_CONCURRENCY = int(os.getenv("BULK_IMPORT_CONCURRENCY", "8"))
+
+# Rows per batch when streaming /export.
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# Validation telemetry: records are queued and written in batches by a background thread.
+TELEMETRY_BACKEND = os.getenv("TELEMETRY_BACKEND", "mlflow" if MLFLOW_ENABLED else "none")  # mlflow, file or none
+TELEMETRY_FILE = os.getenv("TELEMETRY_FILE", "/tmp/telemetry/validations.jsonl")
+TELEMETRY_QUEUE_SIZE = int(os.getenv("TELEMETRY_QUEUE_SIZE", "10000"))
+TELEMETRY_BATCH_SIZE = int(os.getenv("TELEMETRY_BATCH_SIZE", "100"))
+TELEMETRY_FLUSH_INTERVAL = float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "2.0"))  # seconds
+TELEMETRY_DROP_POLICY = os.getenv("TELEMETRY_DROP_POLICY", "drop_newest")  # drop_newest, drop_oldest or block
+TELEMETRY_BLOCK_TIMEOUT = float(os.getenv("TELEMETRY_BLOCK_TIMEOUT", "0.05"))  # seconds, for "block"
+
+# Import the validation engine in a background thread at startup instead of on the first request.
+VALIDATOR_WARMUP = os.getenv("VALIDATOR_WARMUP", "True").lower() in ("true", "1")
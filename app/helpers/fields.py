@@ -0,0 +1,26 @@
+from typing import Optional
+from app.helpers.config import SENSITIVE_FIELDS
+
+"""_summary_
+Summary: Which registration field a question asks for, shared by the validators, the
+validation cache, telemetry and export (so the helpers never import the validation package).
+
+Example:
+    classify_question("What is your phone number?") -> "phone"
+    is_sensitive_question("Choose a strong password.") -> True (SENSITIVE_FIELDS=password)
+"""
+
+
+def classify_question(question: str) -> Optional[str]:
+    """Maps a question text to the field it asks for (email, name, address, phone, username, password)."""
+    question = (question or "").lower()
+    # Order matters: "username" contains "name".
+    for field in ("email", "phone", "address", "username", "password", "name"):
+        if field in question:
+            return field
+    return None
+
+
+def is_sensitive_question(question: str) -> bool:
+    """True if the question asks for a secret (SENSITIVE_FIELDS, e.g. the password)."""
+    return classify_question(question) in {field.strip().lower() for field in SENSITIVE_FIELDS}
@@ -0,0 +1,184 @@
+import bisect
+import threading
+import time
+from typing import Dict, List, Tuple
+
+"""_summary_
+Summary: Low-overhead Prometheus metrics (text exposition format), served by GET /metrics.
+
+Counters and histograms are sharded per thread: each thread increments its own list of
+numbers, so the hot path takes no lock and allocates nothing beyond the first observation
+per thread and label set. Shards are only summed when /metrics is scraped.
+
+Usage (label values are passed as a tuple in the declared label order):
+    STAGE_LATENCY.observe(("fetch_session_from_db", ""), elapsed_seconds)
+    VALIDATION_OUTCOMES.inc(("ask_email", "valid"))
+"""
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _ShardedValues:
+    """A fixed-size list of numbers per thread, summed on read."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._shards: List[list] = []
+        self._lock = threading.Lock()  # only taken when a thread creates its shard
+
+    def shard(self) -> list:
+        values = getattr(self._local, "values", None)
+        if values is None:
+            values = [0] * self.size
+            with self._lock:
+                self._shards.append(values)
+            self._local.values = values
+        return values
+
+    def totals(self) -> list:
+        with self._lock:
+            shards = list(self._shards)
+        totals = [0] * self.size
+        for values in shards:
+            for i, value in enumerate(values):
+                totals[i] += value
+        return totals
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: Dict[tuple, _ShardedValues] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, labels: tuple, size: int) -> _ShardedValues:
+        child = self._children.get(labels)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(labels, _ShardedValues(size))
+        return child
+
+    def _sorted_children(self):
+        with self._lock:
+            return sorted(self._children.items(), key=lambda item: item[0])
+
+
+class Counter(_Metric):
+    def inc(self, labels: tuple = (), amount: float = 1):
+        self._child(labels, 1).shard()[0] += amount
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, child in self._sorted_children():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {child.totals()[0]}")
+        return lines
+
+
+class Histogram(_Metric):
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...], buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Layout per shard: one slot per bucket, +Inf bucket, then sum.
+        self._size = len(self.buckets) + 2
+
+    def observe(self, labels: tuple, value: float):
+        values = self._child(labels, self._size).shard()
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, child in self._sorted_children():
+            totals = child.totals()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), totals[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                le_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {totals[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect):
+        """collect() returns exposition lines; it is only called at scrape time."""
+        self._collectors.append(collect)
+
+    def expose(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.expose())
+        for collect in self._collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.register(
+    Histogram("registration_request_duration_seconds", "End-to-end latency per endpoint.", ("endpoint",))
+)
+STAGE_LATENCY = registry.register(
+    Histogram(
+        "registration_stage_duration_seconds",
+        "Latency per request stage (session fetch, validation, graph step, upsert).",
+        ("stage", "engine"),
+    )
+)
+VALIDATION_BATCH_SIZE = registry.register(
+    Histogram(
+        "registration_validation_batch_size",
+        "Items per batched LLM validation call (1 = the window closed with a single item).",
+        ("engine",),
+        buckets=(1, 2, 4, 8, 16, 32, 64),
+    )
+)
+VALIDATION_OUTCOMES = registry.register(
+    Counter("registration_validation_outcomes_total", "Validation outcomes per question node.", ("node", "status"))
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording REQUEST_LATENCY per endpoint.
+    Only known paths become label values (others are reported as "other"), to bound cardinality.
+    """
+
+    def __init__(self, app, endpoints=()):
+        self.app = app
+        self.endpoints = set(endpoints)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        path = scope["path"]
+        label = (path if path in self.endpoints else "other",)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            REQUEST_LATENCY.observe(label, time.perf_counter() - start)
@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, List
+from app.helpers.config import (
+    MLFLOW_EXPERIMENT_NAME,
+    TELEMETRY_BACKEND,
+    TELEMETRY_FILE,
+    TELEMETRY_QUEUE_SIZE,
+    TELEMETRY_BATCH_SIZE,
+    TELEMETRY_FLUSH_INTERVAL,
+    TELEMETRY_DROP_POLICY,
+    TELEMETRY_BLOCK_TIMEOUT,
+)
+from app.helpers.fields import is_sensitive_question
+
+"""_summary_
+Summary: Non-blocking telemetry sink for validation records.
+
+Validators call telemetry.emit({...}) on the request path; this only puts the record on a
+bounded queue. A background thread drains the queue in batches (up to TELEMETRY_BATCH_SIZE
+records or every TELEMETRY_FLUSH_INTERVAL seconds) and writes them to a backend:
+
+    mlflow  one MLflow run per batch, records logged as a table (validations.json)
+    file    JSON lines appended to TELEMETRY_FILE (local stand-in for MLflow)
+    none    emit() is a no-op
+
+When the queue is full, TELEMETRY_DROP_POLICY decides what happens:
+    drop_newest  discard the incoming record (default; never blocks the request)
+    drop_oldest  discard the oldest queued record to make room
+    block        wait up to TELEMETRY_BLOCK_TIMEOUT seconds, then drop (backpressure)
+
+Records for sensitive questions (SENSITIVE_FIELDS, e.g. the password) have their answer and
+feedback fields replaced with REDACTED before they are queued, so no backend ever sees them.
+"""
+
+REDACTED = "[redacted]"
+REDACTED_KEYS = ("input_answer", "formatted_answer", "feedback")
+
+
+class MLflowBackend:
+    def __init__(self, experiment_name: str):
+        self.experiment_name = experiment_name
+        self.mlflow = None
+
+    def write(self, records: List[Dict]):
+        if self.mlflow is None:
+            # Imported by the sink thread on the first batch, not at application startup.
+            import mlflow
+
+            mlflow.set_experiment(self.experiment_name)
+            self.mlflow = mlflow
+        keys = sorted({key for record in records for key in record})
+        columns = {key: [str(record.get(key, "")) for record in records] for key in keys}
+        with self.mlflow.start_run(run_name="validation_batch"):
+            self.mlflow.log_metric("batch_size", len(records))
+            self.mlflow.log_table(data=columns, artifact_file="validations.json")
+
+
+class FileBackend:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, records: List[Dict]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+
+
+class TelemetrySink:
+    """Bounded queue + background batching writer."""
+
+    def __init__(self, backend, queue_size: int, batch_size: int, flush_interval: float,
+                 drop_policy: str = "drop_newest", block_timeout: float = 0.05):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self.block_timeout = block_timeout
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._stats = {"enqueued": 0, "dropped": 0, "written": 0, "batches": 0, "write_errors": 0}
+        self._stop = threading.Event()
+        self._thread = None
+        if backend is not None:
+            self._thread = threading.Thread(target=self._run, name="telemetry-sink", daemon=True)
+            self._thread.start()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def emit(self, record: Dict):
+        """Enqueues a record without blocking the caller (unless drop_policy is 'block')."""
+        if self.backend is None or self._stop.is_set():
+            return
+        record = {"timestamp": time.time(), **record}
+        if is_sensitive_question(record.get("question", "")):
+            record.update({key: REDACTED for key in REDACTED_KEYS if key in record})
+        try:
+            if self.drop_policy == "block":
+                self._queue.put(record, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            if self.drop_policy == "drop_oldest":
+                try:
+                    self._queue.get_nowait()
+                    self._incr("dropped")
+                    self._queue.put_nowait(record)
+                except (queue.Empty, queue.Full):
+                    self._incr("dropped")
+                    return
+            else:
+                self._incr("dropped")
+                return
+        self._incr("enqueued")
+
+    def _drain_batch(self) -> List[Dict]:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or self._stop.is_set():
+                # On stop, take whatever is left without waiting.
+                try:
+                    while len(batch) < self.batch_size:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    pass
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict]):
+        try:
+            self.backend.write(batch)
+            self._incr("written", len(batch))
+            self._incr("batches")
+        except Exception as e:
+            self._incr("write_errors")
+            self._incr("dropped", len(batch))
+            logging.error(f"Telemetry write failed ({len(batch)} records dropped): {e}")
+
+    def _run(self):
+        while not self._stop.is_set() or not self._queue.empty():
+            batch = self._drain_batch()
+            if batch:
+                self._write(batch)
+
+    def close(self, timeout: float = 10.0):
+        """Stops accepting records and flushes what is queued (called on shutdown)."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+
+def _create_backend(name: str):
+    if name == "mlflow":
+        return MLflowBackend(MLFLOW_EXPERIMENT_NAME)
+    if name == "file":
+        return FileBackend(TELEMETRY_FILE)
+    if name == "none":
+        return None
+    raise ValueError(f"Invalid telemetry backend: {name}")
+
+
+telemetry = TelemetrySink(
+    _create_backend(TELEMETRY_BACKEND),
+    queue_size=TELEMETRY_QUEUE_SIZE,
+    batch_size=TELEMETRY_BATCH_SIZE,
+    flush_interval=TELEMETRY_FLUSH_INTERVAL,
+    drop_policy=TELEMETRY_DROP_POLICY,
+    block_timeout=TELEMETRY_BLOCK_TIMEOUT,
+)
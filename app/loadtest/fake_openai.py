@@ -0,0 +1,200 @@
+"""_summary_
+Summary: Local stand-in for the OpenAI chat-completions API, for offline load tests.
+
+Answers POST /v1/chat/completions for both validation engines:
+    - ChatGPTValidator (response_format=json_object): content is a JSON validation result
+    - DSPyValidator (DSPy ChatAdapter prompt): content uses the [[ ## field ## ]] format
+Every answer is judged "valid" and echoed back trimmed, so a registration always completes.
+Batched validation requests (BatchingValidator: ChatGPT "Items: [...]" prompt, or the DSPy
+"items" input field) get one such result per item.
+
+Latency is log-normal (median --latency-ms, spread --latency-sigma). A fraction of calls
+fail with HTTP 500 (--error-rate) or 429 + Retry-After (--rate-limit-rate).
+With "stream": true the content is sent as SSE chunks (a few characters each, --token-ms apart)
+after the sampled latency, which then acts as time to first token.
+
+Run from the repository root:
+    python -m app.loadtest.fake_openai --port 8900 --latency-ms 400 --error-rate 0.01
+then point the backend at it with OPENAI_BASE_URL=http://127.0.0.1:8900/v1
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+settings = {
+    "latency_ms": 300.0,
+    "latency_sigma": 0.4,
+    "error_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "token_ms": 10.0,
+}
+stats = {"requests": 0, "errors": 0, "rate_limited": 0, "batched_items": 0}
+rng = random.Random()
+
+app = FastAPI()
+
+DSPY_FIELD = re.compile(r"\[\[ ## (\w+) ## \]\]\n(.*?)(?=\n\n|\Z)", re.S)
+CHATGPT_ANSWER = re.compile(r"User Answer: (.*?)\nValidate the answer\.", re.S)
+CHATGPT_ITEMS = re.compile(r"Items: (.*?)\nValidate every item\.", re.S)
+
+
+def _message_texts(messages):
+    for message in reversed(messages):
+        content = message.get("content") or ""
+        if isinstance(content, list):  # content parts
+            content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+        yield content
+
+
+def _extract_items(messages):
+    """The items of a batched validation request, or None for a single answer."""
+    for content in _message_texts(messages):
+        fields = dict(DSPY_FIELD.findall(content))
+        if "items" in fields:
+            return json.loads(fields["items"])
+        match = CHATGPT_ITEMS.search(content)
+        if match:
+            return json.loads(match.group(1))
+    return None
+
+
+def _extract_answer(messages) -> str:
+    """Finds the user's answer in either validator's prompt."""
+    for content in _message_texts(messages):
+        fields = dict(DSPY_FIELD.findall(content))
+        if "user_answer" in fields:
+            return fields["user_answer"].strip()
+        match = CHATGPT_ANSWER.search(content)
+        if match:
+            return match.group(1).strip()
+    return ""
+
+
+def _completion(content: str, model: str) -> dict:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+async def _stream_chunks(content: str, model: str):
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+
+    def chunk(delta: dict, finish_reason=None) -> str:
+        body = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(body)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    for i in range(0, len(content), 4):
+        yield chunk({"content": content[i : i + 4]})
+        if settings["token_ms"] > 0:
+            await asyncio.sleep(settings["token_ms"] / 1000)
+    yield chunk({}, finish_reason="stop")
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+
+    median = settings["latency_ms"] / 1000
+    if median > 0:
+        await asyncio.sleep(rng.lognormvariate(math.log(median), settings["latency_sigma"]))
+
+    roll = rng.random()
+    if roll < settings["rate_limit_rate"]:
+        stats["rate_limited"] += 1
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached (fake)", "type": "rate_limit_error"}},
+            status_code=429,
+            headers={"Retry-After": "1"},
+        )
+    if roll < settings["rate_limit_rate"] + settings["error_rate"]:
+        stats["errors"] += 1
+        return JSONResponse({"error": {"message": "Internal error (fake)", "type": "server_error"}}, status_code=500)
+
+    items = _extract_items(body.get("messages", []))
+    if items is not None:
+        stats["batched_items"] += len(items)
+        result = {
+            "results": [
+                {"id": item["id"], "status": "valid", "feedback": "Looks good.", "formatted_answer": item["user_answer"].strip()}
+                for item in items
+            ]
+        }
+    else:
+        answer = _extract_answer(body.get("messages", []))
+        result = {"status": "valid", "feedback": "Looks good.", "formatted_answer": answer}
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        content = json.dumps(result)
+    else:
+        content = "".join(
+            f"[[ ## {key} ## ]]\n{value if isinstance(value, str) else json.dumps(value)}\n\n"
+            for key, value in result.items()
+        )
+        content += "[[ ## completed ## ]]"
+    model = body.get("model", "gpt-4.1-mini")
+    if body.get("stream"):
+        return StreamingResponse(_stream_chunks(content, model), media_type="text/event-stream")
+    return _completion(content, model)
+
+
+@app.get("/stats")
+async def get_stats():
+    return {**stats, "settings": settings}
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=settings["latency_ms"], help="median latency")
+    parser.add_argument("--latency-sigma", type=float, default=settings["latency_sigma"], help="log-normal spread")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of HTTP 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of HTTP 429 responses")
+    parser.add_argument("--token-ms", type=float, default=settings["token_ms"], help="delay between streamed chunks")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    settings.update(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        token_ms=args.token_ms,
+    )
+    if args.seed is not None:
+        rng.seed(args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""_summary_
+Summary: Minimal in-process Redis-protocol (RESP2) server, for tests and offline benchmarks.
+
+Implements the commands RedisSessionStore uses, plus a few for inspection:
+    PING, ECHO, GET, SET (EX/PX/NX/XX), MGET, DEL, EXISTS, EXPIRE, TTL, SCAN (MATCH/COUNT),
+    HSET, HGET, HMGET, HGETALL, MULTI, EXEC, DISCARD, WATCH, UNWATCH,
+    DBSIZE, FLUSHDB, SELECT, CLIENT (no-op), INFO
+Data lives in one dict (bytes for strings, dicts for hashes); expiry is checked lazily on
+access. Every write bumps a per-key version, which is what WATCH compares at EXEC. It is single-threaded asyncio, so
+throughput is far below a real server: use it for correctness and relative comparisons only.
+
+Standalone:
+    python -m app.loadtest.fake_redis --port 6390      # then REDIS_URL=redis://127.0.0.1:6390/0
+In-process (tests, benchmarks):
+    server = FakeRedisServer(); url = server.start_in_thread(); ...; server.stop()
+"""
+import argparse
+import asyncio
+import fnmatch
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+
+class _ProtocolError(Exception):
+    pass
+
+
+WRONGTYPE = "WRONGTYPE Operation against a key holding the wrong kind of value"
+
+
+class _Connection:
+    """Per-client transaction state."""
+
+    def __init__(self):
+        self.queued: Optional[List[List[bytes]]] = None  # commands after MULTI, None outside one
+        self.watched: Dict[bytes, int] = {}  # key -> version at WATCH time
+
+
+class FakeRedisServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.data: Dict[bytes, Tuple[Union[bytes, dict], Optional[float]]] = {}  # key -> (value, expires_at)
+        self.versions: Dict[bytes, int] = {}
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    #################### storage ####################
+    def _touch(self, key: bytes):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def _lookup(self, key: bytes):
+        """The live value of any type, or None (dropping it if it has expired)."""
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.time():
+            del self.data[key]
+            self._touch(key)
+            return None
+        return value
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        value = self._lookup(key)
+        if isinstance(value, dict):
+            raise _ProtocolError(WRONGTYPE)
+        return value
+
+    def _hash(self, key: bytes) -> Optional[dict]:
+        value = self._lookup(key)
+        if value is not None and not isinstance(value, dict):
+            raise _ProtocolError(WRONGTYPE)
+        return value
+
+    def _hset(self, args: List[bytes]) -> int:
+        key, pairs = args[0], args[1:]
+        if not pairs or len(pairs) % 2:
+            raise _ProtocolError("ERR wrong number of arguments for 'hset' command")
+        fields = self._hash(key)
+        if fields is None:
+            fields = {}
+            self.data[key] = (fields, None)
+        added = 0
+        for field, value in zip(pairs[::2], pairs[1::2]):
+            added += field not in fields
+            fields[field] = value
+        self._touch(key)
+        return added
+
+    def _set(self, args: List[bytes]):
+        key, value = args[0], args[1]
+        expires_at, nx, xx = None, False, False
+        i = 2
+        while i < len(args):
+            option = args[i].upper()
+            if option == b"EX":
+                expires_at = time.time() + int(args[i + 1])
+                i += 2
+            elif option == b"PX":
+                expires_at = time.time() + int(args[i + 1]) / 1000
+                i += 2
+            elif option in (b"NX", b"XX"):
+                nx, xx = nx or option == b"NX", xx or option == b"XX"
+                i += 1
+            else:
+                raise _ProtocolError("ERR syntax error")
+        exists = self._get(key) is not None
+        if (nx and exists) or (xx and not exists):
+            return None
+        self.data[key] = (value, expires_at)
+        self._touch(key)
+        return "OK"
+
+    def _scan(self, args: List[bytes]):
+        cursor, pattern, count = int(args[0]), "*", 10
+        i = 1
+        while i < len(args):
+            option = args[i].upper()
+            if option == b"MATCH":
+                pattern = args[i + 1].decode()
+            elif option == b"COUNT":
+                count = int(args[i + 1])
+            i += 2
+        keys = list(self.data)  # insertion order is stable enough for a stand-in
+        batch = keys[cursor : cursor + count]
+        next_cursor = cursor + count if cursor + count < len(keys) else 0
+        found = [key for key in batch if fnmatch.fnmatchcase(key.decode(), pattern) and self._lookup(key) is not None]
+        return [str(next_cursor).encode(), found]
+
+    def _transaction(self, name: bytes, args: List[bytes], connection: _Connection):
+        if name == b"MULTI":
+            if connection.queued is not None:
+                raise _ProtocolError("ERR MULTI calls can not be nested")
+            connection.queued = []
+            return "OK"
+        if name == b"WATCH":
+            if connection.queued is not None:
+                raise _ProtocolError("ERR WATCH inside MULTI is not allowed")
+            for key in args:
+                self._lookup(key)  # an already expired key counts as unchanged from here on
+                connection.watched[key] = self.versions.get(key, 0)
+            return "OK"
+        if name == b"UNWATCH":
+            connection.watched.clear()
+            return "OK"
+        if connection.queued is None:
+            raise _ProtocolError(f"ERR {name.decode()} without MULTI")
+        queued, connection.queued = connection.queued, None
+        watched, connection.watched = connection.watched, {}
+        if name == b"DISCARD":
+            return "OK"
+        for key, version in watched.items():
+            self._lookup(key)  # expiring a watched key also aborts the transaction
+            if self.versions.get(key, 0) != version:
+                return None
+        replies = []
+        for command in queued:
+            try:
+                replies.append(self.execute(command))
+            except _ProtocolError as e:
+                replies.append(e)
+        return replies
+
+    def execute(self, command: List[bytes], connection: Optional[_Connection] = None):
+        name, args = command[0].upper(), command[1:]
+        if name in (b"MULTI", b"EXEC", b"DISCARD", b"WATCH", b"UNWATCH"):
+            return self._transaction(name, args, connection or _Connection())
+        if connection is not None and connection.queued is not None:
+            connection.queued.append(command)
+            return "QUEUED"
+        if name == b"PING":
+            return args[0] if args else "PONG"
+        if name == b"ECHO":
+            return args[0]
+        if name == b"GET":
+            return self._get(args[0])
+        if name == b"SET":
+            return self._set(args)
+        if name == b"MGET":
+            return [self._get(key) for key in args]
+        if name == b"DEL":
+            deleted = 0
+            for key in args:
+                if self._lookup(key) is not None:
+                    del self.data[key]
+                    self._touch(key)
+                    deleted += 1
+            return deleted
+        if name == b"EXISTS":
+            return sum(1 for key in args if self._lookup(key) is not None)
+        if name == b"EXPIRE":
+            value = self._lookup(args[0])
+            if value is None:
+                return 0
+            self.data[args[0]] = (value, time.time() + int(args[1]))
+            self._touch(args[0])
+            return 1
+        if name == b"TTL":
+            if self._lookup(args[0]) is None:
+                return -2
+            expires_at = self.data[args[0]][1]
+            return -1 if expires_at is None else max(0, round(expires_at - time.time()))
+        if name == b"HSET":
+            return self._hset(args)
+        if name == b"HGET":
+            return (self._hash(args[0]) or {}).get(args[1])
+        if name == b"HMGET":
+            fields = self._hash(args[0]) or {}
+            return [fields.get(field) for field in args[1:]]
+        if name == b"HGETALL":
+            return [item for pair in (self._hash(args[0]) or {}).items() for item in pair]
+        if name == b"SCAN":
+            return self._scan(args)
+        if name == b"DBSIZE":
+            return len(self.data)
+        if name == b"FLUSHDB":
+            for key in self.data:
+                self._touch(key)
+            self.data.clear()
+            return "OK"
+        if name in (b"SELECT", b"CLIENT"):
+            return "OK"
+        if name == b"INFO":
+            return b"# Server\r\nredis_version:7.0.0-fake\r\n"
+        raise _ProtocolError(f"ERR unknown command '{name.decode(errors='replace')}'")
+
+    #################### protocol ####################
+    @staticmethod
+    def _encode(value) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, str):
+            return b"+" + value.encode() + b"\r\n"
+        if isinstance(value, int):
+            return b":" + str(value).encode() + b"\r\n"
+        if isinstance(value, bytes):
+            return b"$" + str(len(value)).encode() + b"\r\n" + value + b"\r\n"
+        if isinstance(value, list):
+            return b"*" + str(len(value)).encode() + b"\r\n" + b"".join(FakeRedisServer._encode(v) for v in value)
+        if isinstance(value, _ProtocolError):  # a failed command inside EXEC
+            return b"-" + str(value).encode() + b"\r\n"
+        raise TypeError(type(value))
+
+    @staticmethod
+    async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):  # inline command, e.g. from telnet
+            return line.strip().split()
+        command = []
+        for _ in range(int(line[1:])):
+            header = await reader.readline()
+            length = int(header[1:])
+            command.append((await reader.readexactly(length + 2))[:-2])
+        return command
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = _Connection()
+        try:
+            while True:
+                command = await self._read_command(reader)
+                if command is None:
+                    break
+                if not command:
+                    continue
+                try:
+                    reply = self._encode(self.execute(command, connection))
+                except _ProtocolError as e:
+                    reply = b"-" + str(e).encode() + b"\r\n"
+                writer.write(reply)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    def start_in_thread(self) -> str:
+        """Starts the server on a background event loop; returns its redis:// URL."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.serve())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-redis", daemon=True)
+        self._thread.start()
+        ready.wait(10)
+        return f"redis://{self.host}:{self.port}/0"
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+
+    server = FakeRedisServer(args.host, args.port)
+
+    async def run():
+        async with await server.serve():
+            print(f"fake redis listening on redis://{args.host}:{server.port}/0")
+            await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
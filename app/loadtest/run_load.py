@@ -0,0 +1,312 @@
+"""_summary_
+Summary: Offline load test: N concurrent synthetic users complete a full registration.
+
+Each virtual user (Faker, en_GB) runs:
+    /start_registration -> /submit_response x 6 -> /edit_field (changes the username)
+
+By default the tool starts two local processes and needs no network:
+    - app.loadtest.fake_openai  (stand-in OpenAI API with configurable latency and errors)
+    - uvicorn app.main:app      (pointed at it with OPENAI_BASE_URL, using a temporary SQLite file)
+Use --app-url to target a backend that is already running instead.
+
+Reports throughput, p50/p95/p99 latency and the error rate per endpoint. Run from the repository root:
+    python -m app.loadtest.run_load --users 200 --concurrency 50
+    python -m app.loadtest.run_load --engine chatgpt --latency-ms 800 --error-rate 0.02 --no-fast-path
+    python -m app.loadtest.run_load --no-fast-path --batching --batch-window-ms 20   # LLM round trips saved
+    python -m app.loadtest.run_load --app-url http://localhost:8000 --users 20 --json result.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+ENDPOINTS = ["/start_registration", "/submit_response", "/edit_field"]
+
+
+def make_user(fake) -> Dict[str, str]:
+    """Synthetic answers in the shape the validators expect (UK phone and address)."""
+    return {
+        "ask_email": fake.unique.email(),
+        "ask_name": f"{fake.first_name()} {fake.last_name()}",
+        "ask_address": f"{fake.building_number()} {fake.street_name()}, {fake.city()}, {fake.postcode()}",
+        "ask_phone": fake.numerify("07#########"),
+        "ask_username": fake.unique.user_name(),
+        "ask_password": fake.password(length=14, special_chars=True, digits=True, upper_case=True, lower_case=True),
+        "new_username": fake.unique.user_name() + "_2",
+    }
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.rejected = defaultdict(int)  # HTTP 429 from admission control, also counted as errors
+        self.degraded = defaultdict(int)  # validated by local rules (LLM failed or circuit open)
+
+    def add(self, endpoint: str, elapsed: float, ok: bool, rejected: bool = False, degraded: bool = False):
+        self.latencies[endpoint].append(elapsed)
+        if not ok:
+            self.errors[endpoint] += 1
+        if rejected:
+            self.rejected[endpoint] += 1
+        if degraded:
+            self.degraded[endpoint] += 1
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _is_error(response: httpx.Response) -> bool:
+    if response.status_code >= 400:
+        return True
+    body = response.json()
+    # The app reports failures in the body, with HTTP 200.
+    return "error" in body or body.get("validation_feedback", "").startswith("An error occurred")
+
+
+async def _call(client: httpx.AsyncClient, recorder: Recorder, endpoint: str, payload=None) -> dict:
+    start = time.perf_counter()
+    try:
+        response = await client.post(endpoint, json=payload)
+        ok = not _is_error(response)
+        body = response.json() if response.status_code < 400 else {}
+        rejected = response.status_code == 429
+    except (httpx.HTTPError, ValueError):
+        ok, body, rejected = False, {}, False
+    recorder.add(endpoint, time.perf_counter() - start, ok, rejected, bool(body.get("degraded")))
+    return body
+
+
+async def run_user(client: httpx.AsyncClient, recorder: Recorder, user: Dict[str, str]) -> bool:
+    """Returns True if the registration completed."""
+    body = await _call(client, recorder, "/start_registration")
+    session_id = body.get("session_id")
+    if not session_id:
+        return False
+
+    node = body.get("state", {}).get("current_node", "ask_email")
+    completed = False
+    for _ in range(6):
+        body = await _call(client, recorder, "/submit_response", {"session_id": session_id, "answer": user[node]})
+        if body.get("message") == "Registration complete!":
+            completed = True
+            break
+        next_node = body.get("state", {}).get("current_node")
+        if not next_node:
+            return False
+        node = next_node  # unchanged on clarify/error, so the same answer is retried
+
+    await _call(
+        client,
+        recorder,
+        "/edit_field",
+        {"session_id": session_id, "field_to_edit": "ask_username", "new_value": user["new_username"]},
+    )
+    return completed
+
+
+async def run_load(
+    app_url: str, users: List[Dict[str, str]], concurrency: int, timeout: float, warmup_users: List[Dict[str, str]] = ()
+) -> dict:
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=app_url, timeout=timeout, limits=limits) as client:
+        # Unmeasured registrations first, so lazy imports and pool set-up don't skew the percentiles.
+        for user in warmup_users:
+            await run_user(client, Recorder(), user)
+
+        async def one(user):
+            async with semaphore:
+                return await run_user(client, recorder, user)
+
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(one(user) for user in users))
+        wall = time.perf_counter() - start
+
+    return summarize(recorder, wall, completed=sum(outcomes), users=len(users), concurrency=concurrency)
+
+
+def summarize(recorder: Recorder, wall: float, completed: int, users: int, concurrency: int) -> dict:
+    endpoints = {}
+    for endpoint in ENDPOINTS:
+        values = recorder.latencies.get(endpoint)
+        if not values:
+            continue
+        endpoints[endpoint] = {
+            "requests": len(values),
+            "errors": recorder.errors[endpoint],
+            "error_rate": round(recorder.errors[endpoint] / len(values), 4),
+            "rejected": recorder.rejected[endpoint],
+            "degraded": recorder.degraded[endpoint],
+            "rps": round(len(values) / wall, 2),
+            "mean_ms": round(statistics.fmean(values) * 1000, 2),
+            "p50_ms": round(_percentile(values, 50) * 1000, 2),
+            "p95_ms": round(_percentile(values, 95) * 1000, 2),
+            "p99_ms": round(_percentile(values, 99) * 1000, 2),
+        }
+    total_requests = sum(e["requests"] for e in endpoints.values())
+    total_errors = sum(e["errors"] for e in endpoints.values())
+    return {
+        "users": users,
+        "concurrency": concurrency,
+        "completed_registrations": completed,
+        "wall_s": round(wall, 3),
+        "registrations_per_s": round(completed / wall, 2) if wall else 0.0,
+        "requests_per_s": round(total_requests / wall, 2) if wall else 0.0,
+        "error_rate": round(total_errors / total_requests, 4) if total_requests else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def print_report(result: dict):
+    print(
+        f"{result['completed_registrations']}/{result['users']} registrations completed in {result['wall_s']}s "
+        f"(concurrency {result['concurrency']}): {result['registrations_per_s']} registrations/s, "
+        f"{result['requests_per_s']} requests/s, error rate {result['error_rate']:.2%}\n"
+    )
+    print(f"{'endpoint':<22}{'requests':>10}{'rps':>9}{'err %':>8}{'429s':>7}{'degr':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for endpoint, row in result["endpoints"].items():
+        print(
+            f"{endpoint:<22}{row['requests']:>10}{row['rps']:>9}{row['error_rate'] * 100:>8.2f}{row['rejected']:>7}{row['degraded']:>7}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+        )
+    if "llm" in result:
+        llm = result["llm"]
+        print(f"\nfake OpenAI: {llm['requests']} requests ({llm['batched_items']} answers in batches), {llm['errors']} errors, {llm['rate_limited']} rate limited")
+
+
+#####################################################
+############### Local process harness ###############
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_up(url: str, proc: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {proc.returncode} before it was ready")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def start_local_stack(args, workdir: str):
+    """Starts the fake OpenAI server and the app; returns (app_url, fake_url, processes)."""
+    fake_port, app_port = _free_port(), _free_port()
+    fake_cmd = [
+        sys.executable, "-m", "app.loadtest.fake_openai",
+        "--port", str(fake_port),
+        "--latency-ms", str(args.latency_ms),
+        "--latency-sigma", str(args.latency_sigma),
+        "--error-rate", str(args.error_rate),
+        "--rate-limit-rate", str(args.rate_limit_rate),
+        "--seed", str(args.seed),
+    ]
+    fake = subprocess.Popen(fake_cmd)
+    processes = [fake]
+    _wait_until_up(f"http://127.0.0.1:{fake_port}/stats", fake)
+
+    env = dict(os.environ)
+    env.update(
+        OPENAI_API_KEY="sk-loadtest",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{fake_port}/v1",
+        VALIDATION_ENGINE=args.engine,
+        VALIDATION_FAST_PATH=str(args.fast_path),
+        VALIDATION_CACHE_ENABLED=str(args.cache),
+        VALIDATION_BATCHING=str(args.batching),
+        VALIDATION_BATCH_WINDOW_MS=str(args.batch_window_ms),
+        VALIDATION_HEDGE_ENGINE=args.hedge_engine or "",
+        REGISTRATION_DB_FILE=os.path.join(workdir, "registration.db"),
+        DSPY_CACHEDIR=os.path.join(workdir, "dspy_cache"),  # never replay completions from earlier runs
+        TELEMETRY_BACKEND="none",
+        MLFLOW_ENABLED="False",
+    )
+    if args.workers > 1:
+        env["SESSION_CACHE_MODE"] = "off"  # the session cache is per process; workers would serve stale copies
+    app_cmd = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(app_port),
+        "--log-level", "warning", "--workers", str(args.workers),
+    ]
+    app = subprocess.Popen(app_cmd, env=env)
+    processes.append(app)
+    app_url = f"http://127.0.0.1:{app_port}"
+    _wait_until_up(f"{app_url}/metrics", app)
+    return app_url, f"http://127.0.0.1:{fake_port}", processes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100, help="registrations to run")
+    parser.add_argument("--concurrency", type=int, default=20, help="users in flight at once")
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured registrations run first")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout (s)")
+    parser.add_argument("--app-url", help="target a running backend instead of starting one")
+    parser.add_argument("--engine", default="dspy", choices=["dspy", "chatgpt"])
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local app")
+    parser.add_argument("--no-fast-path", dest="fast_path", action="store_false", help="send every answer to the LLM")
+    parser.add_argument("--cache", action="store_true", help="enable the validation result cache")
+    parser.add_argument("--batching", action="store_true", help="enable cross-session micro-batching of LLM calls")
+    parser.add_argument("--batch-window-ms", type=float, default=20.0, help="micro-batching window")
+    parser.add_argument("--hedge-engine", choices=["dspy", "chatgpt"], help="hedge slow LLM calls with this engine")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="fake OpenAI median latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.4, help="fake OpenAI log-normal spread")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake OpenAI HTTP 500 fraction")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fake OpenAI HTTP 429 fraction")
+    parser.add_argument("--seed", type=int, default=1234, help="seed for Faker and the fake server")
+    parser.add_argument("--json", help="also write the result to this file")
+    args = parser.parse_args()
+
+    from faker import Faker
+
+    fake = Faker("en_GB")
+    Faker.seed(args.seed)
+    users = [make_user(fake) for _ in range(args.users)]
+    warmup_users = [make_user(fake) for _ in range(args.warmup)]
+
+    processes = []
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+        try:
+            app_url, fake_url = args.app_url, None
+            if not app_url:
+                app_url, fake_url, processes = start_local_stack(args, workdir)
+            result = asyncio.run(run_load(app_url, users, args.concurrency, args.timeout, warmup_users))
+            if fake_url:  # LLM round trips, including warmup users
+                result["llm"] = {key: value for key, value in httpx.get(f"{fake_url}/stats").json().items() if key != "settings"}
+        finally:
+            for proc in reversed(processes):
+                proc.terminate()
+                try:
+                    proc.wait(10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
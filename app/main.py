@@ -1,13 +1,43 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse  # Added missing import
+from fastapi.responses import StreamingResponse, FileResponse, PlainTextResponse, JSONResponse  # Added missing import
+from fastapi.encoders import jsonable_encoder
 import uuid
 import logging
-from app.validation.factory import validate_user_input
-from app.db.sqlite_db import fetch_session_from_db, upsert_session_to_db, RegistrationState
-from app.graph.registration_graph import RegistrationGraphManager
-import pandas as pd
+from app.validation.factory import (
+    avalidate_user_input,
+    astream_validate_user_input,
+    get_validation_stats,
+    ValidatorFactory,
+)
+from app.validation.admission import AdmissionRejected
+from app.validation.circuit_breaker import TRY_AGAIN_SHORTLY
+from app.db.sqlite_db import RegistrationState
+from app.db.factory import get_session_store
+from app.db.session_store import SESSION_STORE
+from app.graph.registration_graph import RegistrationGraphManager, registration_questions
+from app.validation.http_pool import close_http_clients
+from app.db.sqlite_pool import close_all_connections
+from app.db.session_sweeper import session_sweeper, SESSION_SWEEPER_ENABLED
+from app.helpers.telemetry import telemetry
+from app.helpers.metrics import MetricsMiddleware, STAGE_LATENCY, VALIDATION_OUTCOMES, registry
+from app.bulk.registration_import import import_registrations_ndjson, spool_upload
+from app.bulk.session_export import export_sessions, MEDIA_TYPES
+from app.helpers.config import (
+    ADMIN_API_TOKEN,
+    BULK_IMPORT_CONCURRENCY,
+    VALIDATION_ENGINE,
+    VALIDATION_HEDGE_ENGINE,
+    VALIDATOR_WARMUP,
+)
+from typing import Optional
+import asyncio
+import hmac
+import threading
+import time
 import io
+import json
+from langgraph.graph import END
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -33,17 +63,71 @@ app.add_middleware(
     allow_headers=["*"], # Allows all headers, ensuring flexibility for front-end apps.
 )
 
-registration_questions = {
-    "ask_email": "What is your email address?",
-    "ask_name": "What is your full name?",
-    "ask_address": "What is your address?",
-    "ask_phone": "What is your phone number?",
-    "ask_username": "Choose a username.",
-    "ask_password": "Choose a strong password.",
-}
+app.add_middleware(
+    MetricsMiddleware,
+    endpoints=[
+        "/start_registration",
+        "/submit_response",
+        "/submit_response/stream",
+        "/edit_field",
+        "/bulk_import",
+        "/export",
+    ],
+)
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    # Validation capacity is exhausted: fail fast so the client backs off instead of timing out.
+    return JSONResponse(
+        status_code=429,
+        content={"error": "Too many validations in progress, please retry.", "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def require_admin_token(authorization: Optional[str] = Header(None)):
+    # Bulk endpoints read or write every registration: they need "Authorization: Bearer <ADMIN_API_TOKEN>".
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_API_TOKEN.")
+    expected = f"Bearer {ADMIN_API_TOKEN}".encode("utf-8")
+    if not authorization or not hmac.compare_digest(authorization.encode("utf-8"), expected):
+        raise HTTPException(status_code=401, detail="Invalid or missing admin token.", headers={"WWW-Authenticate": "Bearer"})
+
+
+SESSION_NOT_FOUND = "Session not found. Please restart registration."
 
 registration_graph = RegistrationGraphManager("registration", registration_questions)
-registration_graph.generate_mermaid_diagram()
+# The Mermaid diagram is rendered on demand by /graph_diagram, not at import time.
+
+
+@app.on_event("startup")
+async def warm_up_validator():
+    # Import the LLM engine (dspy/guardrails/openai/mlflow) in the background, so the server
+    # starts serving immediately and the first LLM-bound answer doesn't pay the import cost.
+    if VALIDATOR_WARMUP:
+        for engine in filter(None, (VALIDATION_ENGINE, VALIDATION_HEDGE_ENGINE)):
+            threading.Thread(
+                target=ValidatorFactory.get_validator, args=(engine,), name=f"validator-warmup-{engine}", daemon=True
+            ).start()
+
+
+@app.on_event("startup")
+async def start_session_sweeper():
+    # Deletes expired sessions in small batches and compacts the database in the background.
+    # Only for SQLite; Redis expires session keys itself.
+    if SESSION_SWEEPER_ENABLED and SESSION_STORE == "sqlite":
+        session_sweeper.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await close_http_clients()
+    telemetry.close()  # flush queued validation records
+    session_store = get_session_store()
+    await session_store.aclose()
+    session_store.close()  # writes out sessions still dirty in write_behind mode
+    session_sweeper.stop()
+    close_all_connections()
 
 
 #####################################################
@@ -51,7 +135,7 @@ registration_graph.generate_mermaid_diagram()
 # Purpose: Initializes a new session, starts the graph at ask_email, saves the state, and returns the first question to the client.
 @app.post("/start_registration") # endpoint initializes a new session, 
 # assigning a unique session_id and starting the registration flow.
-def start_registration():
+async def start_registration():
     session_id = str(uuid.uuid4())
 
     # Our initial state
@@ -68,14 +152,10 @@ def start_registration():
 
     # Start the graph & get the first node
     ############### kick off the graph ###############
-    execution = registration_graph.compiled_graph.stream(initial_state)
-    try:
-        steps = list(execution)  # Fully consume the generator
-        if not steps:
-            raise RuntimeError("Generator exited before producing any states.")
-        first_step = steps[0]
-    except GeneratorExit:
-        raise RuntimeError("GeneratorExit detected before first transition!")
+    # Only the entry node is run; the rest of the graph is stepped one answer at a time.
+    first_step = registration_graph.start_graph(initial_state)
+    if not first_step:
+        raise RuntimeError("Graph has no entry node.")
 
     # Extract state from the first node
     first_node_key = list(first_step.keys())[0]
@@ -84,7 +164,7 @@ def start_registration():
     first_node_state["session_id"] = session_id
 
     # Save to session
-    upsert_session_to_db(
+    await get_session_store().aput(
         session_id,
         first_node_state["collected_data"],
         first_node_state["current_question"],
@@ -103,64 +183,94 @@ def start_registration():
 #################### Endpoints 2 ####################
 # This endpoint processes user responses, validates them, updates the state, and advances the graph.
 
-@app.post("/submit_response")
-def submit_response(response: dict):
+async def _load_submission(response: dict):
+    """Returns (current_state, None), or (None, error_response) if the session can't be used."""
     session_id = response.get("session_id")
     if not session_id:
-        return {"error": "Missing session_id"}
+        return None, {"error": "Missing session_id"}
 
-    current_state = fetch_session_from_db(session_id)
+    current_state = await get_session_store().aget(session_id)
     if not current_state:
-        return {"error": "Session not found. Please restart registration."}
+        return None, {"error": SESSION_NOT_FOUND}
+    if current_state["current_node"] == END:
+        # Nothing left to answer: don't validate or store anything (edits go through /edit_field).
+        return None, {"error": "Registration already complete. Use /edit_field to change an answer."}
 
-    skip_steps = response.get("skip_steps", [])
-    for node_key in skip_steps:
+    for node_key in response.get("skip_steps", []):
         logging.info(f"skip_{node_key}")
         current_state[f"skip_{node_key}"] = True
+    return current_state, None
 
-    user_answer = response.get("answer", "")
+
+def _skipped_result(current_state: dict, response: dict) -> Optional[dict]:
+    """The dummy validation result if the user is skipping the current question, else None."""
+    if current_state["current_node"] not in response.get("skip_steps", []):
+        return None
+    logging.info(f"Skipping validation for {current_state['current_node']}")
+    return {
+        "status": "valid",
+        "feedback": "Skipped this question",
+        "formatted_answer": "-",
+    }
+
+
+async def _advance_registration(session_id: str, current_state: dict, user_answer: str, validation_result: dict):
+    """Stores a validated answer, steps the graph and builds the /submit_response body."""
     current_question = current_state["current_question"]
-    current_node = current_state["current_node"]
 
-    # Use dspy to validate the answer with fallbacks
-    if current_node in skip_steps:
-        # If user is skipping this question, create a dummy validation result
-        validation_result = {
-            "status": "valid",
-            "feedback": "Skipped this question",
-            "formatted_answer": "-",
+    # If there's a clarify/error
+    if validation_result["status"] in ("clarify", "error"):
+        return {
+            "next_question": current_question,
+            "validation_feedback": validation_result["feedback"],
+            "user_answer": user_answer,
+            "formatted_answer": validation_result["formatted_answer"],
+            "degraded": validation_result.get("degraded", False),
+            "state": current_state,
         }
-        logging.info(f"Skipping validation for {current_node}")
-    else:
-        # Normal validation
-        validation_result = validate_user_input(current_question, user_answer)
-
-        # If there's a clarify/error
-        if validation_result["status"] in ("clarify", "error"):
-            return {
-                "next_question": current_question,
-                "validation_feedback": validation_result["feedback"],
-                "user_answer": user_answer,
-                "formatted_answer": validation_result["formatted_answer"],
-                "state": current_state,
-            }
-
-    current_state["collected_data"][current_state["current_node"]] = validation_result[
+
+    answered_node = current_state["current_node"]
+    current_state["collected_data"][answered_node] = validation_result[
         "formatted_answer"
     ]
 
     if "current_node" not in current_state or not current_state.get("collected_data"):
         return {"error": "Corrupt session state, restart registration."}
 
+    start = time.perf_counter()
     next_step = registration_graph.resume_and_step_graph(current_state)
+    STAGE_LATENCY.observe(("resume_and_step_graph", ""), time.perf_counter() - start)
+
+    if (not next_step or next_step == {}) and validation_result.get("degraded"):
+        # Local rules alone never complete a registration: keep the last question open.
+        current_state["collected_data"].pop(answered_node, None)
+        return {
+            "next_question": current_question,
+            "validation_feedback": TRY_AGAIN_SHORTLY,
+            "user_answer": user_answer,
+            "formatted_answer": user_answer,
+            "degraded": True,
+            "state": current_state,
+        }
 
     if not next_step or next_step == {}:
-        # Means we've hit the END node or no more steps
+        # Means we've hit the END node or no more steps; persist the completed registration.
+        # Only the new answer is written (json_set on SQLite), not the whole collected_data.
+        stored = await get_session_store().aset_field(
+            session_id,
+            answered_node,
+            validation_result["formatted_answer"],
+            "",
+            END,
+        )
+        if not stored:  # expired and swept since it was read
+            return {"error": SESSION_NOT_FOUND}
         return {
             "message": "Registration complete!",
             "validation_feedback": validation_result["feedback"],
             "user_answer": user_answer,
             "formatted_answer": validation_result["formatted_answer"],
+            "degraded": validation_result.get("degraded", False),
             "state": current_state,
             "summary": current_state["collected_data"],
         }
@@ -169,27 +279,100 @@ def submit_response(response: dict):
     next_node_state = next_step[next_node_key]
     next_node_state["current_node"] = next_node_key
 
-    upsert_session_to_db(
+    stored = await get_session_store().aset_field(
         session_id,
-        current_state["collected_data"],
+        answered_node,
+        validation_result["formatted_answer"],
         next_node_state["current_question"],
         next_node_state["current_node"],
     )
+    if not stored:
+        return {"error": SESSION_NOT_FOUND}
 
     return {
         "next_question": next_node_state["current_question"],
         "validation_feedback": validation_result["feedback"],
         "user_answer": user_answer,
         "formatted_answer": validation_result["formatted_answer"],
+        "degraded": validation_result.get("degraded", False),
         "state": next_node_state,
         "summary": current_state["collected_data"],
     }
 
 
+@app.post("/submit_response")
+async def submit_response(response: dict):
+    current_state, error = await _load_submission(response)
+    if error:
+        return error
+
+    user_answer = response.get("answer", "")
+
+    # Use dspy to validate the answer with fallbacks
+    validation_result = _skipped_result(current_state, response)
+    if validation_result is None:
+        # Normal validation
+        validation_result = await avalidate_user_input(current_state["current_question"], user_answer)
+        VALIDATION_OUTCOMES.inc((current_state["current_node"], validation_result["status"]))
+
+    return await _advance_registration(response["session_id"], current_state, user_answer, validation_result)
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+# Streaming variant: the user sees feedback (e.g. "please include your postcode") from the
+# first generated token instead of after the full completion.
+# Events:  feedback  {"delta": "..."}              zero or more, as the validator generates feedback
+#          result    same body as /submit_response  exactly one, after Guardrails validation
+@app.post("/submit_response/stream")
+async def submit_response_stream(response: dict):
+    current_state, error = await _load_submission(response)
+    user_answer = response.get("answer", "")
+
+    async def events():
+        if error:
+            yield _sse("result", error)
+            return
+
+        validation_result = _skipped_result(current_state, response)
+        if validation_result is None:
+            try:
+                async for kind, payload in astream_validate_user_input(current_state["current_question"], user_answer):
+                    if kind == "feedback":
+                        yield _sse("feedback", {"delta": payload})
+                    else:
+                        validation_result = payload
+            except AdmissionRejected as e:
+                # Headers are already sent, so the rejection is the result event (no state change).
+                yield _sse("result", {"error": "Too many validations in progress, please retry.", "retry_after": e.retry_after})
+                return
+            except Exception as e:
+                # Headers are already sent, so the failure is reported in the result event.
+                logger.error(f"Streaming validation failed: {e}")
+                validation_result = {
+                    "status": "error",
+                    "feedback": "An error occurred during validation.",
+                    "formatted_answer": user_answer,
+                }
+            VALIDATION_OUTCOMES.inc((current_state["current_node"], validation_result["status"]))
+
+        result = await _advance_registration(response["session_id"], current_state, user_answer, validation_result)
+        yield _sse("result", result)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+
 #####################################################
 #################### Endpoints 3 ####################
 @app.post("/edit_field")
-def edit_field(request: dict):
+async def edit_field(request: dict):
     session_id = request.get("session_id")
     if not session_id:
         return {"error": "Missing session_id"}
@@ -197,19 +380,20 @@ def edit_field(request: dict):
     field_to_edit = request.get("field_to_edit")
     new_value = request.get("new_value")
 
-    current_state = fetch_session_from_db(session_id)
+    current_state = await get_session_store().aget(session_id)
     if not current_state:
-        logging.error("Session not found. Please restart registration.")
-        return {"error": "Session not found. Please restart registration."}
+        logging.error(SESSION_NOT_FOUND)
+        return {"error": SESSION_NOT_FOUND}
 
     question_text = registration_questions.get(field_to_edit)
     if not question_text:
         logging.error(f"Invalid field_to_edit: {field_to_edit}")
         return {"error": f"Invalid field_to_edit: {field_to_edit}"}
 
-    validation_result = validate_user_input(
+    validation_result = await avalidate_user_input(
         question=question_text, user_answer=new_value
     )
+    VALIDATION_OUTCOMES.inc((field_to_edit, validation_result["status"]))
 
     if validation_result["status"] == "clarify":
         return {
@@ -217,23 +401,109 @@ def edit_field(request: dict):
             "validation_feedback": validation_result["feedback"],
             "raw_answer": new_value,
             "formatted_answer": validation_result["formatted_answer"],
+            "degraded": validation_result.get("degraded", False),
         }
 
     current_state["collected_data"][field_to_edit] = validation_result[
         "formatted_answer"
     ]
 
-    upsert_session_to_db(
-        session_id,
-        current_state["collected_data"],
-        current_state["current_question"],
-        current_state["current_node"],
-    )
+    if not await get_session_store().aset_field(session_id, field_to_edit, validation_result["formatted_answer"]):
+        return {"error": SESSION_NOT_FOUND}  # expired and swept since it was read
 
     return {
         "message": "Field updated successfully!",
         "validation_feedback": validation_result["feedback"],
         "raw_answer": new_value,
         "formatted_answer": validation_result["formatted_answer"],
+        "degraded": validation_result.get("degraded", False),
         "summary": current_state["collected_data"],
     }
+
+
+
+#####################################################
+#################### Endpoints 4 ####################
+# Purpose: Exposes validation counters, e.g. how much LLM traffic the local rules avoid.
+@app.get("/validation_stats")
+def validation_stats():
+    return get_validation_stats()
+
+
+# Purpose: Session backend, what the expiry sweeper has deleted and reclaimed (SQLite), and session cache hit rates.
+@app.get("/session_stats")
+def session_stats():
+    stats = get_session_store().stats()
+    if SESSION_STORE == "sqlite":
+        stats["sweeper"] = session_sweeper.stats()
+    return stats
+
+
+
+#####################################################
+#################### Endpoints 5 ####################
+# Purpose: Bulk import of partner registration lists (admin token required). The request body is the
+# raw CSV or JSONL file; per-row outcomes are streamed back as newline-delimited JSON, followed by a
+# rows/sec summary (with an "error" field if the file could not be parsed).
+@app.post("/bulk_import", dependencies=[Depends(require_admin_token)])
+async def bulk_import(request: Request, format: str = "csv", concurrency: int = BULK_IMPORT_CONCURRENCY):
+    if format not in ("csv", "jsonl"):
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    if concurrency < 1:
+        raise HTTPException(status_code=400, detail="concurrency must be at least 1")
+
+    # Read chunk by chunk into a temporary file (in memory up to 1 MiB), then parsed in chunks.
+    upload = await spool_upload(request.stream())
+    return StreamingResponse(
+        import_registrations_ndjson(upload, format, concurrency),
+        media_type="application/x-ndjson",
+    )
+
+
+
+#####################################################
+#################### Endpoints 6 ####################
+# Purpose: Streams sessions (kind=sessions) or completed registrations (kind=registrations)
+# as CSV, JSONL or Parquet, in fixed-size batches so memory stays flat for any table size.
+# Admin token required; passwords (SENSITIVE_FIELDS) are never exported.
+@app.get("/export", dependencies=[Depends(require_admin_token)])
+async def export(
+    kind: str = "sessions",
+    format: str = "csv",
+    completed: Optional[bool] = None,
+    current_node: Optional[str] = None,
+):
+    if kind not in ("sessions", "registrations"):
+        raise HTTPException(status_code=400, detail=f"Unsupported kind: {kind}")
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+
+    return StreamingResponse(
+        export_sessions(kind, format, completed, current_node),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{format}"'},
+    )
+
+
+
+#####################################################
+#################### Endpoints 7 ####################
+# Purpose: Returns the registration graph as a PNG, rendered on first request and cached on disk.
+@app.get("/graph_diagram")
+async def graph_diagram():
+    try:
+        png_file = await asyncio.to_thread(registration_graph.generate_mermaid_diagram)
+    except Exception as e:
+        logging.error(f"Graph diagram generation failed: {e}")
+        raise HTTPException(status_code=503, detail="Graph diagram is not available right now.")
+    return FileResponse(png_file, media_type="image/png")
+
+
+
+#####################################################
+#################### Endpoints 8 ####################
+# Purpose: Prometheus scrape target: per-endpoint and per-stage latency histograms,
+# and validation outcomes per question node.
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(registry.expose(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,170 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+from app.validation.base_validator import BaseValidator
+from app.helpers.metrics import STAGE_LATENCY
+
+"""_summary_
+Summary: Admission control for LLM-bound validation (per worker process).
+
+Without a limit, a signup spike sends every answer straight to OpenAI: we hit rate limits,
+latency climbs past the Streamlit client's 10s timeout, and its retries add more load.
+AdmissionController lets at most ADMISSION_MAX_IN_FLIGHT validations reach the LLM at once.
+Further calls wait in a FIFO queue of at most ADMISSION_MAX_QUEUE, each for at most
+ADMISSION_QUEUE_TIMEOUT seconds. A call that finds the queue full, or whose wait runs out,
+raises AdmissionRejected straight away; main.py turns that into HTTP 429 with a Retry-After
+estimated from the recent LLM service time and the current queue length.
+
+AdmissionValidator sits below the validation cache and coalescing, so rule hits, cache hits
+and coalesced duplicates never take a slot. Only the async path is limited (the endpoints);
+validate (sync) passes through.
+
+Metrics: registration_admission_in_flight / _queue_depth gauges, admitted/rejected counters
+and the "admission_wait" stage in registration_stage_duration_seconds.
+"""
+
+
+class AdmissionRejected(Exception):
+    """Raised when a validation cannot be admitted; retry_after is in whole seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Validation capacity exhausted ({reason}); retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded concurrency with a bounded, deadline-limited FIFO wait queue (one event loop)."""
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._in_flight = 0
+        self._waiters = deque()
+        self._service_time = 1.0  # EWMA of seconds a slot is held, for Retry-After
+        self._lock = threading.Lock()  # guards the counters read by /metrics from other threads
+        self._stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _incr(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to be free: the queue ahead, drained max_in_flight at a time."""
+        rounds = (len(self._waiters) + 1) / max(1, self.max_in_flight)
+        return max(1, math.ceil(self._service_time * rounds))
+
+    async def acquire(self) -> float:
+        """Takes a slot, waiting in the queue if needed; returns the seconds spent waiting."""
+        start = time.perf_counter()
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            self._incr("admitted")
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            self._incr("rejected_queue_full")
+            raise AdmissionRejected("queue_full", self.retry_after())
+
+        self._incr("queued")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # the slot was handed over just as we gave up: pass it on
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._incr("rejected_timeout")
+            raise AdmissionRejected("queue_timeout", self.retry_after()) from None
+        self._incr("admitted")
+        return time.perf_counter() - start
+
+    def release(self, held_for: float = None):
+        if held_for is not None:
+            self._service_time = 0.8 * self._service_time + 0.2 * held_for
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # hand the slot over; _in_flight is unchanged
+                return
+        self._in_flight -= 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(
+            in_flight=self._in_flight,
+            queue_depth=len(self._waiters),
+            max_in_flight=self.max_in_flight,
+            max_queue=self.max_queue,
+            service_time_s=round(self._service_time, 3),
+        )
+        return stats
+
+
+def collect_admission_metrics(controller: AdmissionController) -> List[str]:
+    """/metrics lines for one controller (registered with registry.add_collector in factory.py)."""
+    stats = controller.stats()
+    return [
+        "# HELP registration_admission_in_flight LLM-bound validations currently admitted.",
+        "# TYPE registration_admission_in_flight gauge",
+        f"registration_admission_in_flight {stats['in_flight']}",
+        "# HELP registration_admission_queue_depth Validations waiting for an admission slot.",
+        "# TYPE registration_admission_queue_depth gauge",
+        f"registration_admission_queue_depth {stats['queue_depth']}",
+        "# HELP registration_admission_rejected_total Validations rejected with 429, by reason.",
+        "# TYPE registration_admission_rejected_total counter",
+        f'registration_admission_rejected_total{{reason="queue_full"}} {stats["rejected_queue_full"]}',
+        f'registration_admission_rejected_total{{reason="queue_timeout"}} {stats["rejected_timeout"]}',
+    ]
+
+
+class AdmissionValidator(BaseValidator):
+    """Runs the wrapped validator's async calls under an AdmissionController."""
+
+    def __init__(self, validator: BaseValidator, engine: str, controller: AdmissionController):
+        self.validator = validator
+        self.engine = engine
+        self.controller = controller
+
+    async def _acquire(self):
+        waited = await self.controller.acquire()
+        STAGE_LATENCY.observe(("admission_wait", self.engine), waited)
+
+    def validate(self, question: str, user_answer: str) -> Dict[str, str]:
+        return self.validator.validate(question, user_answer)
+
+    async def avalidate(self, question: str, user_answer: str) -> Dict[str, str]:
+        await self._acquire()
+        start = time.perf_counter()
+        try:
+            return await self.validator.avalidate(question, user_answer)
+        finally:
+            self.controller.release(time.perf_counter() - start)
+
+    async def astream_validate(self, question: str, user_answer: str):
+        await self._acquire()
+        start = time.perf_counter()
+        try:
+            async for event in self.validator.astream_validate(question, user_answer):
+                yield event
+        finally:
+            self.controller.release(time.perf_counter() - start)
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
 
 """_summary_
 Summary: This file establishes BaseValidator as an abstract interface, 
@@ -10,6 +11,18 @@ Declares an abstract method validate that takes:
 question: A string (e.g., "What is your email?").
 user_answer: A string (e.g., "john@gmail.com").
 Returns a dictionary with string keys and values (e.g., {"status": "valid", "feedback": "...", "formatted_answer": "..."}).
+
+avalidate is the async counterpart used by the async endpoints. The default runs validate
+in a worker thread; validators with an async-native client override it.
+
+astream_validate is the streaming counterpart used by /submit_response/stream. It yields
+("feedback", text) events as feedback is generated, then exactly one ("result", dict) event.
+The default yields the whole feedback at once; LLM validators override it to stream tokens.
+
+avalidate_batch validates several independent (question, user_answer) pairs, used by
+BatchingValidator (app/validation/batching.py). It returns one result per pair, in order, or
+None for a pair the batch could not settle (the caller then validates it on its own).
+The default validates each pair separately; LLM validators override it with a single call.
 """
 
 class BaseValidator(ABC):
@@ -19,6 +32,21 @@ class BaseValidator(ABC):
     def validate(self, question: str, user_answer: str) -> Dict[str, str]:
         """Validate the user input and return a structured response."""
         pass
+
+    async def avalidate(self, question: str, user_answer: str) -> Dict[str, str]:
+        """Async validation. Falls back to running validate in a worker thread."""
+        return await asyncio.to_thread(self.validate, question, user_answer)
+
+    async def astream_validate(self, question: str, user_answer: str) -> AsyncIterator[Tuple[str, object]]:
+        """Streaming validation. Falls back to avalidate and emits its feedback in one event."""
+        result = await self.avalidate(question, user_answer)
+        if result.get("feedback"):
+            yield "feedback", result["feedback"]
+        yield "result", result
+
+    async def avalidate_batch(self, items: List[Tuple[str, str]]) -> List[Optional[Dict[str, str]]]:
+        """Batch validation. Falls back to one avalidate call per item, run concurrently."""
+        return list(await asyncio.gather(*(self.avalidate(question, user_answer) for question, user_answer in items)))
     
 
 ### Example:
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from typing import Dict, List
+from app.validation.base_validator import BaseValidator
+from app.helpers.metrics import STAGE_LATENCY, VALIDATION_BATCH_SIZE
+
+"""_summary_
+Summary: Cross-session micro-batching of LLM validation calls.
+
+Under peak signup load every answer is its own LLM request. BatchingValidator holds async
+validations for up to VALIDATION_BATCH_WINDOW_MS (or until VALIDATION_BATCH_MAX_SIZE are
+waiting), then validates them all in one structured call (avalidate_batch: one
+ValidatedLLMResponse per item) and hands each waiting request its own result.
+
+    window closes with 1 item      plain avalidate call, no batch prompt
+    window closes with 2+ items    one avalidate_batch call
+    batch call fails, or an item   those items are validated one by one (concurrently),
+    is missing/malformed           so a bad batch reply never fails a request
+
+The trade-off is up to one window of queueing per answer for far fewer round trips and
+rate-limit hits. Only the async path batches: validate (sync) and astream_validate
+(streaming, where time to first token matters) pass straight through.
+
+Metrics: registration_validation_batch_size{engine} (items per call) and the
+"batch_queue_wait" stage in registration_stage_duration_seconds (time spent waiting for the
+window); counters under "batching" in /validation_stats.
+"""
+
+
+class BatchCounters:
+    """Thread-safe counters for batched validation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"batches": 0, "batched_items": 0, "single_items": 0, "fallback_items": 0, "batch_failures": 0}
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            counts = dict(self._counts)
+        counts["avg_batch_size"] = round(counts["batched_items"] / counts["batches"], 2) if counts["batches"] else 0.0
+        return counts
+
+
+batch_counters = BatchCounters()
+
+
+class _Queue:
+    """Items waiting for the current window on one event loop."""
+
+    __slots__ = ("items", "timer")
+
+    def __init__(self):
+        self.items = []  # (question, user_answer, future, enqueued_at)
+        self.timer = None
+
+
+class BatchingValidator(BaseValidator):
+    """Collects concurrent async validations for a short window and validates them in one LLM call."""
+
+    def __init__(
+        self,
+        validator: BaseValidator,
+        engine: str,
+        window_ms: float,
+        max_batch_size: int,
+        counters: BatchCounters = batch_counters,
+    ):
+        self.validator = validator
+        self.engine = engine
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.counters = counters
+        self._queues = weakref.WeakKeyDictionary()  # event loop -> _Queue
+        self._tasks = set()  # running batches, referenced until done
+
+    def validate(self, question: str, user_answer: str) -> Dict[str, str]:
+        return self.validator.validate(question, user_answer)
+
+    async def astream_validate(self, question: str, user_answer: str):
+        async for event in self.validator.astream_validate(question, user_answer):
+            yield event
+
+    async def avalidate(self, question: str, user_answer: str) -> Dict[str, str]:
+        loop = asyncio.get_running_loop()
+        queue = self._queues.get(loop)
+        if queue is None:
+            queue = self._queues[loop] = _Queue()
+
+        future = loop.create_future()
+        queue.items.append((question, user_answer, future, time.perf_counter()))
+        if len(queue.items) >= self.max_batch_size:
+            self._dispatch(loop, queue)
+        elif queue.timer is None:
+            queue.timer = loop.call_later(self.window, self._dispatch, loop, queue)
+        return dict(await future)
+
+    def _dispatch(self, loop, queue: _Queue):
+        if queue.timer is not None:
+            queue.timer.cancel()
+            queue.timer = None
+        items, queue.items = queue.items, []
+        if items:
+            task = loop.create_task(self._run_batch(items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, items: List[tuple]):
+        dispatched = time.perf_counter()
+        for _, _, _, enqueued_at in items:
+            STAGE_LATENCY.observe(("batch_queue_wait", self.engine), dispatched - enqueued_at)
+        VALIDATION_BATCH_SIZE.observe((self.engine,), len(items))
+
+        pairs = [(question, user_answer) for question, user_answer, _, _ in items]
+        try:
+            if len(pairs) == 1:
+                self.counters.incr("single_items")
+                results = [None]
+            else:
+                self.counters.incr("batches")
+                self.counters.incr("batched_items", len(pairs))
+                try:
+                    results = list(await self.validator.avalidate_batch(pairs))
+                    if len(results) != len(pairs):
+                        raise ValueError(f"{len(results)} results for {len(pairs)} items")
+                except Exception as e:
+                    logging.warning(f"Batched validation of {len(pairs)} items failed, validating one by one: {e}")
+                    self.counters.incr("batch_failures")
+                    results = [None] * len(pairs)
+                missing = sum(result is None for result in results)
+                if missing:
+                    self.counters.incr("fallback_items", missing)
+
+            async def validate_one(i: int):
+                try:
+                    results[i] = await self.validator.avalidate(*pairs[i])
+                except Exception as e:
+                    results[i] = e
+
+            await asyncio.gather(*(validate_one(i) for i, result in enumerate(results) if result is None))
+        except BaseException as e:  # e.g. cancelled on shutdown: release every waiting request
+            for _, _, future, _ in items:
+                if future.done():
+                    continue
+                if isinstance(e, Exception):
+                    future.set_exception(e)
+                else:
+                    future.cancel()
+            raise
+
+        for (_, _, future, _), result in zip(items, results):
+            if future.done():  # the request was cancelled while waiting
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
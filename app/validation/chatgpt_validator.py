@@ -1,10 +1,15 @@
 import openai
 import guardrails as gd
 import json
-from typing import Dict
+import re
+from typing import Dict, List, Optional, Tuple
 from app.validation.base_validator import BaseValidator
 from app.validation.validated_response import ValidatedLLMResponse
-from app.helpers.config import OPENAI_API_KEY, MLFLOW_ENABLED, MLFLOW_EXPERIMENT_NAME
+from app.validation.http_pool import get_http_client, get_async_http_client
+from app.helpers.config import OPENAI_API_KEY, OPENAI_BASE_URL, MLFLOW_ENABLED
+from app.helpers.telemetry import telemetry
+from app.helpers.metrics import STAGE_LATENCY
+import time
 import mlflow
 
 if MLFLOW_ENABLED:
@@ -13,26 +18,91 @@ if MLFLOW_ENABLED:
 guard = gd.Guard.for_pydantic(ValidatedLLMResponse)
 
 
+SYSTEM_PROMPT = (
+    "You are a helpful assistant that validates user responses. "
+    "You must respond in JSON format with a clear validation status. "
+    "If the response is valid, return: {'status': 'valid', 'feedback': '<feedback message>', 'formatted_answer': '<formatted response>'}. "
+    "If the response needs clarification, return: {'status': 'clarify', 'feedback': '<clarification message>', 'formatted_answer': '<original response>'}."
+    "For phone numbers (when 'phone' is in the question): Format as 0XX XXX XXXX (landline, 10 digits) or 07XXX XXX XXX (mobile, 11 digits). Accept numbers starting with +44 only if there are exactly 10 digits follow +44 (e.g. +447700900123,+44 7700 900 123 ), then Convert +44 to 0 (e.g. +447700900123 → 07700 900 123); reject other +44 formats (e.g., +4407442757070, +44 0744 275 7070) with status='clarify'." 
+    "Ensure proper formatting: lowercase emails, capitalized names, standardized phone numbers and addresses."
+)
+
+# Several independent answers in one request (BatchingValidator); results are matched back by id.
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + (
+    " You will receive a JSON list of items, each with an 'id', a 'question' and a 'user_answer'. "
+    "Validate every item independently with the rules above and respond in JSON format: "
+    "{'results': [{'id': <item id>, 'status': ..., 'feedback': ..., 'formatted_answer': ...}, ...]}, "
+    "with exactly one result per item."
+)
+
+
+class JsonStringFieldStream:
+    """
+    Incrementally decodes one string field of a JSON object while the object is still streaming in.
+    feed() returns the newly decoded characters of the field's value, e.g. the "feedback" text.
+    """
+
+    _ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self, field: str):
+        self._start = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._position = None  # index of the next undecoded character of the value
+        self.done = False
+
+    def feed(self, text: str) -> str:
+        self._buffer += text
+        if self.done:
+            return ""
+        if self._position is None:
+            match = self._start.search(self._buffer)
+            if not match:
+                return ""
+            self._position = match.end()
+
+        buffer, i, decoded = self._buffer, self._position, []
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self.done = True
+                break
+            if char == "\\":
+                if i + 1 >= len(buffer):
+                    break  # escape split across chunks
+                escape = buffer[i + 1]
+                if escape == "u":
+                    if i + 6 > len(buffer):
+                        break
+                    decoded.append(chr(int(buffer[i + 2 : i + 6], 16)))
+                    i += 6
+                    continue
+                decoded.append(self._ESCAPES.get(escape, escape))
+                i += 2
+                continue
+            decoded.append(char)
+            i += 1
+        self._position = i
+        return "".join(decoded)
+
+
 class ChatGPTValidator(BaseValidator):
     """ChatGPT-based implementation of the validation strategy."""
 
-    def validate(self, question: str, user_answer: str) -> Dict[str, str]:
-        """Uses OpenAI ChatGPT to validate responses."""
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
+    def __init__(self):
+        # Long-lived clients on the shared keep-alive pools; created once per process.
+        self.client = openai.OpenAI(
+            api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, http_client=get_http_client()
+        )
+        self.async_client = openai.AsyncOpenAI(
+            api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, http_client=get_async_http_client()
+        )
 
-        response = client.chat.completions.create(
+    @staticmethod
+    def _build_request(question: str, user_answer: str) -> dict:
+        return dict(
             model="gpt-4.1-mini", 
             messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a helpful assistant that validates user responses. "
-                        "You must respond in JSON format with a clear validation status. "
-                        "If the response is valid, return: {'status': 'valid', 'feedback': '<feedback message>', 'formatted_answer': '<formatted response>'}. "
-                        "If the response needs clarification, return: {'status': 'clarify', 'feedback': '<clarification message>', 'formatted_answer': '<original response>'}."
-                        "For phone numbers (when 'phone' is in the question): Format as 0XX XXX XXXX (landline, 10 digits) or 07XXX XXX XXX (mobile, 11 digits). Accept numbers starting with +44 only if there are exactly 10 digits follow +44 (e.g. +447700900123,+44 7700 900 123 ), then Convert +44 to 0 (e.g. +447700900123 → 07700 900 123); reject other +44 formats (e.g., +4407442757070, +44 0744 275 7070) with status='clarify'." 
-                        "Ensure proper formatting: lowercase emails, capitalized names, standardized phone numbers and addresses."),
-                },
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {
                     "role": "user",
                     "content": f"Question: {question}\nUser Answer: {user_answer}\nValidate the answer.",
@@ -41,35 +111,122 @@ class ChatGPTValidator(BaseValidator):
             response_format={"type": "json_object"},
         )
 
+    @staticmethod
+    def _build_batch_request(items: List[Tuple[str, str]]) -> dict:
+        payload = [
+            {"id": i, "question": question, "user_answer": user_answer}
+            for i, (question, user_answer) in enumerate(items)
+        ]
+        return dict(
+            model="gpt-4.1-mini",
+            messages=[
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Items: {json.dumps(payload)}\nValidate every item."},
+            ],
+            response_format={"type": "json_object"},
+        )
+
+    @classmethod
+    def _parse_response(cls, response, question: str, user_answer: str) -> Dict[str, str]:
+        return cls._parse_content(response.choices[0].message.content, question, user_answer)
+
+    @staticmethod
+    def _parse_content(content: str, question: str, user_answer: str) -> Dict[str, str]:
         try:
-            validation_str = response.choices[0].message.content.strip()
+            validation_str = content.strip()
             validation_result = json.loads(validation_str)
-            print(validation_result)
 
             # Apply Guardrails AI
+            start = time.perf_counter()
             validated_result = guard.parse(json.dumps(validation_result))
+            STAGE_LATENCY.observe(("guard_parse", "chatgpt"), time.perf_counter() - start)
             validated_dict = validated_result.validated_output
-            print(validated_dict)
         except (json.JSONDecodeError, KeyError):
-            validation_result = {
+            validated_dict = None
+
+        if validated_dict is None:  # unparseable reply, or it failed Guardrails validation
+            validated_dict = {
                 "status": "error",
                 "feedback": "Error processing validation response.",
                 "formatted_answer": user_answer,
             }
+        else:
+            validated_dict = dict(validated_dict)
 
-        if MLFLOW_ENABLED:
-            mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
-            with mlflow.start_run(nested=True):
-                mlflow.log_param("validation_engine", "ChatGPT")
-                mlflow.log_param("question", question)
-                mlflow.log_param("input_answer", user_answer)
-                mlflow.log_param("status", validated_dict.get("status", "error"))
-                mlflow.log_param(
-                    "feedback", validated_dict.get("feedback", "No feedback")
-                )
-                mlflow.log_param(
-                    "formatted_answer",
-                    validated_dict.get("formatted_answer", user_answer),
-                )
+        telemetry.emit(
+            {
+                "validation_engine": "ChatGPT",
+                "question": question,
+                "input_answer": user_answer,
+                "status": validated_dict.get("status", "error"),
+                "feedback": validated_dict.get("feedback", "No feedback"),
+                "formatted_answer": validated_dict.get("formatted_answer", user_answer),
+            }
+        )
 
         return validated_dict
+
+    @classmethod
+    def _parse_batch_content(cls, content: str, items: List[Tuple[str, str]]) -> List[Optional[Dict[str, str]]]:
+        """One Guardrails-checked result per item; None for items missing from or malformed in the reply."""
+        try:
+            results = {str(result.get("id")): result for result in json.loads(content)["results"]}
+        except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+            return [None] * len(items)
+
+        parsed = []
+        for i, (question, user_answer) in enumerate(items):
+            result = results.get(str(i))
+            if not isinstance(result, dict) or any(key not in result for key in ("status", "feedback", "formatted_answer")):
+                parsed.append(None)
+                continue
+            try:
+                item = cls._parse_content(
+                    json.dumps({key: result[key] for key in ("status", "feedback", "formatted_answer")}),
+                    question,
+                    user_answer,
+                )
+            except Exception:
+                item = None
+            parsed.append(item if item and item["status"] != "error" else None)  # errors are retried one by one
+        return parsed
+
+    def validate(self, question: str, user_answer: str) -> Dict[str, str]:
+        """Uses OpenAI ChatGPT to validate responses."""
+        start = time.perf_counter()
+        response = self.client.chat.completions.create(**self._build_request(question, user_answer))
+        STAGE_LATENCY.observe(("llm_call", "chatgpt"), time.perf_counter() - start)
+        return self._parse_response(response, question, user_answer)
+
+    async def avalidate(self, question: str, user_answer: str) -> Dict[str, str]:
+        """Async variant: awaits the OpenAI call on the event loop instead of blocking a thread."""
+        start = time.perf_counter()
+        response = await self.async_client.chat.completions.create(**self._build_request(question, user_answer))
+        STAGE_LATENCY.observe(("llm_call", "chatgpt"), time.perf_counter() - start)
+        return self._parse_response(response, question, user_answer)
+
+    async def avalidate_batch(self, items: List[Tuple[str, str]]) -> List[Optional[Dict[str, str]]]:
+        """Validates several answers in one completion; see BATCH_SYSTEM_PROMPT."""
+        start = time.perf_counter()
+        response = await self.async_client.chat.completions.create(**self._build_batch_request(items))
+        STAGE_LATENCY.observe(("llm_batch_call", "chatgpt"), time.perf_counter() - start)
+        return self._parse_batch_content(response.choices[0].message.content, items)
+
+    async def astream_validate(self, question: str, user_answer: str):
+        """Streams the "feedback" field as the completion arrives, then the Guardrails-checked result."""
+        start = time.perf_counter()
+        feedback = JsonStringFieldStream("feedback")
+        content = []
+        stream = await self.async_client.chat.completions.create(
+            **self._build_request(question, user_answer), stream=True
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            content.append(delta)
+            text = feedback.feed(delta)
+            if text:
+                yield "feedback", text
+        STAGE_LATENCY.observe(("llm_call", "chatgpt"), time.perf_counter() - start)
+        yield "result", self._parse_content("".join(content), question, user_answer)
@@ -0,0 +1,296 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Tuple
+from app.validation.base_validator import BaseValidator
+from app.helpers.fields import classify_question
+from app.validation.validated_response import ValidatedLLMResponse
+
+"""_summary_
+Summary: Per-call deadlines, a circuit breaker and a local-rule fallback for the LLM engine.
+
+Neither engine had a deadline: a slow OpenAI response held the request until the client
+gave up, and during an upstream outage every answer came back as "An error occurred during
+validation." ResilientValidator wraps the engine directly:
+
+    every call          is cut off after VALIDATION_TIMEOUT seconds
+    timeout, exception  counts as a failure and the answer is settled by local_fallback
+    or "error" status   (the deterministic ValidatedLLMResponse formatters), marked degraded
+    circuit open        the LLM is not called at all; every answer goes to local_fallback
+
+The breaker opens after CIRCUIT_FAILURE_THRESHOLD consecutive failures. After
+CIRCUIT_RESET_TIMEOUT seconds it goes half-open and lets one probe call through: success
+closes it, failure opens it again. Transitions are logged and counted; the state is exported
+as registration_circuit_state (0 closed, 1 half-open, 2 open) and under "circuit" in
+/validation_stats.
+
+Degraded results carry "degraded": True. They are never cached, so answers are validated by
+the LLM again once it recovers. Fields without a local rule (username, unknown questions) are
+answered with "clarify" and TRY_AGAIN_SHORTLY; a password only needs PASSWORD_MIN_LENGTH
+characters. main.py does not complete a registration on a degraded answer, and bulk import
+defers rows that have one.
+
+Example (circuit open):
+    "What is your phone number?" + "+44 7700 900 123" -> valid, "07700 900 123", degraded
+    "Choose a username." + "jdoe_88"                  -> clarify, "try again in a moment", degraded
+"""
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+# "12 High Street, London, SW1A 1AA": house number written in front of the street
+HOUSE_NUMBER_FIRST = re.compile(r"^\s*(\d+[A-Za-z]?)\s+([^,]+),([^,]+),([^,]+)$")
+PASSWORD_MIN_LENGTH = 8
+TRY_AGAIN_SHORTLY = "We can't check this answer right now. Please try again in a moment."
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe (thread-safe)."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0  # consecutive
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._transitions: Dict[str, int] = {}
+        self._stats = {"calls": 0, "successes": 0, "failures": 0, "timeouts": 0, "short_circuited": 0, "degraded": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def _transition(self, state: str):
+        """Caller holds the lock."""
+        key = f"{self._state}->{state}"
+        self._transitions[key] = self._transitions.get(key, 0) + 1
+        logging.warning(f"Circuit '{self.name}' {key} (consecutive failures: {self._failures})")
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """True if a call may go to the LLM now; False means use the fallback."""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            if self._state == CLOSED or (self._state == HALF_OPEN and not self._probe_in_flight):
+                self._probe_in_flight = self._state == HALF_OPEN
+                self._stats["calls"] += 1
+                return True
+            self._stats["short_circuited"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._stats["successes"] += 1
+            self._failures = 0
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self, timeout: bool = False):
+        with self._lock:
+            self._stats["failures"] += 1
+            if timeout:
+                self._stats["timeouts"] += 1
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._transition(OPEN)
+
+    def release(self):
+        """The call was cancelled (client went away): neither a success nor a failure."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_degraded(self, count: int = 1):
+        with self._lock:
+            self._stats["degraded"] += count
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                state=self._state,
+                consecutive_failures=self._failures,
+                transitions=dict(self._transitions),
+                open_for_s=round(time.monotonic() - self._opened_at, 1) if self._state == OPEN else 0.0,
+            )
+        return stats
+
+
+def collect_circuit_metrics(breaker: CircuitBreaker) -> List[str]:
+    """/metrics lines for one breaker (registered with registry.add_collector in factory.py)."""
+    stats = breaker.stats()
+    lines = [
+        "# HELP registration_circuit_state LLM circuit breaker state (0 closed, 1 half-open, 2 open).",
+        "# TYPE registration_circuit_state gauge",
+        f'registration_circuit_state{{engine="{breaker.name}"}} {STATE_VALUES[stats["state"]]}',
+        "# HELP registration_circuit_transitions_total LLM circuit breaker state transitions.",
+        "# TYPE registration_circuit_transitions_total counter",
+    ]
+    for transition, count in sorted(stats["transitions"].items()):
+        source, target = transition.split("->")
+        lines.append(f'registration_circuit_transitions_total{{from="{source}",to="{target}"}} {count}')
+    lines += [
+        "# HELP registration_validation_degraded_total Answers validated by local rules because the LLM failed or the circuit was open.",
+        "# TYPE registration_validation_degraded_total counter",
+        f"registration_validation_degraded_total {stats['degraded']}",
+        "# HELP registration_llm_timeouts_total LLM validation calls cut off at VALIDATION_TIMEOUT.",
+        "# TYPE registration_llm_timeouts_total counter",
+        f"registration_llm_timeouts_total {stats['timeouts']}",
+    ]
+    return lines
+
+
+def local_fallback(question: str, user_answer: str) -> Dict[str, str]:
+    """Validates with the deterministic ValidatedLLMResponse formatters only; always settles the answer."""
+    answer = (user_answer or "").strip()
+    field = classify_question(question)
+    if not answer:
+        status, feedback, formatted = "clarify", "Please provide an answer to the question.", user_answer or ""
+    elif field == "email":
+        formatted = ValidatedLLMResponse.validate_email(answer)
+        status, feedback = ("valid", "Email address looks good.") if formatted != "clarify" else (
+            "clarify", "Please enter a valid email address (e.g., name@example.com)."
+        )
+    elif field == "phone":
+        formatted = ValidatedLLMResponse.validate_phone(answer)
+        status, feedback = ("valid", "Phone number looks good.") if formatted != "clarify" else (
+            "clarify", "Please enter a UK phone number, e.g., 020 123 4567 or 07700 900 123."
+        )
+    elif field == "address":
+        formatted = ValidatedLLMResponse.validate_address(answer)
+        match = HOUSE_NUMBER_FIRST.match(answer)
+        if formatted == "clarify" and match:  # the LLM would split this itself
+            formatted = ValidatedLLMResponse.validate_address(", ".join(match.groups()))
+        status, feedback = ("valid", "Address looks good.") if formatted != "clarify" else (
+            "clarify", "Please enter your address as: house number, street, town, postcode (e.g., 12, High Street, London, SW1A 1AA)."
+        )
+    elif field == "name":
+        status, feedback, formatted = "valid", "Name looks good.", ValidatedLLMResponse.validate_name(answer)
+    elif field == "password":
+        status, feedback, formatted = ("valid", "Password recorded.", answer) if len(answer) >= PASSWORD_MIN_LENGTH else (
+            "clarify", f"Please choose a password of at least {PASSWORD_MIN_LENGTH} characters.", answer
+        )
+    else:  # username and unknown questions have no local rule: ask again once the LLM is back
+        status, feedback, formatted = "clarify", TRY_AGAIN_SHORTLY, answer
+    if status == "clarify":
+        formatted = user_answer
+    return {"status": status, "feedback": feedback, "formatted_answer": formatted, "degraded": True}
+
+
+class ResilientValidator(BaseValidator):
+    """Wraps an LLM validator with a per-call deadline, a circuit breaker and local_fallback."""
+
+    def __init__(self, validator: BaseValidator, breaker: CircuitBreaker, timeout: float):
+        self.validator = validator
+        self.breaker = breaker
+        self.timeout = timeout
+        self._executor = None  # deadline threads for the sync path, created on first use
+        self._executor_lock = threading.Lock()
+
+    def _fallback(self, question: str, user_answer: str) -> Dict[str, str]:
+        self.breaker.record_degraded()
+        return local_fallback(question, user_answer)
+
+    def _settle(self, question: str, user_answer: str, result: Dict[str, str]) -> Dict[str, str]:
+        """Records the outcome of an LLM call; an "error" result is replaced by the fallback."""
+        if result.get("status") == "error":
+            self.breaker.record_failure()
+            return self._fallback(question, user_answer)
+        self.breaker.record_success()
+        return result
+
+    def _failed(self, question: str, user_answer: str, error: Exception) -> Dict[str, str]:
+        timeout = isinstance(error, (asyncio.TimeoutError, FutureTimeoutError))
+        logging.error(f"LLM validation {'timed out' if timeout else 'failed'}, using local rules: {error!r}")
+        self.breaker.record_failure(timeout=timeout)
+        return self._fallback(question, user_answer)
+
+    def validate(self, question: str, user_answer: str) -> Dict[str, str]:
+        if not self.breaker.allow():
+            return self._fallback(question, user_answer)
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="llm-deadline")
+        # The abandoned call finishes in its thread; the request does not wait for it.
+        future = self._executor.submit(self.validator.validate, question, user_answer)
+        try:
+            result = future.result(timeout=self.timeout)
+        except Exception as e:
+            return self._failed(question, user_answer, e)
+        return self._settle(question, user_answer, result)
+
+    async def avalidate(self, question: str, user_answer: str) -> Dict[str, str]:
+        if not self.breaker.allow():
+            return self._fallback(question, user_answer)
+        try:
+            result = await asyncio.wait_for(self.validator.avalidate(question, user_answer), self.timeout)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception as e:
+            return self._failed(question, user_answer, e)
+        return self._settle(question, user_answer, result)
+
+    async def avalidate_batch(self, items: List[Tuple[str, str]]) -> List[Optional[Dict[str, str]]]:
+        if not self.breaker.allow():
+            self.breaker.record_degraded(len(items))
+            return [local_fallback(question, user_answer) for question, user_answer in items]
+        try:
+            results = await asyncio.wait_for(self.validator.avalidate_batch(items), self.timeout)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception as e:
+            logging.error(f"Batched LLM validation failed, using local rules: {e!r}")
+            self.breaker.record_failure(timeout=isinstance(e, asyncio.TimeoutError))
+            self.breaker.record_degraded(len(items))
+            return [local_fallback(question, user_answer) for question, user_answer in items]
+        # Per item, like avalidate: "error" items count as failures and get the fallback;
+        # None (unparsed) items are left for BatchingValidator to retry one by one.
+        settled = [
+            result if result is None else self._settle(question, user_answer, result)
+            for (question, user_answer), result in zip(items, results)
+        ]
+        if all(result is None for result in results):
+            self.breaker.release()  # nothing to judge the LLM by; free a half-open probe
+        return settled
+
+    async def astream_validate(self, question: str, user_answer: str):
+        if not self.breaker.allow():
+            result = self._fallback(question, user_answer)
+            yield "feedback", result["feedback"]
+            yield "result", result
+            return
+
+        deadline = time.monotonic() + self.timeout
+        stream = self.validator.astream_validate(question, user_answer).__aiter__()
+        streamed = False
+        try:
+            while True:
+                kind, payload = await asyncio.wait_for(stream.__anext__(), max(0.0, deadline - time.monotonic()))
+                if kind == "result":
+                    result = self._settle(question, user_answer, payload)
+                    break
+                streamed = True
+                yield kind, payload
+        except StopAsyncIteration:
+            result = self._failed(question, user_answer, RuntimeError("stream ended without a result"))
+        except (asyncio.CancelledError, GeneratorExit):
+            self.breaker.release()
+            raise
+        except Exception as e:
+            result = self._failed(question, user_answer, e)
+        finally:
+            await stream.aclose()
+        if result.get("degraded") and not streamed:
+            yield "feedback", result["feedback"]
+        yield "result", result
@@ -2,20 +2,50 @@ import guardrails as gd
 import dspy
 from app.validation.base_validator import BaseValidator
 from app.validation.validated_response import ValidatedLLMResponse
-from pydantic import ValidationError
-from typing import Literal
+from app.helpers.fields import classify_question
+from pydantic import BaseModel, ValidationError
+from typing import Dict, List, Literal, Optional, Tuple
 import logging
 import json
 import mlflow
-from app.helpers.config import OPENAI_API_KEY, MLFLOW_ENABLED, MLFLOW_EXPERIMENT_NAME
+import litellm
+from app.helpers.config import OPENAI_API_KEY, OPENAI_BASE_URL, MLFLOW_ENABLED, DSPY_COMPACT_SIGNATURES
+from app.helpers.telemetry import telemetry
+from app.helpers.metrics import STAGE_LATENCY
+import time
+from app.validation.http_pool import get_http_client, get_async_http_client
 
 ###############################################
 ############# Semantic validation #############
-dspy.settings.configure(lm=dspy.LM(model="gpt-4.1-mini", api_key=OPENAI_API_KEY))
+# DSPy calls OpenAI through LiteLLM; route it through the shared keep-alive pools.
+litellm.client_session = get_http_client()
+litellm.aclient_session = get_async_http_client()
+dspy.settings.configure(lm=dspy.LM(model="gpt-4.1-mini", api_key=OPENAI_API_KEY, api_base=OPENAI_BASE_URL))
 
 if MLFLOW_ENABLED:
     mlflow.dspy.autolog()
 
+# Formatting rules, per field. The single ValidateUserAnswer signature sends all of them with
+# every call; the compact per-field signatures below send only the rules for the question asked.
+FORMAT_INTRO = "Return the response with proper formatting. "
+EXAMPLE_RULES = {
+    "email": "- Emails: Lowercase (e.g., 'John@gmail.com' → 'john@gmail.com'). ",
+    "name": "- Names: Capitalize first & last name (e.g., 'john doe' → 'John Doe'). ",
+    "address": "- Addresses: Capitalize & ensure complete info for UK (e.g., '123 high st,london,sw1a 1aa' → '123 High St, London, SW1A 1AA'). ",
+}
+PHONE_RULES = (
+    "For phone numbers: "
+    "- Extract digits, ignoring non-digit characters (e.g., '+447700900123' → '447700900123'). "
+    "- If the number starts with '44', it must have exactly 12 digits to be valid (e.g., '447700900123'). Convert to national format by replacing '44' with '0' (e.g., '447700900123' → '07700900123'). Reject if not 12 digits (e.g., '4470442767676' → 13 digits, return 'clarify'). "
+    "- After conversion, the number must start with '0'. Reject if it doesn't (e.g., '1234567890' → return 'clarify'). "
+    "- Validate as a UK landline (10 digits, starts with '0' but not '07') or mobile (11 digits, starts with '07'). "
+    "- Format valid landlines as 0XX XXX XXXX and mobiles as 07XXX XXX XXX. "
+    "- Reject invalid formats (e.g., too short, wrong digit count, or non-UK formats) with status='clarify'. "
+)
+ADDRESS_RULES = "An address must include: house number, street name, town/city, and postcode. House number and street name can be one component. If head starts with Ra, ra, fa, flata, etc, it means Room A or Flat A. 'R' or 'r' in the front means Room; 'F' or f 'f' means Flat"
+REJECT_RULE = "Reject responses that do not meet these formats with status='clarify'. "
+FALLBACK_RULE = "If the response cannot be formatted, return the original answer."
+
 # Define DSPy Signature
 class ValidateUserAnswer(dspy.Signature):
     """Validates and formats user responses. Should return 'valid', 'clarify', or 'error'."""
@@ -30,23 +60,85 @@ class ValidateUserAnswer(dspy.Signature):
         desc="Explanation if response is incorrect or needs details."
     )
     formatted_answer: str = dspy.OutputField(
-        desc="Return the response with proper formatting. Example: "
-            "- Emails: Lowercase (e.g., 'John@gmail.com' → 'john@gmail.com'). "
-            "- Names: Capitalize first & last name (e.g., 'john doe' → 'John Doe'). "
-            "- Addresses: Capitalize & ensure complete info for UK (e.g., '123 high st,london,sw1a 1aa' → '123 High St, London, SW1A 1AA'). "
-            "For phone numbers: "
-            "- Extract digits, ignoring non-digit characters (e.g., '+447700900123' → '447700900123'). "
-            "- If the number starts with '44', it must have exactly 12 digits to be valid (e.g., '447700900123'). Convert to national format by replacing '44' with '0' (e.g., '447700900123' → '07700900123'). Reject if not 12 digits (e.g., '4470442767676' → 13 digits, return 'clarify'). "
-            "- After conversion, the number must start with '0'. Reject if it doesn't (e.g., '1234567890' → return 'clarify'). "
-            "- Validate as a UK landline (10 digits, starts with '0' but not '07') or mobile (11 digits, starts with '07'). "
-            "- Format valid landlines as 0XX XXX XXXX and mobiles as 07XXX XXX XXX. "
-            "- Reject invalid formats (e.g., too short, wrong digit count, or non-UK formats) with status='clarify'. "
-            "An address must include: house number, street name, town/city, and postcode. House number and street name can be one component. If head starts with Ra, ra, fa, flata, etc, it means Room A or Flat A. 'R' or 'r' in the front means Room; 'F' or f 'f' means Flat"
-            "Reject responses that do not meet these formats with status='clarify'. "
-            "If the response cannot be formatted, return the original answer."
+        desc=FORMAT_INTRO + "Example: " + "".join(EXAMPLE_RULES.values())
+            + PHONE_RULES + ADDRESS_RULES + REJECT_RULE + FALLBACK_RULE
     )
 
 run_llm_validation = dspy.Predict(ValidateUserAnswer)
+
+
+# Compact signatures, keyed by graph node. The question is mapped to its node with
+# classify_question ("What is your phone number?" -> ask_phone); unknown questions use
+# the full ValidateUserAnswer.
+FIELD_FORMAT_RULES = {
+    "ask_email": FORMAT_INTRO + "Example: " + EXAMPLE_RULES["email"] + REJECT_RULE + FALLBACK_RULE,
+    "ask_name": FORMAT_INTRO + "Example: " + EXAMPLE_RULES["name"] + REJECT_RULE + FALLBACK_RULE,
+    "ask_address": FORMAT_INTRO + "Example: " + EXAMPLE_RULES["address"] + ADDRESS_RULES + ". " + REJECT_RULE + FALLBACK_RULE,
+    "ask_phone": FORMAT_INTRO + PHONE_RULES + FALLBACK_RULE,
+    "ask_username": FORMAT_INTRO + FALLBACK_RULE,
+    "ask_password": FORMAT_INTRO + FALLBACK_RULE,
+}
+FIELD_LABELS = {
+    "ask_email": "email address",
+    "ask_name": "full name",
+    "ask_address": "UK postal address",
+    "ask_phone": "UK phone number",
+    "ask_username": "username",
+    "ask_password": "password",
+}
+
+
+def _field_signature(node_key: str):
+    return ValidateUserAnswer.with_instructions(
+        f"Validates and formats the user's {FIELD_LABELS[node_key]}. Should return 'valid', 'clarify', or 'error'."
+    ).with_updated_fields("formatted_answer", desc=FIELD_FORMAT_RULES[node_key])
+
+
+# Built once, when the engine is imported (at startup, by the validator warmup).
+FIELD_SIGNATURES = {node_key: _field_signature(node_key) for node_key in FIELD_FORMAT_RULES}
+field_llm_validations = (
+    {node_key: dspy.Predict(signature) for node_key, signature in FIELD_SIGNATURES.items()}
+    if DSPY_COMPACT_SIGNATURES
+    else {}
+)
+
+
+def select_llm_validation(question: str):
+    """The compact per-field predictor for this question, or the full one."""
+    return field_llm_validations.get(f"ask_{classify_question(question)}", run_llm_validation)
+
+
+# Several independent answers in one LM call (BatchingValidator); results are matched back by id.
+class BatchItemResult(BaseModel):
+    id: int
+    status: Literal["valid", "clarify", "error"]
+    feedback: str
+    formatted_answer: str
+
+
+class ValidateUserAnswerBatch(dspy.Signature):
+    """Validates and formats several independent user responses. Return exactly one result per item, with the item's id."""
+
+    items: List[Dict[str, str]] = dspy.InputField(desc="Items with 'id', 'question' and 'user_answer'.")
+
+    results: List[BatchItemResult] = dspy.OutputField(
+        desc="One result per item. status, feedback and formatted_answer follow these rules: "
+        + ValidateUserAnswer.output_fields["formatted_answer"].json_schema_extra["desc"]
+    )
+
+run_llm_batch_validation = dspy.Predict(ValidateUserAnswerBatch)
+
+
+def stream_llm_validation(**kwargs):
+    """
+    Streaming variant for /submit_response/stream: yields the "feedback" field token by token,
+    then the full Prediction. StreamListeners keep per-stream state, so each call gets its own.
+    """
+    return dspy.streamify(
+        select_llm_validation(kwargs["question"]),
+        stream_listeners=[dspy.streaming.StreamListener(signature_field_name="feedback")],
+        is_async_program=True,
+    )(**kwargs)
 #################################################################
 
 #################################################
@@ -58,41 +150,104 @@ guard = gd.Guard.for_pydantic(ValidatedLLMResponse)
 class DSPyValidator(BaseValidator):
     """Uses DSPy with Guardrails AI for structured validation."""
 
-    def validate(self, question: str, user_answer: str):
-        """Validates user response, applies guardrails, and logs to MLflow."""
-        try:
-            raw_result = run_llm_validation(question=question, user_answer=user_answer)
-            structured_validation_output = guard.parse(json.dumps(raw_result.toDict()))
-            validated_dict = dict(structured_validation_output.validated_output)
-
-            if MLFLOW_ENABLED:
-                mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
-                with mlflow.start_run(nested=True):
-                    mlflow.log_param("validation_engine", "DSPy + Guardrails AI")
-                    mlflow.log_param("question", question)
-                    mlflow.log_param("input_answer", user_answer)
-                    mlflow.log_param("status", validated_dict["status"])
-                    mlflow.log_param(
-                        "formatted_answer", validated_dict["formatted_answer"]
-                    )
-
-            return {
+    def _apply_guardrails(self, raw_result, question: str, user_answer: str):
+        """Applies guardrails to the raw DSPy prediction and queues a telemetry record."""
+        return self._guard_output(raw_result.toDict(), question, user_answer)
+
+    def _guard_output(self, raw_output: dict, question: str, user_answer: str):
+        start = time.perf_counter()
+        structured_validation_output = guard.parse(json.dumps(raw_output))
+        STAGE_LATENCY.observe(("guard_parse", "dspy"), time.perf_counter() - start)
+        validated_dict = dict(structured_validation_output.validated_output)
+
+        telemetry.emit(
+            {
+                "validation_engine": "DSPy + Guardrails AI",
+                "question": question,
+                "input_answer": user_answer,
                 "status": validated_dict["status"],
-                "feedback": validated_dict["feedback"],
                 "formatted_answer": validated_dict["formatted_answer"],
             }
+        )
 
-        except ValidationError as ve:
-            logging.error(f"Validation error: {str(ve)}")
-            return {
-                "status": "error",
-                "feedback": "Output validation failed.",
-                "formatted_answer": user_answer,
-            }
+        return {
+            "status": validated_dict["status"],
+            "feedback": validated_dict["feedback"],
+            "formatted_answer": validated_dict["formatted_answer"],
+        }
+
+    @staticmethod
+    def _error_result(error: Exception, user_answer: str):
+        logging.error(f"Validation error: {str(error)}")
+        if isinstance(error, ValidationError):
+            feedback = "Output validation failed."
+        else:
+            feedback = "An error occurred during validation."
+        return {
+            "status": "error",
+            "feedback": feedback,
+            "formatted_answer": user_answer,
+        }
+
+    def validate(self, question: str, user_answer: str):
+        """Validates user response, applies guardrails, and logs to telemetry (MLflow)."""
+        try:
+            start = time.perf_counter()
+            raw_result = select_llm_validation(question)(question=question, user_answer=user_answer)
+            STAGE_LATENCY.observe(("llm_call", "dspy"), time.perf_counter() - start)
+            return self._apply_guardrails(raw_result, question, user_answer)
+        except Exception as e:
+            return self._error_result(e, user_answer)
+
+    async def avalidate(self, question: str, user_answer: str):
+        """Async variant: uses DSPy's async LM call so the event loop is not blocked."""
+        try:
+            start = time.perf_counter()
+            raw_result = await select_llm_validation(question).acall(question=question, user_answer=user_answer)
+            STAGE_LATENCY.observe(("llm_call", "dspy"), time.perf_counter() - start)
+            return self._apply_guardrails(raw_result, question, user_answer)
+        except Exception as e:
+            return self._error_result(e, user_answer)
+
+    async def avalidate_batch(self, items: List[Tuple[str, str]]) -> List[Optional[Dict[str, str]]]:
+        """Validates several answers in one LM call; items missing from the prediction come back as None."""
+        start = time.perf_counter()
+        raw_result = await run_llm_batch_validation.acall(
+            items=[
+                {"id": str(i), "question": question, "user_answer": user_answer}
+                for i, (question, user_answer) in enumerate(items)
+            ]
+        )
+        STAGE_LATENCY.observe(("llm_batch_call", "dspy"), time.perf_counter() - start)
+
+        by_id = {result.id: result for result in raw_result.results}
+        parsed = []
+        for i, (question, user_answer) in enumerate(items):
+            result = by_id.get(i)
+            try:
+                parsed.append(None if result is None else self._guard_output(result.model_dump(exclude={"id"}), question, user_answer))
+            except Exception as e:
+                logging.warning(f"Batch item {i} failed output validation: {e}")
+                parsed.append(None)
+        return parsed
+
+    async def astream_validate(self, question: str, user_answer: str):
+        """Streams the feedback field as the LM generates it, then the Guardrails-checked result."""
+        try:
+            start = time.perf_counter()
+            raw_result, streamed = None, False
+            async for value in stream_llm_validation(question=question, user_answer=user_answer):
+                if isinstance(value, dspy.streaming.StreamResponse):
+                    streamed = True
+                    yield "feedback", value.chunk
+                elif isinstance(value, dspy.Prediction):
+                    raw_result = value
+            STAGE_LATENCY.observe(("llm_call", "dspy"), time.perf_counter() - start)
+            if raw_result is None:
+                raise RuntimeError("DSPy stream ended without a prediction.")
+            result = self._apply_guardrails(raw_result, question, user_answer)
+            if not streamed:  # LM cache hit: nothing was streamed
+                yield "feedback", result["feedback"]
         except Exception as e:
-            logging.error(f"Validation error: {str(e)}")
-            return {
-                "status": "error",
-                "feedback": "An error occurred during validation.",
-                "formatted_answer": user_answer,
-            }
\ No newline at end of file
+            result = self._error_result(e, user_answer)
+        yield "result", result
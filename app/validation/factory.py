@@ -1,23 +1,179 @@
-from app.validation.dspy_validator import DSPyValidator
-from app.validation.chatgpt_validator import ChatGPTValidator
-from app.helpers.config import VALIDATION_ENGINE
+import functools
+import importlib
+from app.validation.tiered_validator import TieredValidator, tier_counters
+from app.validation.validation_cache import CachedValidator, ValidationCache
+from app.validation.single_flight import CoalescingValidator, coalescing_counters
+from app.validation.batching import BatchingValidator, batch_counters
+from app.validation.admission import AdmissionController, AdmissionValidator, collect_admission_metrics
+from app.validation.circuit_breaker import CircuitBreaker, ResilientValidator, collect_circuit_metrics
+from app.validation.hedging import HedgedValidator, LatencyWindow, collect_hedge_metrics, hedge_counters
+from app.validation.http_pool import connection_stats
+from app.helpers.telemetry import telemetry
+from app.helpers.metrics import STAGE_LATENCY, registry
+import time
+import threading
+from app.helpers.config import (
+    VALIDATION_ENGINE,
+    VALIDATION_FAST_PATH,
+    VALIDATION_CACHE_ENABLED,
+    VALIDATION_CACHE_SIZE,
+    VALIDATION_CACHE_TTL,
+    VALIDATION_CACHE_EXCLUDE,
+    VALIDATION_COALESCE,
+    VALIDATION_BATCHING,
+    VALIDATION_BATCH_WINDOW_MS,
+    VALIDATION_BATCH_MAX_SIZE,
+    ADMISSION_ENABLED,
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT,
+    VALIDATION_TIMEOUT,
+    CIRCUIT_BREAKER_ENABLED,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    VALIDATION_HEDGE_ENGINE,
+    VALIDATION_HEDGE_PERCENTILE,
+    VALIDATION_HEDGE_DEFAULT_DELAY_MS,
+    VALIDATION_HEDGE_MIN_DELAY_MS,
+)
 
 
 class ValidatorFactory:
     """Factory class for creating validator instances."""
 
-    _validators = {"dspy": DSPyValidator, "chatgpt": ChatGPTValidator}
+    # Engines are imported on first use: dspy, guardrails, openai and mlflow take seconds
+    # to import and would otherwise delay startup.
+    _validators = {
+        "dspy": ("app.validation.dspy_validator", "DSPyValidator"),
+        "chatgpt": ("app.validation.chatgpt_validator", "ChatGPTValidator"),
+    }
+    _instances = {}
+    _lock = threading.Lock()
 
     @classmethod
     def create_validator(cls, engine: str):
         """Creates a validator instance dynamically."""
         if engine not in cls._validators:
             raise ValueError(f"Invalid validation engine: {engine}")
-        return cls._validators[engine]()
+        validator_class = cls._validators[engine]
+        if isinstance(validator_class, tuple):
+            module_name, class_name = validator_class
+            validator_class = getattr(importlib.import_module(module_name), class_name)
+        return validator_class()
+
+    @classmethod
+    def get_validator(cls, engine: str):
+        """Returns the process-wide validator for an engine, creating it on first use."""
+        with cls._lock:
+            if engine not in cls._instances:
+                cls._instances[engine] = cls.create_validator(engine)
+            return cls._instances[engine]
+
+
+validation_cache = ValidationCache(
+    max_size=VALIDATION_CACHE_SIZE,
+    ttl_seconds=VALIDATION_CACHE_TTL,
+    excluded_fields=VALIDATION_CACHE_EXCLUDE,
+)
+
+admission_controller = AdmissionController(
+    max_in_flight=ADMISSION_MAX_IN_FLIGHT,
+    max_queue=ADMISSION_MAX_QUEUE,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+)
+registry.add_collector(functools.partial(collect_admission_metrics, admission_controller))
+
+hedge_latencies = LatencyWindow(
+    percentile=VALIDATION_HEDGE_PERCENTILE,
+    default=VALIDATION_HEDGE_DEFAULT_DELAY_MS / 1000,
+    minimum=VALIDATION_HEDGE_MIN_DELAY_MS / 1000,
+)
+if VALIDATION_HEDGE_ENGINE:
+    registry.add_collector(functools.partial(collect_hedge_metrics, hedge_counters, hedge_latencies))
+
+circuit_breaker = CircuitBreaker(
+    VALIDATION_ENGINE,
+    failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=CIRCUIT_RESET_TIMEOUT,
+)
+registry.add_collector(functools.partial(collect_circuit_metrics, circuit_breaker))
+
+
+def build_validator():
+    """Creates the configured engine (hedged with a second engine if set) wrapped in the circuit breaker, micro-batching, admission control, single-flight coalescing, the cache and fast-path tiers."""
+    validator = ValidatorFactory.get_validator(VALIDATION_ENGINE)
+    if VALIDATION_HEDGE_ENGINE:
+        if VALIDATION_HEDGE_ENGINE == VALIDATION_ENGINE:
+            raise ValueError(f"VALIDATION_HEDGE_ENGINE must differ from VALIDATION_ENGINE ({VALIDATION_ENGINE})")
+        validator = HedgedValidator(
+            validator, ValidatorFactory.get_validator(VALIDATION_HEDGE_ENGINE), hedge_latencies, hedge_counters
+        )
+    if CIRCUIT_BREAKER_ENABLED:
+        validator = ResilientValidator(validator, circuit_breaker, VALIDATION_TIMEOUT)
+    if VALIDATION_BATCHING:
+        validator = BatchingValidator(
+            validator, VALIDATION_ENGINE, VALIDATION_BATCH_WINDOW_MS, VALIDATION_BATCH_MAX_SIZE
+        )
+    if ADMISSION_ENABLED:
+        validator = AdmissionValidator(validator, VALIDATION_ENGINE, admission_controller)
+    if VALIDATION_COALESCE:
+        validator = CoalescingValidator(validator, VALIDATION_ENGINE)
+    if VALIDATION_CACHE_ENABLED:
+        validator = CachedValidator(validator, VALIDATION_ENGINE, validation_cache)
+    if VALIDATION_FAST_PATH:
+        validator = TieredValidator(validator)
+    return validator
 
 
+_validator = None
+
+
+def get_configured_validator():
+    """The long-lived validator chain shared by all requests in this process."""
+    global _validator
+    if _validator is None:
+        _validator = build_validator()
+    return _validator
+
 
 def validate_user_input(question: str, user_answer: str):
     """Uses the factory to get the appropriate validator."""
-    validator = ValidatorFactory.create_validator(VALIDATION_ENGINE)
-    return validator.validate(question, user_answer)
+    start = time.perf_counter()
+    result = get_configured_validator().validate(question, user_answer)
+    STAGE_LATENCY.observe(("validate_user_input", VALIDATION_ENGINE), time.perf_counter() - start)
+    return result
+
+
+async def avalidate_user_input(question: str, user_answer: str):
+    """Async counterpart of validate_user_input, used by the async endpoints."""
+    start = time.perf_counter()
+    result = await get_configured_validator().avalidate(question, user_answer)
+    STAGE_LATENCY.observe(("validate_user_input", VALIDATION_ENGINE), time.perf_counter() - start)
+    return result
+
+
+async def astream_validate_user_input(question: str, user_answer: str):
+    """Streaming counterpart: yields ("feedback", text) events, then one ("result", dict) event."""
+    start = time.perf_counter()
+    first_feedback = True
+    async for kind, payload in get_configured_validator().astream_validate(question, user_answer):
+        if kind == "feedback" and first_feedback:
+            first_feedback = False
+            STAGE_LATENCY.observe(("first_feedback", VALIDATION_ENGINE), time.perf_counter() - start)
+        yield kind, payload
+    STAGE_LATENCY.observe(("validate_user_input", VALIDATION_ENGINE), time.perf_counter() - start)
+
+
+def get_validation_stats():
+    """Per-tier hit counters, validation cache stats, coalesced, admitted, batched and hedged calls, circuit breaker state, LLM connection reuse and telemetry queue stats."""
+    return {
+        "tiers": tier_counters.snapshot(),
+        "cache": validation_cache.stats(),
+        "coalescing": coalescing_counters.snapshot(),
+        "admission": admission_controller.stats(),
+        "batching": batch_counters.snapshot(),
+        "circuit": circuit_breaker.stats(),
+        "hedging": {**hedge_counters.snapshot(), "delay_ms": round(hedge_latencies.delay() * 1000, 1)},
+        "http": connection_stats.snapshot(),
+        "telemetry": telemetry.stats(),
+    }
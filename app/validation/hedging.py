@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+from app.validation.base_validator import BaseValidator
+
+"""_summary_
+Summary: Hedged requests across validation engines (VALIDATION_HEDGE_ENGINE).
+
+With one engine, p99 is the slowest upstream response. HedgedValidator sends each async
+validation to the primary engine (VALIDATION_ENGINE). If no usable answer has arrived after
+the hedge delay, it also sends it to the secondary engine. Whichever engine first returns a
+'valid' or 'clarify' result wins, and the other call is cancelled.
+
+    primary answers within the delay    primary result, no hedge
+    primary fails within the delay      hedge fired at once
+    delay passes                        hedge fired; first usable result wins
+    both fail                           the primary's result (or error), for the layers above
+
+The delay is the VALIDATION_HEDGE_PERCENTILE percentile of recent primary latencies (the last
+HEDGE_WINDOW usable answers; fast errors would drag it down). It is at least
+VALIDATION_HEDGE_MIN_DELAY_MS, and is VALIDATION_HEDGE_DEFAULT_DELAY_MS until HEDGE_MIN_SAMPLES
+latencies are known. At the 95th
+percentile roughly 5% of calls are hedged, so the extra LLM cost is about 5%.
+
+Only avalidate is hedged: validate (sync), streaming and batch calls use the primary engine.
+Counters are under "hedging" in /validation_stats and in registration_validation_hedges_total.
+"""
+
+HEDGE_WINDOW = 1000
+HEDGE_MIN_SAMPLES = 50
+
+
+class HedgeCounters:
+    """Thread-safe counters: hedges fired and which engine's answer was used."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"calls": 0, "hedges_fired": 0, "hedges_won": 0, "primary_won": 0, "both_failed": 0}
+
+    def incr(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            counts = dict(self._counts)
+        counts["hedge_ratio"] = round(counts["hedges_fired"] / counts["calls"], 4) if counts["calls"] else 0.0
+        counts["hedge_win_ratio"] = round(counts["hedges_won"] / counts["hedges_fired"], 4) if counts["hedges_fired"] else 0.0
+        return counts
+
+
+hedge_counters = HedgeCounters()
+
+
+class LatencyWindow:
+    """Recent latencies and a cached percentile of them (recomputed every 20 samples)."""
+
+    def __init__(self, percentile: float, default: float, minimum: float, size: int = HEDGE_WINDOW):
+        self.percentile = percentile
+        self.default = default
+        self.minimum = minimum
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._added = 0
+        self._value = default
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+            self._added += 1
+            if len(self._samples) >= HEDGE_MIN_SAMPLES and self._added % 20 == 0:
+                ordered = sorted(self._samples)
+                index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+                self._value = max(self.minimum, ordered[index])
+
+    def delay(self) -> float:
+        with self._lock:
+            return self._value
+
+
+def collect_hedge_metrics(counters: HedgeCounters, latencies: LatencyWindow) -> List[str]:
+    """/metrics lines for one HedgedValidator's counters and delay (registered with registry.add_collector in factory.py)."""
+    counts = counters.snapshot()
+    return [
+        "# HELP registration_validation_hedges_total Hedged validation calls: fired, and won by the hedge engine.",
+        "# TYPE registration_validation_hedges_total counter",
+        f'registration_validation_hedges_total{{outcome="fired"}} {counts["hedges_fired"]}',
+        f'registration_validation_hedges_total{{outcome="won"}} {counts["hedges_won"]}',
+        "# HELP registration_validation_hedge_delay_seconds Current hedge delay.",
+        "# TYPE registration_validation_hedge_delay_seconds gauge",
+        f"registration_validation_hedge_delay_seconds {latencies.delay():.4f}",
+    ]
+
+
+def _usable(result) -> bool:
+    return isinstance(result, dict) and result.get("status") in ("valid", "clarify")
+
+
+class HedgedValidator(BaseValidator):
+    """Validates with the primary engine and, past the hedge delay, races the secondary engine."""
+
+    def __init__(
+        self,
+        primary: BaseValidator,
+        secondary: BaseValidator,
+        latencies: LatencyWindow,
+        counters: HedgeCounters = hedge_counters,
+    ):
+        self.primary = primary
+        self.secondary = secondary
+        self.latencies = latencies
+        self.counters = counters
+
+    def validate(self, question: str, user_answer: str) -> Dict[str, str]:
+        return self.primary.validate(question, user_answer)
+
+    async def astream_validate(self, question: str, user_answer: str):
+        async for event in self.primary.astream_validate(question, user_answer):
+            yield event
+
+    async def avalidate_batch(self, items):
+        return await self.primary.avalidate_batch(items)
+
+    async def _call(self, validator: BaseValidator, question: str, user_answer: str):
+        """The validator's result, or its exception as a value."""
+        try:
+            return await validator.avalidate(question, user_answer)
+        except Exception as e:
+            return e
+
+    async def avalidate(self, question: str, user_answer: str) -> Dict[str, str]:
+        self.counters.incr("calls")
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(self._call(self.primary, question, user_answer))
+
+        def record_latency(task):
+            # Only usable answers: a fast failure would pull the delay down and hedge everything.
+            if not task.cancelled() and _usable(task.result()):
+                self.latencies.add(time.perf_counter() - start)
+
+        primary.add_done_callback(record_latency)
+        tasks = [primary]
+        try:
+            await asyncio.wait({primary}, timeout=self.latencies.delay())
+            if primary.done() and _usable(primary.result()):
+                self.counters.incr("primary_won")
+                return primary.result()
+
+            self.counters.incr("hedges_fired")
+            secondary = asyncio.ensure_future(self._call(self.secondary, question, user_answer))
+            tasks.append(secondary)
+            pending = {task for task in tasks if not task.done()}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in tasks:  # primary first if both finished together
+                    if task in done and _usable(task.result()):
+                        self.counters.incr("primary_won" if task is primary else "hedges_won")
+                        return task.result()
+        finally:
+            if not primary.done():  # the hedge won: the primary took at least this long
+                self.latencies.add(time.perf_counter() - start)
+            for task in tasks:
+                task.cancel()
+
+        self.counters.incr("both_failed")
+        logging.error(f"Hedged validation failed on both engines: {primary.result()!r}; {secondary.result()!r}")
+        for task in tasks:  # an "error" result in preference to an exception
+            if not isinstance(task.result(), Exception):
+                return task.result()
+        raise primary.result()
@@ -0,0 +1,120 @@
+import threading
+import httpx
+from typing import Dict
+from app.helpers.config import (
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE,
+    LLM_HTTP_KEEPALIVE_EXPIRY,
+    LLM_HTTP_TIMEOUT,
+)
+
+"""_summary_
+Summary: Process-wide keep-alive HTTP connection pools for the LLM clients.
+
+One httpx.Client (sync path) and one httpx.AsyncClient (async path) are shared by every
+validator in the worker, so each answer reuses an open TLS connection instead of paying
+a new handshake.
+
+Connection reuse is measured through httpcore's "trace" extension:
+    requests           -> every request sent
+    new_connections    -> requests that had to open a TCP connection first
+    reused_connections -> requests - new_connections
+"""
+
+
+class ConnectionStats:
+    """Counts requests vs. newly opened connections."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record(self, event_name: str):
+        if event_name == "connection.connect_tcp.started":
+            with self._lock:
+                self.new_connections += 1
+        elif event_name in ("http11.send_request_headers.started", "http2.send_request_headers.started"):
+            with self._lock:
+                self.requests += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            requests, new_connections = self.requests, self.new_connections
+        reused = max(requests - new_connections, 0)
+        return {
+            "requests": requests,
+            "new_connections": new_connections,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / requests, 4) if requests else 0.0,
+        }
+
+
+connection_stats = ConnectionStats()
+
+
+def _trace(event_name, info):
+    connection_stats.record(event_name)
+
+
+async def _atrace(event_name, info):
+    connection_stats.record(event_name)
+
+
+def _attach_trace(request: httpx.Request):
+    request.extensions["trace"] = _trace
+
+
+async def _aattach_trace(request: httpx.Request):
+    request.extensions["trace"] = _atrace
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+_lock = threading.Lock()
+_sync_client = None
+_async_client = None
+
+
+def get_http_client() -> httpx.Client:
+    """Returns the shared sync keep-alive client, creating it on first use."""
+    global _sync_client
+    with _lock:
+        if _sync_client is None:
+            _sync_client = httpx.Client(
+                limits=_limits(),
+                timeout=LLM_HTTP_TIMEOUT,
+                event_hooks={"request": [_attach_trace]},
+            )
+        return _sync_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Returns the shared async keep-alive client, creating it on first use."""
+    global _async_client
+    with _lock:
+        if _async_client is None:
+            _async_client = httpx.AsyncClient(
+                limits=_limits(),
+                timeout=LLM_HTTP_TIMEOUT,
+                event_hooks={"request": [_aattach_trace]},
+            )
+        return _async_client
+
+
+async def close_http_clients():
+    """Closes both pools (called on application shutdown)."""
+    global _sync_client, _async_client
+    with _lock:
+        sync_client, async_client = _sync_client, _async_client
+        _sync_client = _async_client = None
+    if sync_client is not None:
+        sync_client.close()
+    if async_client is not None:
+        await async_client.aclose()
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+from typing import Dict, List
+from app.validation.base_validator import BaseValidator
+from app.validation.validation_cache import make_cache_key
+from app.helpers.metrics import registry
+
+"""_summary_
+Summary: Single-flight coalescing of identical in-flight validation calls.
+
+A double-clicked "Submit", a frontend retry after its 10s timeout, or many users entering the
+same common value at once all produce identical LLM calls in parallel. CoalescingValidator
+lets the first call with a given key (engine, question field, normalized answer - the same
+key as the validation cache) go to the wrapped validator; identical calls that arrive while
+it is in flight wait for it and all receive a copy of its result (or its exception).
+
+    sync   validate    per-key threading.Event; followers block until the leader finishes
+    async  avalidate   per-key shared Task; every caller awaits it through asyncio.shield,
+                       so a caller that is cancelled (client disconnected) does not cancel
+                       the call for the others
+    stream             joins an in-flight avalidate call with the same key (one feedback event),
+                       otherwise streams from the wrapped validator as usual
+
+Nothing is kept once the call completes; repeats after that are the validation cache's job.
+It sits below CachedValidator, so only cache misses are coalesced.
+"""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CoalescingCounters:
+    """Thread-safe counters: calls sent to the wrapped validator vs. calls that joined one."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"calls": 0, "coalesced": 0}
+
+    def incr(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            counts = dict(self._counts)
+        total = counts["calls"] + counts["coalesced"]
+        counts["coalesced_ratio"] = round(counts["coalesced"] / total, 4) if total else 0.0
+        return counts
+
+
+coalescing_counters = CoalescingCounters()
+
+
+def _collect_coalescing_metrics() -> List[str]:
+    return [
+        "# HELP registration_validation_coalesced_total Validation calls that joined an identical in-flight call.",
+        "# TYPE registration_validation_coalesced_total counter",
+        f"registration_validation_coalesced_total {coalescing_counters.snapshot()['coalesced']}",
+    ]
+
+
+registry.add_collector(_collect_coalescing_metrics)
+
+
+class CoalescingValidator(BaseValidator):
+    """Shares one in-flight call of the wrapped validator among identical concurrent calls."""
+
+    def __init__(self, validator: BaseValidator, engine: str, counters: CoalescingCounters = coalescing_counters):
+        self.validator = validator
+        self.engine = engine
+        self.counters = counters
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls) + len(self._tasks)
+
+    def validate(self, question: str, user_answer: str) -> Dict[str, str]:
+        key = make_cache_key(self.engine, question, user_answer)
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            self.counters.incr("coalesced")
+            call.done.wait()
+        else:
+            self.counters.incr("calls")
+            try:
+                call.result = self.validator.validate(question, user_answer)
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return dict(call.result)
+
+    def _join(self, key: str):
+        """The in-flight task for key on the running loop, or None."""
+        task = self._tasks.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            return task
+        return None
+
+    async def avalidate(self, question: str, user_answer: str) -> Dict[str, str]:
+        key = make_cache_key(self.engine, question, user_answer)
+        with self._lock:
+            task = self._join(key)
+            if task is None:
+                task = asyncio.ensure_future(self.validator.avalidate(question, user_answer))
+                self._tasks[key] = task
+                task.add_done_callback(lambda done, key=key: self._forget(key, done))
+                self.counters.incr("calls")
+            else:
+                self.counters.incr("coalesced")
+        return dict(await asyncio.shield(task))
+
+    def _forget(self, key: str, task: asyncio.Task):
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so an unawaited failure is not logged as lost
+
+    async def astream_validate(self, question: str, user_answer: str):
+        key = make_cache_key(self.engine, question, user_answer)
+        with self._lock:
+            task = self._join(key)
+        if task is None:
+            self.counters.incr("calls")
+            async for event in self.validator.astream_validate(question, user_answer):
+                yield event
+            return
+
+        self.counters.incr("coalesced")
+        result = dict(await asyncio.shield(task))
+        if result.get("feedback"):
+            yield "feedback", result["feedback"]
+        yield "result", result
@@ -0,0 +1,178 @@
+import re
+import threading
+import logging
+from typing import Dict, List, Optional
+from app.validation.base_validator import BaseValidator
+from app.validation.validated_response import ValidatedLLMResponse
+from app.helpers.fields import classify_question
+from app.helpers.metrics import registry
+
+"""_summary_
+Summary: TieredValidator runs the deterministic rules from ValidatedLLMResponse
+before falling back to an LLM-backed validator (DSPyValidator or ChatGPTValidator).
+
+Tier 1 ("rules"): local regex/formatting rules. If they are confident the answer is
+valid (or confidently needs clarification) we return straight away.
+Tier 2 ("llm"): anything ambiguous is handed to the wrapped validator.
+
+Example:
+    "What is your email address?" + "John@Gmail.com" -> valid, "john@gmail.com" (no LLM call)
+    "What is your phone number?" + "0770090012"      -> clarify (no LLM call)
+    "What is your address?" + "flat a 12 high street london" -> LLM
+"""
+
+# Answers made only of these characters are "well formed" phone attempts,
+# so a rule rejection is final. Anything else (e.g. "oh seven seven...") goes to the LLM.
+PHONE_CHARS = re.compile(r"^[\d\s+\-().]+$")
+# Two or more alphabetic words, e.g. "john o'neil", "Mary-Jane Smith"
+FULL_NAME = re.compile(r"^[A-Za-z][A-Za-z'\-]*(\s+[A-Za-z][A-Za-z'\-]*)+$")
+
+
+class TierCounters:
+    """Thread-safe hit counters per validation tier."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"rules_valid": 0, "rules_clarify": 0, "llm": 0}
+
+    def incr(self, tier: str):
+        with self._lock:
+            self._counts[tier] = self._counts.get(tier, 0) + 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        local = counts["rules_valid"] + counts["rules_clarify"]
+        counts["total"] = total
+        counts["llm_avoided_ratio"] = round(local / total, 4) if total else 0.0
+        return counts
+
+    def reset(self):
+        with self._lock:
+            for key in self._counts:
+                self._counts[key] = 0
+
+
+tier_counters = TierCounters()
+
+
+def _collect_tier_metrics() -> List[str]:
+    counts = tier_counters.snapshot()
+    lines = [
+        "# HELP registration_validation_tier_total Answers settled by each validation tier.",
+        "# TYPE registration_validation_tier_total counter",
+    ]
+    for tier in ("rules_valid", "rules_clarify", "llm"):
+        lines.append(f'registration_validation_tier_total{{tier="{tier}"}} {counts[tier]}')
+    return lines
+
+
+registry.add_collector(_collect_tier_metrics)
+
+
+class TieredValidator(BaseValidator):
+    """Runs local deterministic rules first and only calls the LLM validator for ambiguous input."""
+
+    def __init__(self, llm_validator: BaseValidator, counters: TierCounters = tier_counters):
+        self.llm_validator = llm_validator
+        self.counters = counters
+
+    def check_rules(self, question: str, user_answer: str) -> Optional[Dict[str, str]]:
+        """
+        Returns a validation result if the local rules are confident, otherwise None.
+        """
+        answer = (user_answer or "").strip()
+        field = classify_question(question)
+
+        if not answer:
+            return {
+                "status": "clarify",
+                "feedback": "Please provide an answer to the question.",
+                "formatted_answer": user_answer or "",
+            }
+
+        if field == "email":
+            formatted = ValidatedLLMResponse.validate_email(answer)
+            if formatted != "clarify":
+                return {
+                    "status": "valid",
+                    "feedback": "Email address looks good.",
+                    "formatted_answer": formatted,
+                }
+            return None
+
+        if field == "phone":
+            formatted = ValidatedLLMResponse.validate_phone(answer)
+            if formatted != "clarify":
+                return {
+                    "status": "valid",
+                    "feedback": "Phone number looks good.",
+                    "formatted_answer": formatted,
+                }
+            if PHONE_CHARS.match(answer):
+                return {
+                    "status": "clarify",
+                    "feedback": (
+                        "Please enter a UK phone number: 10 digits for landlines (e.g., 020 123 4567) "
+                        "or 11 digits for mobiles starting with 07 (e.g., 07700 900 123)."
+                    ),
+                    "formatted_answer": user_answer,
+                }
+            return None
+
+        if field == "address":
+            formatted = ValidatedLLMResponse.validate_address(answer)
+            if formatted != "clarify":
+                return {
+                    "status": "valid",
+                    "feedback": "Address looks good.",
+                    "formatted_answer": formatted,
+                }
+            return None
+
+        if field == "name":
+            if FULL_NAME.match(answer):
+                return {
+                    "status": "valid",
+                    "feedback": "Name looks good.",
+                    "formatted_answer": ValidatedLLMResponse.validate_name(answer),
+                }
+            return None
+
+        # username, password and unknown questions always need the LLM.
+        return None
+
+    def _fast_path(self, question: str, user_answer: str) -> Optional[Dict[str, str]]:
+        """Runs the rules tier and records which tier handled the answer."""
+        result = self.check_rules(question, user_answer)
+        if result is not None:
+            self.counters.incr(f"rules_{result['status']}")
+            logging.info(f"Fast-path validation ({result['status']}) for: {question}")
+        else:
+            self.counters.incr("llm")
+        return result
+
+    def validate(self, question: str, user_answer: str) -> Dict[str, str]:
+        """Validates with local rules first, then falls back to the wrapped LLM validator."""
+        result = self._fast_path(question, user_answer)
+        if result is not None:
+            return result
+        return self.llm_validator.validate(question, user_answer)
+
+    async def avalidate(self, question: str, user_answer: str) -> Dict[str, str]:
+        """Async variant of validate; the rules tier runs inline, only the LLM tier is awaited."""
+        result = self._fast_path(question, user_answer)
+        if result is not None:
+            return result
+        return await self.llm_validator.avalidate(question, user_answer)
+
+    async def astream_validate(self, question: str, user_answer: str):
+        """Streaming variant; a rules-tier result is emitted straight away, LLM feedback is streamed."""
+        result = self._fast_path(question, user_answer)
+        if result is not None:
+            yield "feedback", result["feedback"]
+            yield "result", result
+            return
+        async for event in self.llm_validator.astream_validate(question, user_answer):
+            yield event
@@ -1,4 +1,5 @@
 from pydantic import (BaseModel, Field, field_validator)
+import logging
 import re
 
 class ValidatedLLMResponse(BaseModel):
@@ -47,35 +48,29 @@ class ValidatedLLMResponse(BaseModel):
     def validate_phone(phone: str) -> str:
         """Validates & formats UK phone numbers with strict +44 handling."""
         digits = re.sub(r"\D", "", phone.strip())
-        
-        print(f"Validating phone, digits extracted: {digits}")
+        # Reasons only at debug level, never the number itself: this runs on every phone answer.
 
         if not digits or len(digits) < 10:
-            print("Rejected: Empty or too short")
+            logging.debug("Phone rejected: empty or too short")
             return "clarify"
 
         if digits.startswith("44"):
             if len(digits) != 12:
-                print(f"Rejected: Invalid +44 number length: {len(digits)} digits")
+                logging.debug(f"Phone rejected: +44 number with {len(digits)} digits")
                 return "clarify" 
             digits = "0" + digits[2:] 
-            print(f"Converted +44 number to national format: {digits}")
 
         if not digits.startswith("0"):
-            print("Rejected: Number does not start with 0 after +44 conversion")
+            logging.debug("Phone rejected: does not start with 0 after +44 conversion")
             return "clarify"
 
         if len(digits) == 10 and digits.startswith("0") and not digits.startswith("07"):
-            formatted = f"{digits[:3]} {digits[3:6]} {digits[6:]}"
-            print(f"Valid landline formatted: {formatted}")
-            return formatted
+            return f"{digits[:3]} {digits[3:6]} {digits[6:]}"
 
         if len(digits) == 11 and digits.startswith("07"):
-            formatted = f"{digits[:5]} {digits[5:8]} {digits[8:]}"
-            print(f"Valid mobile formatted: {formatted}")
-            return formatted
+            return f"{digits[:5]} {digits[5:8]} {digits[8:]}"
 
-        print("Rejected: Phone number did not match any valid UK format")
+        logging.debug("Phone rejected: no UK format matched")
         return "clarify"
 
 
@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from app.validation.base_validator import BaseValidator
+from app.helpers.fields import classify_question
+from app.db.sqlite_db import fetch_cached_validation, upsert_cached_validation
+
+"""_summary_
+Summary: Two-level cache for validation results.
+
+Level 1: bounded in-process LRU with TTL (per uvicorn worker).
+Level 2: the `validation_cache` SQLite table next to `sessions`, shared by all workers.
+
+Keys combine the validation engine, the question key (email, phone, ... or the question
+text) and the normalized answer, e.g. ("dspy", "email", "john@gmail.com").
+Only 'valid' and 'clarify' results are cached; 'error' and degraded (local-fallback) results
+are always recomputed.
+"""
+
+
+def normalize_answer(user_answer: str) -> str:
+    """Strips and collapses whitespace, so "  07700  900123 " and "07700 900123" share a key."""
+    return " ".join((user_answer or "").split())
+
+
+def make_cache_key(engine: str, question: str, user_answer: str) -> str:
+    question_key = classify_question(question) or " ".join(question.lower().split())
+    raw = "\x1f".join((engine, question_key, normalize_answer(user_answer)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Bounded, thread-safe LRU with per-entry TTL."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, now: float):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, now: float, expires_at: Optional[float] = None):
+        with self._lock:
+            self._data[key] = (expires_at or now + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class ValidationCache:
+    """In-memory LRU backed by the shared SQLite table, with hit/miss/eviction stats."""
+
+    def __init__(self, max_size: int, ttl_seconds: float, excluded_fields=(), use_sqlite: bool = True):
+        self.memory = LRUCache(max_size, ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.excluded_fields = {field.strip().lower() for field in excluded_fields if field.strip()}
+        self.use_sqlite = use_sqlite
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "sqlite_hits": 0, "misses": 0, "stores": 0, "skipped": 0}
+
+    def _incr(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def is_cacheable(self, question: str) -> bool:
+        field = classify_question(question)
+        if field in self.excluded_fields:
+            self._incr("skipped")
+            return False
+        return True
+
+    def _get_memory(self, key: str, now: float) -> Optional[Dict[str, str]]:
+        result = self.memory.get(key, now)
+        if result is not None:
+            self._incr("memory_hits")
+            return dict(result)
+        return None
+
+    def _get_sqlite(self, key: str, now: float) -> Optional[Dict[str, str]]:
+        if self.use_sqlite:
+            try:
+                result = fetch_cached_validation(key, now)
+            except sqlite3.Error as e:
+                logging.error(f"Validation cache read failed: {e}")
+                result = None
+            if result is not None:
+                self._incr("sqlite_hits")
+                self.memory.set(key, result, now)
+                return dict(result)
+
+        self._incr("misses")
+        return None
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        now = time.time()
+        result = self._get_memory(key, now)
+        if result is not None:
+            return result
+        return self._get_sqlite(key, now)
+
+    async def aget(self, key: str) -> Optional[Dict[str, str]]:
+        """Like get, but the SQLite lookup runs in a worker thread."""
+        now = time.time()
+        result = self._get_memory(key, now)
+        if result is not None:
+            return result
+        return await asyncio.to_thread(self._get_sqlite, key, now)
+
+    def _set_memory(self, key: str, result: Dict[str, str]) -> Optional[float]:
+        if not isinstance(result, dict) or result.get("status") not in ("valid", "clarify") or result.get("degraded"):
+            return None
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        self.memory.set(key, dict(result), now, expires_at)
+        self._incr("stores")
+        return expires_at
+
+    def _set_sqlite(self, key: str, engine: str, result: Dict[str, str], expires_at: float):
+        if self.use_sqlite:
+            try:
+                upsert_cached_validation(key, engine, result, expires_at)
+            except sqlite3.Error as e:
+                logging.error(f"Validation cache write failed: {e}")
+
+    def set(self, key: str, engine: str, result: Dict[str, str]):
+        expires_at = self._set_memory(key, result)
+        if expires_at is not None:
+            self._set_sqlite(key, engine, result, expires_at)
+
+    async def aset(self, key: str, engine: str, result: Dict[str, str]):
+        expires_at = self._set_memory(key, result)
+        if expires_at is not None:
+            await asyncio.to_thread(self._set_sqlite, key, engine, result, expires_at)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["memory_hits"] + stats["sqlite_hits"] + stats["misses"]
+        stats["evictions"] = self.memory.evictions
+        stats["expirations"] = self.memory.expirations
+        stats["memory_size"] = len(self.memory)
+        stats["hit_ratio"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class CachedValidator(BaseValidator):
+    """Wraps a factory-produced validator with the two-level ValidationCache."""
+
+    def __init__(self, validator: BaseValidator, engine: str, cache: ValidationCache):
+        self.validator = validator
+        self.engine = engine
+        self.cache = cache
+
+    def validate(self, question: str, user_answer: str) -> Dict[str, str]:
+        if not self.cache.is_cacheable(question):
+            return self.validator.validate(question, user_answer)
+
+        key = make_cache_key(self.engine, question, user_answer)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self.validator.validate(question, user_answer)
+        self.cache.set(key, self.engine, result)
+        return result
+
+    async def avalidate(self, question: str, user_answer: str) -> Dict[str, str]:
+        if not self.cache.is_cacheable(question):
+            return await self.validator.avalidate(question, user_answer)
+
+        key = make_cache_key(self.engine, question, user_answer)
+        cached = await self.cache.aget(key)
+        if cached is not None:
+            return cached
+
+        result = await self.validator.avalidate(question, user_answer)
+        await self.cache.aset(key, self.engine, result)
+        return result
+
+    async def astream_validate(self, question: str, user_answer: str):
+        if not self.cache.is_cacheable(question):
+            async for event in self.validator.astream_validate(question, user_answer):
+                yield event
+            return
+
+        key = make_cache_key(self.engine, question, user_answer)
+        cached = await self.cache.aget(key)
+        if cached is not None:
+            yield "feedback", cached["feedback"]
+            yield "result", cached
+            return
+
+        async for kind, payload in self.validator.astream_validate(question, user_answer):
+            if kind == "result":
+                await self.cache.aset(key, self.engine, payload)
+            yield kind, payload
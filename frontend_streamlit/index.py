@@ -2,9 +2,9 @@ import os
 os.environ["HOME"] = "/tmp"  # Fix for permission issues on platforms like HuggingFace
 
 import streamlit as st
-import requests
 import time
 import random
+from registration_client import RateLimitedError, RegistrationAPIError, RegistrationClient
 
 API_URL = os.getenv("API_URL")
 
@@ -16,6 +16,18 @@ TRANSITION_MESSAGES = [
     "Onward to question {number}!"
 ]
 
+# One keep-alive connection pool per Streamlit server process, shared by all browser sessions
+@st.cache_resource
+def get_client() -> RegistrationClient:
+    return RegistrationClient(API_URL, timeout=10, headers={"Origin": "https://entz-council-3.hf.space"})
+
+def show_api_error(action, e):
+    print(f"Error {action}: {e!r}, Response: {getattr(e, 'body', None) or 'No response'}")
+    if isinstance(e, RateLimitedError):
+        st.warning(f"The server is busy. Please try again in {int(e.retry_after)} seconds.")
+    else:
+        st.error(f"Error {action}: {e}")
+
 # Utility to read intro content from file
 def read_intro_file(filepath="tab1.txt"):
     try:
@@ -37,17 +49,10 @@ def reset_session_state():
 def start_registration():
     print("Starting registration...")
     try:
-        headers = {"Origin": "https://entz-council-3.hf.space"}
-        response = requests.post(
-            f"{API_URL}/start_registration",
-            headers=headers,
-            timeout=10
-        )
-        response.raise_for_status()
-        data = response.json()
-        print("API Response:", data)
-        st.session_state.session_id = data["session_id"]
-        st.session_state.current_question = data["message"]
+        result = get_client().start_registration()
+        print("API Response:", result)
+        st.session_state.session_id = result.session_id
+        st.session_state.current_question = result.question
         st.session_state.feedback = ""
         st.session_state.summary = None
         st.session_state.answer = ""
@@ -55,9 +60,8 @@ def start_registration():
         st.session_state.skip_phone = False
         st.session_state.prev_question = ""
         st.session_state.question_number = 1
-    except requests.RequestException as e:
-        print(f"Error starting registration: {e}, Response: {getattr(e.response, 'text', 'No response')}")
-        st.error(f"Error starting registration: {e}")
+    except (RegistrationAPIError, OSError) as e:
+        show_api_error("starting registration", e)
 
 def submit_response():
     if not st.session_state.session_id:
@@ -68,69 +72,45 @@ def submit_response():
         skip_steps.append("ask_address")
     if st.session_state.get("skip_phone", False):
         skip_steps.append("ask_phone")
-    payload = {
-        "session_id": st.session_state.session_id,
-        "answer": st.session_state.answer,
-        "skip_steps": skip_steps
-    }
-    print("Submitting response with payload:", payload)
+    print("Submitting response:", st.session_state.answer, skip_steps)
     try:
-        response = requests.post(
-            f"{API_URL}/submit_response",
-            json=payload,
-            timeout=10
-        )
-        response.raise_for_status()
-        data = response.json()
-        print("API Response:", data)
-        if data.get("message") == "Registration complete!":
-            st.session_state.summary = data["summary"]
+        result = get_client().submit_response(st.session_state.session_id, st.session_state.answer, skip_steps)
+        print("API Response:", result)
+        if result.completed:
+            st.session_state.summary = result.summary
             st.session_state.current_question = ""
             st.session_state.feedback = "Registration complete!"
             st.session_state.question_number = 1
         else:
             st.session_state.prev_question = st.session_state.current_question
-            st.session_state.current_question = data.get("next_question", "")
-            st.session_state.feedback = data.get("validation_feedback", "")
+            st.session_state.current_question = result.question
+            st.session_state.feedback = result.feedback
             if st.session_state.prev_question != st.session_state.current_question:
                 st.session_state.question_number += 1
             st.session_state.answer = ""
         st.session_state.skip_address = False
         st.session_state.skip_phone = False
         st.rerun()
-    except requests.RequestException as e:
-        print(f"Error submitting response: {e}")
-        st.error(f"Error submitting response: {e}")
+    except (RegistrationAPIError, OSError) as e:
+        show_api_error("submitting response", e)
 
 def edit_field(field, value):
     if not st.session_state.session_id:
         st.error("No active session.")
         return
-    payload = {
-        "session_id": st.session_state.session_id,
-        "field_to_edit": field,
-        "new_value": value
-    }
-    print("Editing field with payload:", payload)
+    print("Editing field:", field, value)
     try:
-        response = requests.post(
-            f"{API_URL}/edit_field",
-            json=payload,
-            timeout=10
-        )
-        response.raise_for_status()
-        data = response.json()
-        print("API Response:", data)
-        st.session_state.feedback = data.get("validation_feedback", "")
-        st.session_state.summary = data.get("summary", st.session_state.summary)
-        if data.get("message") == "Needs clarification":
-            st.error(f"Clarification needed for {field}: {data['validation_feedback']}")
-        elif data.get("message") == "Field updated successfully!":
+        result = get_client().edit_field(st.session_state.session_id, field, value)
+        print("API Response:", result)
+        st.session_state.feedback = result.feedback
+        st.session_state.summary = result.summary or st.session_state.summary
+        if not result.updated:
+            st.error(f"Clarification needed for {field}: {result.feedback}")
+        else:
             st.success("Database updated.")
             st.rerun()
-    except requests.RequestException as e:
-        print(f"Error editing field: {e}")
-        st.error(f"Error editing field: {e}")
+    except (RegistrationAPIError, OSError) as e:
+        show_api_error("editing field", e)
 
 # Initialize session state if not present
 if "session_id" not in st.session_state:
@@ -0,0 +1,36 @@
+from .client import RegistrationClient
+from .errors import RateLimitedError, RegistrationAPIError, SessionNotFoundError
+from .models import EditResult, StartResult, SubmitResult
+from .retry import NO_RETRY, RetryPolicy
+
+"""_summary_
+Summary: Python client SDK for the registration API.
+
+    RegistrationClient        sync, requests.Session keep-alive pool (the Streamlit frontend)
+    AsyncRegistrationClient   async, httpx pool (scripts); imported on first use, so the
+                              frontend does not need httpx
+
+Both return StartResult / SubmitResult / EditResult, raise RegistrationAPIError subclasses,
+and retry per RetryPolicy (see retry.py for which calls are retried).
+"""
+
+__all__ = [
+    "AsyncRegistrationClient",
+    "EditResult",
+    "NO_RETRY",
+    "RateLimitedError",
+    "RegistrationAPIError",
+    "RegistrationClient",
+    "RetryPolicy",
+    "SessionNotFoundError",
+    "StartResult",
+    "SubmitResult",
+]
+
+
+def __getattr__(name):
+    if name == "AsyncRegistrationClient":
+        from .async_client import AsyncRegistrationClient
+
+        return AsyncRegistrationClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,94 @@
+import asyncio
+from typing import Any, Dict, Iterable, Optional
+import httpx
+from .errors import RateLimitedError, RegistrationAPIError, check_response
+from .models import EditResult, StartResult, SubmitResult
+from .retry import RETRYABLE_STATUS, RetryPolicy
+
+"""_summary_
+Summary: Asynchronous client for the registration API (httpx), for scripts that drive many
+registrations concurrently (load tests, imports, benchmarks).
+
+Same methods, results, errors and retry rules as RegistrationClient, with a shared
+httpx.AsyncClient keep-alive pool of up to max_connections connections.
+
+Example:
+    async with AsyncRegistrationClient("http://localhost:8000") as client:
+        start = await client.start_registration()
+        result = await client.submit_response(start.session_id, "john@gmail.com")
+"""
+
+# Raised before the request was written: safe to retry any call.
+NEVER_SENT = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class AsyncRegistrationClient:
+    """Async counterpart of RegistrationClient."""
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 10.0,
+        retry: RetryPolicy = RetryPolicy(),
+        max_connections: int = 20,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.retry = retry
+        self.client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            headers=headers,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def _request(self, method: str, path: str, idempotent: bool, **kwargs) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            attempt += 1
+            retry_after = None
+            try:
+                response = await self.client.request(method, path, **kwargs)
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = None
+                if response.status_code in RETRYABLE_STATUS and idempotent:
+                    error = RegistrationAPIError(f"HTTP {response.status_code}", response.status_code)
+                else:
+                    return check_response(response.status_code, response.headers, body)
+            except RateLimitedError as e:
+                error, retry_after = e, e.retry_after
+            except httpx.TransportError as e:
+                if not (idempotent or isinstance(e, NEVER_SENT)):
+                    raise
+                error = e
+            delay = self.retry.backoff(attempt, retry_after)
+            if delay is None:
+                raise error
+            await asyncio.sleep(delay)
+
+    async def start_registration(self) -> StartResult:
+        return StartResult.from_json(await self._request("POST", "/start_registration", idempotent=False))
+
+    async def submit_response(self, session_id: str, answer: str, skip_steps: Iterable[str] = ()) -> SubmitResult:
+        payload = {"session_id": session_id, "answer": answer, "skip_steps": list(skip_steps)}
+        return SubmitResult.from_json(await self._request("POST", "/submit_response", idempotent=False, json=payload))
+
+    async def edit_field(self, session_id: str, field: str, value: str) -> EditResult:
+        payload = {"session_id": session_id, "field_to_edit": field, "new_value": value}
+        return EditResult.from_json(await self._request("POST", "/edit_field", idempotent=True, json=payload))
+
+    async def validation_stats(self) -> Dict[str, Any]:
+        return await self._request("GET", "/validation_stats", idempotent=True)
+
+    async def session_stats(self) -> Dict[str, Any]:
+        return await self._request("GET", "/session_stats", idempotent=True)
@@ -0,0 +1,103 @@
+import time
+from typing import Any, Dict, Iterable, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from .errors import RateLimitedError, RegistrationAPIError, check_response
+from .models import EditResult, StartResult, SubmitResult
+from .retry import RETRYABLE_STATUS, RetryPolicy
+
+"""_summary_
+Summary: Synchronous client for the registration API, used by the Streamlit frontend.
+
+One RegistrationClient holds a requests.Session with a keep-alive connection pool, so a
+registration (start, six answers, edits) reuses one TCP/TLS connection instead of opening a
+new one per click. Create it once per process and share it; it is safe to use from several
+threads (Streamlit runs each browser session in its own thread).
+
+Example:
+    with RegistrationClient("http://localhost:8000") as client:
+        start = client.start_registration()
+        result = client.submit_response(start.session_id, "john@gmail.com")
+        print(result.question, result.feedback)
+"""
+
+
+def _never_sent(error: requests.exceptions.RequestException) -> bool:
+    """True if the connection was never established, so the server cannot have seen the request."""
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectTimeout) or isinstance(reason, NewConnectionError)
+
+
+class RegistrationClient:
+    """Typed, pooled, retrying client for /start_registration, /submit_response and /edit_field."""
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 10.0,
+        retry: RetryPolicy = RetryPolicy(),
+        pool_size: int = 10,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retry = retry
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def _request(self, method: str, path: str, idempotent: bool, **kwargs) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            attempt += 1
+            retry_after = None
+            try:
+                response = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = None
+                if response.status_code in RETRYABLE_STATUS and idempotent:
+                    error = RegistrationAPIError(f"HTTP {response.status_code}", response.status_code)
+                else:
+                    return check_response(response.status_code, response.headers, body)
+            except RateLimitedError as e:
+                error, retry_after = e, e.retry_after
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not (idempotent or _never_sent(e)):
+                    raise
+                error = e
+            delay = self.retry.backoff(attempt, retry_after)
+            if delay is None:
+                raise error
+            time.sleep(delay)
+
+    def start_registration(self) -> StartResult:
+        return StartResult.from_json(self._request("POST", "/start_registration", idempotent=False))
+
+    def submit_response(self, session_id: str, answer: str, skip_steps: Iterable[str] = ()) -> SubmitResult:
+        payload = {"session_id": session_id, "answer": answer, "skip_steps": list(skip_steps)}
+        return SubmitResult.from_json(self._request("POST", "/submit_response", idempotent=False, json=payload))
+
+    def edit_field(self, session_id: str, field: str, value: str) -> EditResult:
+        payload = {"session_id": session_id, "field_to_edit": field, "new_value": value}
+        return EditResult.from_json(self._request("POST", "/edit_field", idempotent=True, json=payload))
+
+    def validation_stats(self) -> Dict[str, Any]:
+        return self._request("GET", "/validation_stats", idempotent=True)
+
+    def session_stats(self) -> Dict[str, Any]:
+        return self._request("GET", "/session_stats", idempotent=True)
@@ -0,0 +1,57 @@
+from typing import Any, Dict, Optional
+
+"""_summary_
+Summary: Exceptions raised by the registration API clients.
+
+The backend reports most failures in the body with HTTP 200 ({"error": "..."}); the clients
+turn those, and non-2xx responses, into exceptions so callers only handle typed results.
+"""
+
+
+class RegistrationAPIError(Exception):
+    """A request failed: an HTTP error status, or an {"error": ...} body."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, body: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.body = body or {}
+
+
+class SessionNotFoundError(RegistrationAPIError):
+    """The session expired or never existed; start a new registration."""
+
+
+class RateLimitedError(RegistrationAPIError):
+    """HTTP 429 from admission control, still rejected after the allowed retries."""
+
+    def __init__(self, message: str, retry_after: float, body: Optional[Dict[str, Any]] = None):
+        super().__init__(message, 429, body)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (the backend sends whole seconds)."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def check_response(status_code: int, headers, body: Any) -> Dict[str, Any]:
+    """Returns the JSON body of a successful call, otherwise raises the matching error."""
+    if status_code == 429:
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if retry_after is None and isinstance(body, dict):
+            retry_after = body.get("retry_after")
+        message = body.get("error", "Too many requests") if isinstance(body, dict) else "Too many requests"
+        raise RateLimitedError(message, retry_after or 1.0, body if isinstance(body, dict) else None)
+    if status_code >= 400:
+        message = (body.get("detail") or body.get("error")) if isinstance(body, dict) else None
+        raise RegistrationAPIError(str(message or f"HTTP {status_code}"), status_code, body if isinstance(body, dict) else None)
+    if not isinstance(body, dict):
+        raise RegistrationAPIError("Unexpected response body", status_code)
+    if "error" in body:
+        error_class = SessionNotFoundError if "not found" in str(body["error"]).lower() else RegistrationAPIError
+        raise error_class(body["error"], status_code, body)
+    return body
@@ -0,0 +1,82 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+"""_summary_
+Summary: Typed results of the registration API calls.
+
+Each model is built from the endpoint's JSON body with from_json; unknown keys are ignored,
+so older clients keep working when the backend adds fields.
+
+    StartResult    /start_registration   the new session and its first question
+    SubmitResult   /submit_response      the next question (or the same one, with feedback
+                                         asking for clarification), or the completed summary
+    EditResult     /edit_field           whether the field was updated, and the new summary
+"""
+
+
+@dataclass(frozen=True)
+class StartResult:
+    session_id: str
+    question: str
+    node: str
+    state: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_json(cls, body: Dict[str, Any]) -> "StartResult":
+        state = body.get("state") or {}
+        return cls(
+            session_id=body["session_id"],
+            question=body.get("message", ""),
+            node=state.get("current_node", ""),
+            state=state,
+        )
+
+
+@dataclass(frozen=True)
+class SubmitResult:
+    question: str  # the next question; "" once the registration is complete
+    feedback: str
+    user_answer: str
+    formatted_answer: str
+    completed: bool = False
+    degraded: bool = False  # validated by local rules only (LLM unavailable)
+    node: str = ""
+    state: Dict[str, Any] = field(default_factory=dict)
+    summary: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_json(cls, body: Dict[str, Any]) -> "SubmitResult":
+        state = body.get("state") or {}
+        completed = body.get("message") == "Registration complete!"
+        return cls(
+            question="" if completed else body.get("next_question", ""),
+            feedback=body.get("validation_feedback", ""),
+            user_answer=body.get("user_answer", ""),
+            formatted_answer=body.get("formatted_answer", ""),
+            completed=completed,
+            degraded=bool(body.get("degraded", False)),
+            node=state.get("current_node", ""),
+            state=state,
+            summary=body.get("summary"),
+        )
+
+
+@dataclass(frozen=True)
+class EditResult:
+    updated: bool  # False: the new value needs clarification and was not stored
+    feedback: str
+    raw_answer: str
+    formatted_answer: str
+    degraded: bool = False
+    summary: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_json(cls, body: Dict[str, Any]) -> "EditResult":
+        return cls(
+            updated=body.get("message") == "Field updated successfully!",
+            feedback=body.get("validation_feedback", ""),
+            raw_answer=body.get("raw_answer", ""),
+            formatted_answer=body.get("formatted_answer", ""),
+            degraded=bool(body.get("degraded", False)),
+            summary=body.get("summary"),
+        )
@@ -0,0 +1,43 @@
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+"""_summary_
+Summary: When the registration clients retry a call, and how long they wait.
+
+Only retries that cannot apply an answer twice are made:
+
+    connection never established        any call (nothing reached the server)
+    HTTP 429 (admission control)         any call (rejected before any state change)
+    HTTP 502/503/504, read timeout,      idempotent calls only: edit_field (sets a field to a
+    connection dropped mid-request       value) and the GET endpoints
+
+start_registration and submit_response are not idempotent (a retried submit could answer
+the next question too), so they are never retried once the request may have been processed.
+
+Waits use "full jitter": a random time between 0 and base * 2**attempt (capped), so clients
+that failed together do not retry together. A 429 waits at least its Retry-After; if that is
+longer than max_retry_after, the RateLimitedError is raised instead.
+"""
+
+RETRYABLE_STATUS = (502, 503, 504)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 3  # including the first
+    backoff_base: float = 0.2  # seconds
+    backoff_cap: float = 5.0  # seconds
+    max_retry_after: float = 10.0  # seconds; longer 429 waits are not retried
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to wait before retry number attempt (1-based), or None to give up."""
+        if attempt >= self.max_attempts:
+            return None
+        if retry_after is not None and retry_after > self.max_retry_after:
+            return None
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
@@ -0,0 +1,15 @@
+import os
+import tempfile
+
+# app.helpers.config raises without an API key, and app.db.sqlite_db reads its file path at
+# import time, so the environment is set before any test module imports the app.
+os.environ["OPENAI_API_KEY"] = os.environ.get("OPENAI_API_KEY") or "sk-test"
+os.environ.setdefault("REGISTRATION_DB_FILE", os.path.join(tempfile.mkdtemp(prefix="registration-tests-"), "registration.db"))
+os.environ.setdefault("VALIDATOR_WARMUP", "False")
+os.environ.setdefault("MLFLOW_ENABLED", "False")
+
+"""_summary_
+Summary: Test environment, set before the app is imported.
+
+Run from the repository root: `python -m pytest`. Fake validators live in tests/fakes.py.
+"""
@@ -0,0 +1,89 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from app.validation.base_validator import BaseValidator
+from app.db.session_store import SessionStore
+
+"""_summary_
+Summary: Fakes shared by the tests (imported as `from fakes import ...`).
+
+There is no pytest-asyncio dependency: async code is driven with asyncio.run inside ordinary
+test functions.
+"""
+
+
+def valid(answer: str) -> Dict[str, str]:
+    return {"status": "valid", "feedback": "Looks good.", "formatted_answer": answer}
+
+
+class FakeValidator(BaseValidator):
+    """Records every call and answers after `delay` seconds.
+
+    result is a dict, an exception to raise, or a callable (question, user_answer) -> either;
+    None answers every call as valid.
+    """
+
+    def __init__(self, result=None, delay: float = 0.0):
+        self.result = result
+        self.delay = delay
+        self.calls: List[Tuple[str, str]] = []
+        self.batch_calls: List[List[Tuple[str, str]]] = []
+
+    def _answer(self, question: str, user_answer: str) -> Dict[str, str]:
+        result = self.result(question, user_answer) if callable(self.result) else self.result
+        if isinstance(result, BaseException):
+            raise result
+        return dict(result) if result is not None else valid(user_answer)
+
+    def validate(self, question: str, user_answer: str) -> Dict[str, str]:
+        self.calls.append((question, user_answer))
+        return self._answer(question, user_answer)
+
+    async def avalidate(self, question: str, user_answer: str) -> Dict[str, str]:
+        self.calls.append((question, user_answer))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self._answer(question, user_answer)
+
+
+class MemorySessionStore(SessionStore):
+    """Dict-backed SessionStore that counts reads and writes."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.sessions: Dict[str, Dict] = {}
+        self.updated_at: Dict[str, float] = {}
+        self.reads = 0
+        self.writes = 0
+        self.batches: List[int] = []
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        self.reads += 1
+        session = self.sessions.get(session_id)
+        return None if session is None else {**session, "collected_data": dict(session["collected_data"])}
+
+    def put(self, session_id: str, collected_data: dict, current_question: str, current_node: str):
+        self.writes += 1
+        self.sessions[session_id] = {
+            "session_id": session_id,
+            "collected_data": dict(collected_data),
+            "current_question": current_question,
+            "current_node": current_node,
+        }
+
+    def put_many(self, sessions: List[Dict]):
+        self.batches.append(len(sessions))
+        for session in sessions:
+            self.put(session["session_id"], session["collected_data"], session["current_question"], session["current_node"])
+
+    def fetch_page(self, cursor, limit, current_node=None, completed=None):
+        return list(self.sessions.values())[:limit], None
+
+    async def aget(self, session_id: str) -> Optional[Dict]:
+        return self.get(session_id)
+
+    async def aget_with_updated_at(self, session_id: str) -> Tuple[Optional[Dict], Optional[float]]:
+        return self.get(session_id), self.updated_at.get(session_id)
+
+    async def aput(self, session_id: str, collected_data: dict, current_question: str, current_node: str):
+        self.put(session_id, collected_data, current_question, current_node)
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from app.validation.admission import AdmissionController, AdmissionRejected
+
+
+def test_admits_up_to_max_in_flight_then_queues():
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=1.0)
+        assert await controller.acquire() == 0.0
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 1
+
+        controller.release(held_for=0.01)  # handed to the waiter; in_flight stays 1
+        await waiter
+        assert (controller.in_flight, controller.queue_depth) == (1, 0)
+        controller.release()
+        return controller.stats()
+
+    stats = asyncio.run(run())
+    assert (stats["admitted"], stats["queued"], stats["in_flight"]) == (2, 1, 0)
+
+
+def test_full_queue_is_rejected_at_once():
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=1.0)
+        await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        waiter.cancel()
+        return controller, rejected.value
+
+    controller, rejected = asyncio.run(run())
+    assert rejected.reason == "queue_full"
+    assert rejected.retry_after >= 1
+    assert controller.stats()["rejected_queue_full"] == 1
+
+
+def test_wait_past_queue_timeout_is_rejected():
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=0.02)
+        await controller.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        return controller, rejected.value
+
+    controller, rejected = asyncio.run(run())
+    assert rejected.reason == "queue_timeout"
+    stats = controller.stats()
+    assert (stats["rejected_timeout"], stats["queue_depth"], stats["in_flight"]) == (1, 0, 1)
+
+
+def test_cancelled_waiter_is_skipped():
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=1.0)
+        await controller.acquire()
+        gone = asyncio.ensure_future(controller.acquire())
+        next_in_line = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        gone.cancel()
+        await asyncio.sleep(0)
+        controller.release()
+        await next_in_line
+        return controller
+
+    controller = asyncio.run(run())
+    assert (controller.in_flight, controller.queue_depth) == (1, 0)
+
+
+def test_slot_handed_over_at_cancel_is_passed_on():
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=1.0)
+        await controller.acquire()
+        first = asyncio.ensure_future(controller.acquire())
+        second = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+
+        controller.release()  # the slot goes to `first`'s future...
+        first.cancel()  # ...but its request is cancelled before it resumes
+        try:
+            await first
+        except asyncio.CancelledError:
+            pass  # acquire gave the slot back on its way out
+        else:
+            controller.release()  # Python < 3.12: wait_for returns the result instead of cancelling
+        await asyncio.wait_for(second, 1.0)  # either way the slot reaches the next waiter
+        in_flight = controller.in_flight
+        controller.release()
+        return in_flight, controller
+
+    in_flight, controller = asyncio.run(run())
+    assert in_flight == 1
+    assert (controller.in_flight, controller.queue_depth) == (0, 0)
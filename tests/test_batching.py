@@ -0,0 +1,99 @@
+import asyncio
+
+from app.validation.batching import BatchCounters, BatchingValidator
+from fakes import FakeValidator, valid
+
+EMAIL = "What is your email address?"
+
+
+class BatchValidator(FakeValidator):
+    """Answers batches with batch_result(items), by default one valid result per item."""
+
+    def __init__(self, batch_result=None):
+        super().__init__()
+        self.batch_result = batch_result
+
+    async def avalidate_batch(self, items):
+        self.batch_calls.append(list(items))
+        if self.batch_result is not None:
+            return self.batch_result(items)
+        return [valid(user_answer) for _, user_answer in items]
+
+
+def run_concurrently(batching, answers):
+    async def run():
+        return await asyncio.gather(*(batching.avalidate(EMAIL, answer) for answer in answers))
+
+    return asyncio.run(run())
+
+
+def test_window_flushes_concurrent_calls_as_one_batch():
+    llm = BatchValidator()
+    counters = BatchCounters()
+    batching = BatchingValidator(llm, "dspy", window_ms=20, max_batch_size=16, counters=counters)
+
+    results = run_concurrently(batching, ["a@x.com", "b@x.com", "c@x.com"])
+
+    assert [result["formatted_answer"] for result in results] == ["a@x.com", "b@x.com", "c@x.com"]
+    assert len(llm.batch_calls) == 1
+    assert llm.calls == []
+    snapshot = counters.snapshot()
+    assert (snapshot["batches"], snapshot["batched_items"]) == (1, 3)
+
+
+def test_max_batch_size_flushes_before_the_window():
+    llm = BatchValidator()
+    batching = BatchingValidator(llm, "dspy", window_ms=10_000, max_batch_size=2, counters=BatchCounters())
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batching.avalidate(EMAIL, f"{i}@x.com") for i in range(4))), 1.0
+        )
+
+    results = asyncio.run(run())
+    assert len(results) == 4
+    assert [len(items) for items in llm.batch_calls] == [2, 2]
+
+
+def test_single_item_uses_plain_avalidate():
+    llm = BatchValidator()
+    counters = BatchCounters()
+    batching = BatchingValidator(llm, "dspy", window_ms=5, max_batch_size=16, counters=counters)
+
+    assert asyncio.run(batching.avalidate(EMAIL, "a@x.com"))["status"] == "valid"
+    assert llm.batch_calls == []
+    assert llm.calls == [(EMAIL, "a@x.com")]
+    assert counters.snapshot()["single_items"] == 1
+
+
+def test_missing_items_are_validated_one_by_one():
+    llm = BatchValidator(lambda items: [valid(items[0][1]), None])
+    counters = BatchCounters()
+    batching = BatchingValidator(llm, "dspy", window_ms=20, max_batch_size=16, counters=counters)
+
+    results = run_concurrently(batching, ["a@x.com", "b@x.com"])
+
+    assert [result["formatted_answer"] for result in results] == ["a@x.com", "b@x.com"]
+    assert llm.calls == [(EMAIL, "b@x.com")]
+    assert counters.snapshot()["fallback_items"] == 1
+
+
+def test_failed_batch_falls_back_and_errors_stay_per_item():
+    def batch_fails(items):
+        raise RuntimeError("malformed batch reply")
+
+    llm = BatchValidator(batch_fails)
+    llm.result = lambda question, answer: ValueError("bad item") if answer == "bad@x.com" else valid(answer)
+    counters = BatchCounters()
+    batching = BatchingValidator(llm, "dspy", window_ms=20, max_batch_size=16, counters=counters)
+
+    async def run():
+        return await asyncio.gather(
+            batching.avalidate(EMAIL, "a@x.com"), batching.avalidate(EMAIL, "bad@x.com"), return_exceptions=True
+        )
+
+    good, bad = asyncio.run(run())
+    assert good["status"] == "valid"
+    assert isinstance(bad, ValueError)
+    snapshot = counters.snapshot()
+    assert (snapshot["batch_failures"], snapshot["fallback_items"]) == (1, 2)
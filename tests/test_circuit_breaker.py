@@ -0,0 +1,142 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.validation import circuit_breaker
+from app.validation.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    TRY_AGAIN_SHORTLY,
+    CircuitBreaker,
+    ResilientValidator,
+    local_fallback,
+)
+from fakes import FakeValidator, valid
+
+EMAIL = "What is your email address?"
+PHONE = "What is your phone number?"
+USERNAME = "Choose a username."
+PASSWORD = "Choose a strong password."
+ERROR = {"status": "error", "feedback": "An error occurred during validation.", "formatted_answer": ""}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces the breaker's clock only (the event loop keeps the real one)."""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(circuit_breaker, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("dspy", failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    breaker.record_success()  # resets the consecutive count
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["short_circuited"] == 1
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = CircuitBreaker("dspy", failure_threshold=1, reset_timeout=30)
+    breaker.allow()
+    breaker.record_failure(timeout=True)
+    clock.now += 29.9
+    assert not breaker.allow()
+
+    clock.now += 0.1
+    assert breaker.allow()  # the single probe
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # no second probe while the first is in flight
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    stats = breaker.stats()
+    assert stats["transitions"] == {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1}
+    assert stats["timeouts"] == 1
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = CircuitBreaker("dspy", failure_threshold=1, reset_timeout=30)
+    breaker.allow()
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_released_probe_lets_another_through(clock):
+    breaker = CircuitBreaker("dspy", failure_threshold=1, reset_timeout=30)
+    breaker.allow()
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.release()  # the probe's client disconnected
+    assert breaker.allow()
+
+
+@pytest.mark.parametrize(
+    "question, answer, status, formatted",
+    [
+        (PHONE, "+44 7700 900 123", "valid", "07700 900 123"),
+        (EMAIL, "not an email", "clarify", "not an email"),
+        (PASSWORD, "longenough", "valid", "longenough"),
+        (PASSWORD, "short", "clarify", "short"),
+    ],
+)
+def test_local_fallback(question, answer, status, formatted):
+    result = local_fallback(question, answer)
+    assert (result["status"], result["formatted_answer"], result["degraded"]) == (status, formatted, True)
+
+
+@pytest.mark.parametrize("question", [USERNAME, "Favourite colour?"])
+def test_local_fallback_asks_again_without_a_rule(question):
+    result = local_fallback(question, "anything")
+    assert (result["status"], result["feedback"]) == ("clarify", TRY_AGAIN_SHORTLY)
+
+
+def test_slow_llm_is_cut_off_and_answered_locally():
+    breaker = CircuitBreaker("dspy", failure_threshold=5, reset_timeout=30)
+    resilient = ResilientValidator(FakeValidator(delay=1.0), breaker, timeout=0.01)
+
+    result = asyncio.run(resilient.avalidate(PHONE, "07700900123"))
+
+    assert (result["status"], result["degraded"]) == ("valid", True)
+    assert breaker.stats()["timeouts"] == 1
+
+
+def test_open_circuit_skips_the_llm():
+    llm = FakeValidator(ERROR)
+    breaker = CircuitBreaker("dspy", failure_threshold=2, reset_timeout=30)
+    resilient = ResilientValidator(llm, breaker, timeout=1.0)
+
+    for _ in range(3):
+        assert asyncio.run(resilient.avalidate(EMAIL, "a@x.com"))["degraded"]
+    assert len(llm.calls) == 2
+    assert breaker.state == OPEN
+
+
+def test_batch_results_are_settled_per_item():
+    class BatchLLM(FakeValidator):
+        async def avalidate_batch(self, items):
+            return [valid("a@x.com"), ERROR, None]
+
+    breaker = CircuitBreaker("dspy", failure_threshold=5, reset_timeout=30)
+    resilient = ResilientValidator(BatchLLM(), breaker, timeout=1.0)
+    items = [(EMAIL, "a@x.com"), (PHONE, "07700900123"), (EMAIL, "b@x.com")]
+
+    ok, failed, unparsed = asyncio.run(resilient.avalidate_batch(items))
+
+    assert ok == valid("a@x.com")
+    assert (failed["status"], failed["degraded"]) == ("valid", True)
+    assert unparsed is None  # left for BatchingValidator to retry on its own
+    stats = breaker.stats()
+    assert (stats["successes"], stats["failures"], stats["degraded"]) == (1, 1, 1)
@@ -0,0 +1,88 @@
+import asyncio
+
+from app.validation import hedging
+from app.validation.hedging import HEDGE_MIN_SAMPLES, HedgeCounters, HedgedValidator, LatencyWindow
+from fakes import FakeValidator, valid
+
+EMAIL = "What is your email address?"
+ERROR = {"status": "error", "feedback": "An error occurred during validation.", "formatted_answer": ""}
+
+
+def hedged(primary, secondary, delay=0.02):
+    counters = HedgeCounters()
+    latencies = LatencyWindow(percentile=95, default=delay, minimum=0.001)
+    return HedgedValidator(primary, secondary, latencies, counters), counters, latencies
+
+
+def test_fast_primary_is_not_hedged():
+    secondary = FakeValidator()
+    validator, counters, _ = hedged(FakeValidator(), secondary)
+
+    assert asyncio.run(validator.avalidate(EMAIL, "a@x.com")) == valid("a@x.com")
+    assert secondary.calls == []
+    assert counters.snapshot()["primary_won"] == 1
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    primary = FakeValidator(delay=5.0)
+    validator, counters, _ = hedged(primary, FakeValidator(valid("from secondary")))
+
+    result = asyncio.run(asyncio.wait_for(validator.avalidate(EMAIL, "a@x.com"), 1.0))
+
+    assert result == valid("from secondary")
+    snapshot = counters.snapshot()
+    assert (snapshot["hedges_fired"], snapshot["hedges_won"]) == (1, 1)
+
+
+def test_primary_error_fires_the_hedge_at_once():
+    validator, counters, _ = hedged(FakeValidator(ERROR), FakeValidator(), delay=5.0)
+
+    result = asyncio.run(asyncio.wait_for(validator.avalidate(EMAIL, "a@x.com"), 1.0))
+
+    assert result["status"] == "valid"
+    assert counters.snapshot()["hedges_won"] == 1
+
+
+def test_both_failing_returns_an_error_result_over_an_exception():
+    validator, counters, _ = hedged(FakeValidator(RuntimeError("down")), FakeValidator(ERROR))
+
+    assert asyncio.run(validator.avalidate(EMAIL, "a@x.com")) == ERROR
+    assert counters.snapshot()["both_failed"] == 1
+
+
+def test_only_successful_latencies_set_the_delay(monkeypatch):
+    recorded = []
+    validator, _, latencies = hedged(FakeValidator(ERROR), FakeValidator(), delay=5.0)
+    monkeypatch.setattr(latencies, "add", recorded.append)
+
+    asyncio.run(validator.avalidate(EMAIL, "a@x.com"))
+    assert recorded == []  # the fast error is not a latency sample
+
+    validator.primary = FakeValidator()
+    asyncio.run(validator.avalidate(EMAIL, "a@x.com"))
+    assert len(recorded) == 1
+
+
+def test_latency_window_uses_the_percentile_once_warm():
+    window = LatencyWindow(percentile=95, default=1.5, minimum=0.1, size=1000)
+    for _ in range(HEDGE_MIN_SAMPLES - 10):
+        window.add(0.5)
+    assert window.delay() == 1.5  # too few samples yet
+
+    for i in range(100):
+        window.add(0.2 if i % 10 else 3.0)
+    assert 0.1 <= window.delay() <= 3.0
+    assert window.delay() != 1.5
+
+    floor = LatencyWindow(percentile=95, default=1.5, minimum=0.1, size=1000)
+    for _ in range(HEDGE_MIN_SAMPLES * 2):
+        floor.add(0.001)
+    assert floor.delay() == 0.1
+
+
+def test_metrics_report_the_given_counters():
+    counters = HedgeCounters()
+    counters.incr("hedges_fired")
+    lines = hedging.collect_hedge_metrics(counters, LatencyWindow(95, 0.25, 0.1))
+    assert 'registration_validation_hedges_total{outcome="fired"} 1' in lines
+    assert "registration_validation_hedge_delay_seconds 0.2500" in lines
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from app.validation.chatgpt_validator import JsonStringFieldStream
+
+REPLY = {"status": "valid", "feedback": 'Say "hi"\n\\ café – ok', "formatted_answer": "x"}
+
+
+def feed_all(chunks):
+    stream = JsonStringFieldStream("feedback")
+    decoded = "".join(stream.feed(chunk) for chunk in chunks)
+    return stream, decoded
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 1000])
+def test_decodes_the_field_across_any_chunking(size):
+    text = json.dumps(REPLY)  # escapes the quote, newline, backslash and non-ASCII (\\u00e9)
+    stream, decoded = feed_all([text[i : i + size] for i in range(0, len(text), size)])
+    assert decoded == REPLY["feedback"]
+    assert stream.done
+
+
+def test_not_done_until_the_closing_quote():
+    stream = JsonStringFieldStream("feedback")
+    assert stream.feed('{"status": "valid", "feed') == ""
+    assert stream.feed('back": "Loo') == "Loo"
+    assert not stream.done
+    assert stream.feed('ks good", "formatted_answer": "x"}') == "ks good"
+    assert stream.done
+    assert stream.feed("more") == ""
+
+
+def test_escape_split_between_chunks():
+    stream, decoded = feed_all(['{"feedback": "a\\', 'nb\\u00', "e9", '"}'])
+    assert decoded == "a\nbé"
+    assert stream.done
+
+
+def test_missing_field_yields_nothing():
+    stream, decoded = feed_all(['{"status": ', '"valid"}'])
+    assert (decoded, stream.done) == ("", False)
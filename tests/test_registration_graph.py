@@ -0,0 +1,58 @@
+import itertools
+
+import pytest
+from langgraph.graph import END
+
+from app.graph.registration_graph import RegistrationGraphManager, registration_questions
+
+SKIP_FLAGS = [
+    dict(zip(("skip_ask_address", "skip_ask_phone"), flags)) for flags in itertools.product((False, True), repeat=2)
+]
+
+
+@pytest.fixture(scope="module")
+def manager():
+    return RegistrationGraphManager("registration", registration_questions)
+
+
+def state_at(node_key, collected_data):
+    return {
+        "session_id": "test",
+        "collected_data": dict(collected_data),
+        "current_question": registration_questions.get(node_key, ""),
+        "current_node": node_key,
+    }
+
+
+def replay(manager, state):
+    return manager.replay_and_step_graph(state, recursion_limit=len(registration_questions) + 1)
+
+
+@pytest.mark.parametrize("skips", SKIP_FLAGS, ids=lambda skips: "+".join(k for k, v in skips.items() if v) or "none")
+def test_transition_table_matches_replay(manager, skips):
+    # Every state on the path the flags allow, from the start (no current node) to the end.
+    # (Replay cannot resume at a node the flags route around, so those states are not compared.)
+    node_key, visited = None, []
+    while True:
+        state = state_at(node_key, skips)
+        step = replay(manager, state)
+        assert manager.resume_and_step_graph(state) == step, f"strategies disagree after {node_key}"
+        if step is None:
+            break
+        node_key = next(iter(step))
+        visited.append(node_key)
+    assert visited[-1] == "ask_password"
+
+
+def test_skipped_questions_are_not_asked(manager):
+    order = []
+    state = state_at(None, {"skip_ask_address": True})
+    while True:
+        step = manager.resume_and_step_graph(state)
+        if step is None:
+            break
+        node_key = next(iter(step))
+        order.append(node_key)
+        state = state_at(node_key, state["collected_data"])
+    assert order == ["ask_email", "ask_name", "ask_phone", "ask_username", "ask_password"]
+    assert manager.next_node("ask_password", state) == END
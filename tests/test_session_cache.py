@@ -0,0 +1,161 @@
+import asyncio
+import time
+
+import pytest
+
+from app.db.session_cache import SessionCache
+from app.db.sqlite_db import SESSION_TTL_ABANDONED
+from fakes import MemorySessionStore
+
+EMAIL_QUESTION = "What is your email address?"
+NAME_QUESTION = "What is your full name?"
+
+
+def make_cache(mode, max_sessions=100, flush_threshold=1000):
+    store = MemorySessionStore()
+    # A long interval keeps the flusher thread out of the way; tests flush explicitly.
+    cache = SessionCache(store, mode, max_sessions, flush_interval=3600, flush_threshold=flush_threshold)
+    return store, cache
+
+
+def put(cache, session_id, data, node="ask_email"):
+    asyncio.run(cache.aput(session_id, data, EMAIL_QUESTION, node))
+
+
+def test_invalid_mode_is_rejected():
+    with pytest.raises(ValueError):
+        SessionCache(MemorySessionStore(), "write_around", 10, 1.0, 10)
+
+
+def test_off_reads_and_writes_the_store_every_time():
+    store, cache = make_cache("off")
+    put(cache, "s1", {})
+    asyncio.run(cache.aget("s1"))
+    asyncio.run(cache.aget("s1"))
+    assert (store.writes, store.reads) == (1, 2)
+    assert cache.stats()["cache"]["size"] == 0
+
+
+def test_write_through_writes_the_store_and_serves_reads_from_memory():
+    store, cache = make_cache("write_through")
+    put(cache, "s1", {"ask_email": "a@x.com"})
+    assert store.sessions["s1"]["collected_data"] == {"ask_email": "a@x.com"}
+
+    session = asyncio.run(cache.aget("s1"))
+    assert store.reads == 0
+    assert session == {
+        "session_id": "s1",
+        "collected_data": {"ask_email": "a@x.com"},
+        "current_question": EMAIL_QUESTION,
+        "current_node": "ask_email",
+    }
+    session["collected_data"]["ask_name"] = "changed"  # callers get a copy
+    assert "ask_name" not in asyncio.run(cache.aget("s1"))["collected_data"]
+    assert cache.stats()["cache"]["hits"] == 2
+
+
+def test_miss_is_loaded_once_with_the_row_time():
+    store, cache = make_cache("write_through")
+    store.put("s1", {}, EMAIL_QUESTION, "ask_email")
+    store.updated_at["s1"] = 1234.0
+
+    session, updated_at = asyncio.run(cache.aget_with_updated_at("s1"))
+    assert (session["session_id"], updated_at) == ("s1", 1234.0)
+    assert "updated_at" not in session
+    # 1234.0 is long past the abandoned-session TTL, so the cached copy expires with the row.
+    assert asyncio.run(cache.aget("s1")) is None
+    assert store.reads == 1
+
+
+def test_write_through_field_update_reaches_both():
+    store, cache = make_cache("write_through")
+    put(cache, "s1", {})
+    updated = asyncio.run(cache.aset_field("s1", "ask_email", "a@x.com", NAME_QUESTION, "ask_name"))
+    assert updated
+    assert store.sessions["s1"]["collected_data"] == {"ask_email": "a@x.com"}
+    assert asyncio.run(cache.aget_field("s1", "ask_email")) == "a@x.com"
+    assert asyncio.run(cache.aget("s1"))["current_node"] == "ask_name"
+
+
+def test_write_behind_defers_writes_until_flush():
+    store, cache = make_cache("write_behind")
+    try:
+        put(cache, "s1", {"ask_email": "a@x.com"})
+        put(cache, "s2", {})
+        assert asyncio.run(cache.aset_field("s1", "ask_name", "Jane Doe", NAME_QUESTION, "ask_name"))
+        assert store.writes == 0
+        assert cache.stats()["cache"]["dirty"] == 2
+        assert cache.get("s1")["current_node"] == "ask_name"  # sync readers see pending writes
+
+        assert cache.flush() == 2
+        assert store.batches == [2]
+        assert store.sessions["s1"]["collected_data"] == {"ask_email": "a@x.com", "ask_name": "Jane Doe"}
+        assert cache.stats()["cache"]["dirty"] == 0
+        assert cache.flush() == 0
+    finally:
+        cache.close()
+
+
+def test_write_behind_close_flushes_everything():
+    store, cache = make_cache("write_behind")
+    put(cache, "s1", {"ask_email": "a@x.com"})
+    cache.close()
+    assert store.sessions["s1"]["collected_data"] == {"ask_email": "a@x.com"}
+
+
+def test_failed_flush_keeps_sessions_dirty():
+    store, cache = make_cache("write_behind")
+    try:
+        put(cache, "s1", {})
+        real_put_many = store.put_many
+
+        def disk_full(sessions):
+            raise OSError("disk full")
+
+        store.put_many = disk_full
+        assert cache.flush() == 0
+        assert cache.stats()["cache"]["flush_errors"] == 1
+        store.put_many = real_put_many
+        assert cache.flush() == 1
+    finally:
+        cache.close()
+
+
+def test_flush_threshold_wakes_the_flusher():
+    store, cache = make_cache("write_behind", flush_threshold=2)
+    try:
+        put(cache, "s1", {})
+        put(cache, "s2", {})
+        deadline = time.monotonic() + 5
+        while store.writes < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert store.writes == 2
+    finally:
+        cache.close()
+
+
+def test_lru_evicts_clean_sessions_and_keeps_dirty_ones():
+    store, cache = make_cache("write_through", max_sessions=2)
+    for session_id in ("s1", "s2", "s3"):
+        put(cache, session_id, {})
+    stats = cache.stats()["cache"]
+    assert (stats["size"], stats["evictions"]) == (2, 1)
+    asyncio.run(cache.aget("s1"))  # evicted: read from the store again
+    assert store.reads == 1
+
+    store, cache = make_cache("write_behind", max_sessions=2)
+    try:
+        for session_id in ("s1", "s2", "s3"):
+            put(cache, session_id, {})
+        assert cache.stats()["cache"]["size"] == 3  # nothing evicted before it is written
+    finally:
+        cache.close()
+    assert store.writes == 3
+
+
+def test_entries_expire_like_the_rows():
+    store, cache = make_cache("write_through")
+    put(cache, "s1", {})
+    with cache._lock:
+        cache._entries["s1"].updated_at = time.time() - SESSION_TTL_ABANDONED - 1
+    assert asyncio.run(cache.aget("s1")) is None
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.validation.single_flight import CoalescingCounters, CoalescingValidator
+from fakes import FakeValidator
+
+EMAIL = "What is your email address?"
+
+
+def test_identical_concurrent_calls_share_one_llm_call():
+    llm = FakeValidator(delay=0.05)
+    counters = CoalescingCounters()
+    coalescing = CoalescingValidator(llm, "dspy", counters)
+
+    async def run():
+        return await asyncio.gather(
+            coalescing.avalidate(EMAIL, "jane@example.com"),
+            coalescing.avalidate(EMAIL, " jane@example.com "),
+            coalescing.avalidate(EMAIL, "other@example.com"),
+        )
+
+    first, second, other = asyncio.run(run())
+    assert len(llm.calls) == 2
+    assert first == second
+    assert first is not second  # every caller gets its own copy
+    assert other["formatted_answer"] == "other@example.com"
+    assert counters.snapshot()["coalesced"] == 1
+    assert coalescing.in_flight() == 0
+
+
+def test_leader_failure_reaches_every_caller():
+    llm = FakeValidator(RuntimeError("upstream down"), delay=0.05)
+    coalescing = CoalescingValidator(llm, "dspy", CoalescingCounters())
+
+    async def run():
+        return await asyncio.gather(
+            coalescing.avalidate(EMAIL, "jane@example.com"),
+            coalescing.avalidate(EMAIL, "jane@example.com"),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert len(llm.calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert coalescing.in_flight() == 0
+
+    # Nothing is remembered: the next call goes to the validator again.
+    llm.result = None
+    assert asyncio.run(coalescing.avalidate(EMAIL, "jane@example.com"))["status"] == "valid"
+    assert len(llm.calls) == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    llm = FakeValidator(delay=0.05)
+    coalescing = CoalescingValidator(llm, "dspy", CoalescingCounters())
+
+    async def run():
+        leader = asyncio.ensure_future(coalescing.avalidate(EMAIL, "jane@example.com"))
+        follower = asyncio.ensure_future(coalescing.avalidate(EMAIL, "jane@example.com"))
+        await asyncio.sleep(0.01)
+        leader.cancel()  # the first client disconnects
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run())["status"] == "valid"
+    assert len(llm.calls) == 1
+    assert coalescing.in_flight() == 0
+
+
+def test_sync_followers_wait_for_the_leader():
+    release = threading.Event()
+
+    def slow(question, user_answer):
+        release.wait(5)
+        return {"status": "valid", "feedback": "", "formatted_answer": user_answer}
+
+    llm = FakeValidator(slow)
+    counters = CoalescingCounters()
+    coalescing = CoalescingValidator(llm, "dspy", counters)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(coalescing.validate(EMAIL, "a@b.com"))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while counters.snapshot()["coalesced"] < 2:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(llm.calls) == 1
+    assert len(results) == 3
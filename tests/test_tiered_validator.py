@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from app.validation.tiered_validator import TierCounters, TieredValidator
+from fakes import FakeValidator
+
+EMAIL = "What is your email address?"
+NAME = "What is your full name?"
+ADDRESS = "What is your address?"
+PHONE = "What is your phone number?"
+USERNAME = "Choose a username."
+PASSWORD = "Choose a strong password."
+
+
+@pytest.fixture
+def tiered():
+    return TieredValidator(FakeValidator(), counters=TierCounters())
+
+
+def test_empty_answer_is_clarified_locally(tiered):
+    result = tiered.check_rules(EMAIL, "   ")
+    assert result["status"] == "clarify"
+    assert result["feedback"] == "Please provide an answer to the question."
+
+
+def test_email_is_lowercased(tiered):
+    result = tiered.check_rules(EMAIL, " John.Doe@Example.COM ")
+    assert result == {"status": "valid", "feedback": "Email address looks good.", "formatted_answer": "john.doe@example.com"}
+
+
+def test_malformed_email_goes_to_the_llm(tiered):
+    assert tiered.check_rules(EMAIL, "john at example dot com") is None
+
+
+def test_phone_is_formatted(tiered):
+    result = tiered.check_rules(PHONE, "+44 7700 900 123")
+    assert result["status"] == "valid"
+    assert result["formatted_answer"] == "07700 900 123"
+
+
+def test_wrong_length_phone_is_clarified_locally(tiered):
+    result = tiered.check_rules(PHONE, "0770 090")
+    assert result["status"] == "clarify"
+    assert result["formatted_answer"] == "0770 090"
+
+
+def test_phone_in_words_goes_to_the_llm(tiered):
+    assert tiered.check_rules(PHONE, "oh seven seven double oh") is None
+
+
+def test_address_with_postcode_is_formatted(tiered):
+    result = tiered.check_rules(ADDRESS, "12, high street, london, sw1a 1aa")
+    assert result["status"] == "valid"
+    assert "SW1A 1AA" in result["formatted_answer"]
+
+
+def test_free_text_address_goes_to_the_llm(tiered):
+    assert tiered.check_rules(ADDRESS, "the blue house by the church") is None
+
+
+def test_full_name_is_capitalized(tiered):
+    result = tiered.check_rules(NAME, "jane doe")
+    assert result["status"] == "valid"
+    assert result["formatted_answer"] == "Jane Doe"
+
+
+def test_single_word_name_goes_to_the_llm(tiered):
+    assert tiered.check_rules(NAME, "jane") is None
+
+
+@pytest.mark.parametrize("question, answer", [(USERNAME, "jdoe_88"), (PASSWORD, "hunter22!"), ("Favourite colour?", "blue")])
+def test_fields_without_rules_go_to_the_llm(tiered, question, answer):
+    assert tiered.check_rules(question, answer) is None
+
+
+def test_llm_is_only_called_when_rules_are_unsure():
+    llm = FakeValidator()
+    counters = TierCounters()
+    tiered = TieredValidator(llm, counters=counters)
+
+    asyncio.run(tiered.avalidate(EMAIL, "jane@example.com"))
+    asyncio.run(tiered.avalidate(USERNAME, "jdoe_88"))
+
+    assert llm.calls == [(USERNAME, "jdoe_88")]
+    snapshot = counters.snapshot()
+    assert snapshot["rules_valid"] == 1
+    assert snapshot["llm"] == 1
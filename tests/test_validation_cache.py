@@ -0,0 +1,88 @@
+import asyncio
+
+from app.validation.validation_cache import CachedValidator, LRUCache, ValidationCache, make_cache_key
+from fakes import FakeValidator, valid
+
+EMAIL = "What is your email address?"
+PASSWORD = "Choose a strong password."
+
+
+def test_lru_entry_expires_at_its_ttl():
+    cache = LRUCache(max_size=10, ttl_seconds=60)
+    cache.set("a", 1, now=1000.0)
+    assert cache.get("a", now=1059.9) == 1
+    assert cache.get("a", now=1060.0) is None
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+
+def test_lru_explicit_expiry_overrides_ttl():
+    cache = LRUCache(max_size=10, ttl_seconds=60)
+    cache.set("a", 1, now=1000.0, expires_at=1005.0)
+    assert cache.get("a", now=1005.0) is None
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_size=2, ttl_seconds=60)
+    cache.set("a", 1, now=0.0)
+    cache.set("b", 2, now=0.0)
+    assert cache.get("a", now=1.0) == 1  # "b" is now the oldest
+    cache.set("c", 3, now=1.0)
+    assert cache.get("b", now=1.0) is None
+    assert cache.get("a", now=1.0) == 1
+    assert cache.get("c", now=1.0) == 3
+    assert cache.evictions == 1
+
+
+def test_cache_key_normalizes_whitespace_and_question_text():
+    assert make_cache_key("dspy", EMAIL, " a@b.com ") == make_cache_key("dspy", "Your email, please?", "a@b.com")
+    assert make_cache_key("dspy", EMAIL, "a@b.com") != make_cache_key("chatgpt", EMAIL, "a@b.com")
+
+
+def test_only_settled_llm_results_are_stored():
+    cache = ValidationCache(max_size=10, ttl_seconds=60, use_sqlite=False)
+    cache.set("valid", "dspy", valid("x"))
+    cache.set("error", "dspy", {"status": "error", "feedback": "", "formatted_answer": "x"})
+    cache.set("degraded", "dspy", {**valid("x"), "degraded": True})
+
+    assert cache.get("valid") == valid("x")
+    assert cache.get("error") is None
+    assert cache.get("degraded") is None
+    stats = cache.stats()
+    assert stats["stores"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_returned_results_are_copies():
+    cache = ValidationCache(max_size=10, ttl_seconds=60, use_sqlite=False)
+    cache.set("k", "dspy", valid("x"))
+    cache.get("k")["status"] = "clarify"
+    assert cache.get("k")["status"] == "valid"
+
+
+def test_sqlite_level_refills_memory():
+    from app.db.sqlite_db import init_db
+
+    init_db()
+    writer = ValidationCache(max_size=10, ttl_seconds=60)
+    writer.set("shared-key", "dspy", valid("x"))
+
+    reader = ValidationCache(max_size=10, ttl_seconds=60)  # another worker: empty memory level
+    assert reader.get("shared-key") == valid("x")
+    assert reader.get("shared-key") == valid("x")
+    stats = reader.stats()
+    assert (stats["sqlite_hits"], stats["memory_hits"]) == (1, 1)
+
+
+def test_cached_validator_skips_excluded_fields():
+    llm = FakeValidator()
+    cache = ValidationCache(max_size=10, ttl_seconds=60, excluded_fields=["password"], use_sqlite=False)
+    cached = CachedValidator(llm, "dspy", cache)
+
+    for _ in range(2):
+        asyncio.run(cached.avalidate(EMAIL, "jane@example.com"))
+        asyncio.run(cached.avalidate(PASSWORD, "hunter22!"))
+
+    assert llm.calls.count((EMAIL, "jane@example.com")) == 1
+    assert llm.calls.count((PASSWORD, "hunter22!")) == 2